@@ -13,14 +13,26 @@ import time
 import serial
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import json
 import csv
 import subprocess
 import math
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+try:
+    from sa5x_monitor.utils.drift_model import PhaseDriftModel
+except ImportError:  # прогноз holdover недоступен без пакета sa5x_monitor
+    PhaseDriftModel = None
+
+try:
+    from sa5x_monitor.utils.clock_kalman import ClockKalmanFilter, measured_adev
+    from sa5x_monitor.utils.stability import StreamingAllanDeviation
+except ImportError:  # фильтр Калмана недоступен без пакета sa5x_monitor
+    ClockKalmanFilter = None
+
 # Константы
 DEFAULT_UART_DEVICE = "/dev/ttyS6"
 DEFAULT_BAUDRATE = 57600
@@ -42,6 +54,11 @@ MAC_COMMANDS_GET = [
     "EffectiveTuning",
 ]
 
+# Строки таблицы параметров с оценкой фильтра Калмана
+KALMAN_ROWS = ["Kalman: фаза", "Kalman: частота", "Kalman: дрейф"]
+KALMAN_ADEV_REFRESH = 60  # через сколько отсчётов мониторинга уточнять шум процесса по ADEV
+KALMAN_ADEV_MIN_EDF = 10
+
 MAC_COMMANDS_SET = [
     "PpsWidth", 
     "TauPps0", 
@@ -66,145 +83,393 @@ RUSSIAN_MONTHS = {
     "сен": "Sep", "окт": "Oct", "ноя": "Nov", "дек": "Dec"
 }
 
-class HoldoverTestData:
-    """Класс для хранения и анализа данных тестов holdover"""
+# Номера месяцев по русским и английским сокращениям в нижнем регистре
+MONTH_NUMBERS = {
+    **{name: number for number, name in enumerate(RUSSIAN_MONTHS, 1)},
+    **{name.lower(): number for number, name in enumerate(RUSSIAN_MONTHS.values(), 1)}
+}
+
+# Значение int64 для неразобранной метки времени (NaT в datetime64[ns])
+NAT_NS = np.iinfo(np.int64).min
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class TimestampParser:
+    """Массовый разбор столбца дат в int64 наносекунды эпохи (UTC)
+    
+    Формат определяется один раз по первой непустой строке:
+    'text' - "%a %d %b %Y %H:%M:%S GMT" с русскими или английскими
+    названиями, 'iso' - ISO 8601. В текстовом формате строки с
+    раскладкой первой строки разбираются по столбцам символов: время
+    суток векторно, дата ("день месяц год") один раз на участок
+    одинаковых префиксов с запоминанием; остальные строки - по одной.
+    Неразобранные строки дают NAT_NS; их число и пример сохраняются в
+    failures и first_failure вместо печати на каждой строке.
+    """
     
     def __init__(self):
-        self.data = []
-        self.headers = ["Date", "Disciplining", "TauPps0", "DigitalTuning", 
+        self.format = None
+        self.failures = 0
+        self.first_failure = None
+        self._day_cache = {}
+    
+    def parse(self, strings):
+        """Массив int64 наносекунд эпохи для последовательности строк"""
+        strings = [str(value).strip() for value in strings]
+        if self.format is None:
+            self.format = self.detect_format(strings)
+        
+        result = self._parse_iso(strings) if self.format == 'iso' else self._parse_text(strings)
+        failed = result == NAT_NS
+        if failed.any():
+            self.failures += int(failed.sum())
+            if self.first_failure is None:
+                self.first_failure = strings[int(np.argmax(failed))]
+        return result
+    
+    def parse_datetime64(self, strings):
+        """То же в виде datetime64[ns], NaT для неразобранных"""
+        return self.parse(strings).view('datetime64[ns]')
+    
+    @staticmethod
+    def detect_format(strings):
+        """'iso' или 'text' по первой непустой строке"""
+        for value in strings:
+            if value:
+                return 'iso' if value[:4].isdigit() and value[4:5] == '-' else 'text'
+        return 'text'
+    
+    def _day_ns(self, day, month, year):
+        """Наносекунды эпохи на начало дня, с запоминанием; NAT_NS для неверной даты"""
+        key = (day, month, year)
+        cached = self._day_cache.get(key)
+        if cached is None:
+            number = MONTH_NUMBERS.get(month.lower())
+            try:
+                cached = int(datetime(int(year), number, int(day), tzinfo=timezone.utc).timestamp()) * NS_PER_SECOND
+            except (TypeError, ValueError):
+                cached = NAT_NS
+            self._day_cache[key] = cached
+        return cached
+    
+    def _parse_text(self, strings):
+        """Текстовый формат: строки с раскладкой первой строки разбираются по столбцам символов"""
+        result = np.full(len(strings), NAT_NS, dtype=np.int64)
+        first = next((value for value in strings if value), "")
+        parts = first.split()
+        if len(parts) >= 5 and len(parts[4]) == 8:
+            # Позиция времени суток и дата-префикс в первой строке
+            offset = first.index(parts[4], len(" ".join(parts[:4])))
+            codes = np.array(strings, dtype=str).view(np.uint32).reshape(len(strings), -1)
+            if codes.shape[1] >= offset + 8:
+                result = self._parse_fixed(codes, offset)
+        
+        # Строки с другой раскладкой разбираются по одной
+        rest = np.flatnonzero(result == NAT_NS)
+        if len(rest):
+            result[rest] = self._parse_rows([strings[i] for i in rest])
+        return result
+    
+    def _parse_fixed(self, codes, offset):
+        """Коды символов строк (n x ширина): время с позиции offset, дата в символах до нее"""
+        digits = codes[:, offset:offset + 8].astype(np.int64) - ord('0')
+        after = codes[:, offset + 8] if codes.shape[1] > offset + 8 else np.zeros(len(codes), dtype=np.uint32)
+        seconds, valid = self._clock_seconds(digits)
+        valid &= ((after == ord(' ')) | (after == 0)) & (codes[:, offset - 1] == ord(' '))
+        
+        # Дата разбирается один раз на каждый участок одинаковых префиксов
+        prefixes = codes[:, :offset]
+        starts = np.flatnonzero(np.concatenate(([True], np.any(prefixes[1:] != prefixes[:-1], axis=1))))
+        day_values = []
+        for start in starts.tolist():
+            parts = "".join(map(chr, prefixes[start][prefixes[start] > 0])).split()
+            day_values.append(self._day_ns(*parts[1:4]) if len(parts) == 4 else NAT_NS)
+        days = np.repeat(np.array(day_values, dtype=np.int64), np.diff(np.append(starts, len(codes))))
+        
+        valid &= days != NAT_NS
+        return np.where(valid, days + seconds * NS_PER_SECOND, NAT_NS)
+    
+    def _parse_rows(self, strings):
+        """Построчный разбор для строк, не совпадающих с раскладкой первой"""
+        days = np.full(len(strings), NAT_NS, dtype=np.int64)
+        times = [""] * len(strings)
+        for i, value in enumerate(strings):
+            parts = value.split()
+            if len(parts) >= 5:
+                days[i] = self._day_ns(parts[1], parts[2], parts[3])
+                if len(parts[4]) == 8 and parts[4].isascii():
+                    times[i] = parts[4]
+        
+        digits = np.array(times, dtype='S8').view(np.uint8).reshape(-1, 8).astype(np.int64) - ord('0')
+        seconds, valid = self._clock_seconds(digits)
+        return np.where(valid & (days != NAT_NS), days + seconds * NS_PER_SECOND, NAT_NS)
+    
+    @staticmethod
+    def _clock_seconds(digits):
+        """Секунды от начала суток для "ЧЧ:ММ:СС", заданных цифрами (код символа - '0'), и маска верных"""
+        colon = ord(':') - ord('0')
+        pairs = digits[:, [0, 3, 6]] * 10 + digits[:, [1, 4, 7]]
+        valid = (np.all((digits >= 0) & (digits <= 9) | (np.arange(8) % 3 == 2), axis=1)
+                 & (digits[:, 2] == colon) & (digits[:, 5] == colon)
+                 & (pairs[:, 0] < 24) & (pairs[:, 1] < 60) & (pairs[:, 2] < 61))
+        return pairs @ np.array([3600, 60, 1]), valid
+    
+    @staticmethod
+    def _parse_iso(strings):
+        # Строки без смещения часового пояса (кроме 'Z') numpy разбирает сам
+        naive = [value[:-1] if value.endswith('Z') else value for value in strings]
+        if not any('+' in value[10:] or '-' in value[10:] for value in naive):
+            try:
+                return np.array(naive, dtype='datetime64[ns]').view(np.int64)
+            except ValueError:
+                pass
+        
+        # Смещения часового пояса и нестандартные строки: каждая уникальная строка один раз
+        unique, inverse = np.unique(np.array(strings, dtype=str), return_inverse=True)
+        parsed = np.full(len(unique), NAT_NS, dtype=np.int64)
+        for i, value in enumerate(unique.tolist()):
+            try:
+                moment = datetime.fromisoformat(value)
+            except ValueError:
+                continue
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            delta = moment - datetime(1970, 1, 1, tzinfo=timezone.utc)
+            parsed[i] = (delta.days * 86400 + delta.seconds) * NS_PER_SECOND + delta.microseconds * 1000
+        return parsed[inverse.reshape(-1)]
+
+class HoldoverTestData:
+    """Класс для хранения и анализа данных тестов holdover
+    
+    Данные хранятся по столбцам: исходные строки дат, метки времени
+    datetime64[ns] (разбираются один раз при добавлении или загрузке) и
+    числовые параметры float64 (NaN для пустых и нечисловых значений).
+    Записи из add_record копятся в списке и переносятся в столбцы при
+    первом чтении, так что добавление записи стоит O(1).
+    """
+    
+    # Числовые столбцы CSV в порядке файла
+    NUMERIC_COLUMNS = ["Disciplining", "TauPps0", "DigitalTuning",
                        "EffectiveTuning", "PPS In Detected", "Phase"]
     
+    def __init__(self):
+        self.headers = ["Date"] + self.NUMERIC_COLUMNS
+        self.clear()
+    
+    def clear(self):
+        """Удалить все записи"""
+        self._dates = np.empty(0, dtype=object)
+        self._timestamps = np.empty(0, dtype='datetime64[ns]')
+        self._columns = {name: np.empty(0) for name in self.NUMERIC_COLUMNS}
+        self._pending = []
+    
+    def __len__(self):
+        return len(self._dates) + len(self._pending)
+    
+    @property
+    def dates(self):
+        """Исходные строки дат"""
+        self._flush()
+        return self._dates
+    
+    @property
+    def timestamps(self):
+        """Метки времени datetime64[ns], NaT для неразобранных дат"""
+        self._flush()
+        return self._timestamps
+    
+    @property
+    def columns(self):
+        """Числовые столбцы float64 по именам NUMERIC_COLUMNS"""
+        self._flush()
+        return self._columns
+    
+    @property
+    def data(self):
+        """Снимок записей в виде кортежа словарей, как в CSV (только для чтения)"""
+        rows = zip(self.dates, *(self._format_column(self.columns[name]) for name in self.NUMERIC_COLUMNS))
+        return tuple(dict(zip(self.headers, row)) for row in rows)
+    
     def add_record(self, disciplining, tau, digital_tuning, effective_tuning, 
                    pps_detected, phase):
         """Добавить запись данных"""
-        record = {
-            "Date": datetime.now().strftime("%a %d %b %Y %H:%M:%S GMT"),
-            "Disciplining": disciplining,
-            "TauPps0": tau,
-            "DigitalTuning": digital_tuning,
-            "EffectiveTuning": effective_tuning,
-            "PPS In Detected": pps_detected,
-            "Phase": phase
-        }
-        self.data.append(record)
+        now = datetime.now()
+        self._pending.append((now.strftime("%a %d %b %Y %H:%M:%S GMT"), np.datetime64(now, 'ns'),
+                              disciplining, tau, digital_tuning, effective_tuning, pps_detected, phase))
+    
+    def _flush(self):
+        """Перенести накопленные записи add_record в столбцы"""
+        if not self._pending:
+            return
+        pending = list(zip(*self._pending))
+        self._pending = []
+        self._append(list(pending[0]), dict(zip(self.NUMERIC_COLUMNS, map(list, pending[2:]))),
+                     np.array(pending[1], dtype='datetime64[ns]'))
+    
+    def _append(self, dates, values, timestamps=None):
+        """Добавить столбцы записей; даты разбираются, если метки времени не заданы"""
+        if timestamps is None:
+            timestamps = self._parse_dates(dates)
+        self._flush()
+        self._dates = np.concatenate((self._dates, np.array(dates, dtype=object)))
+        self._timestamps = np.concatenate((self._timestamps, timestamps))
+        for name in self.NUMERIC_COLUMNS:
+            self._columns[name] = np.concatenate((self._columns[name], self._to_float(values[name])))
+    
+    @staticmethod
+    def _to_float(values):
+        """Столбец строк в float64, NaN для пустых и нечисловых значений"""
+        try:
+            return np.array(values, dtype=float)
+        except (TypeError, ValueError):
+            result = np.full(len(values), np.nan)
+            for i, value in enumerate(values):
+                try:
+                    result[i] = float(value)
+                except (TypeError, ValueError):
+                    pass
+            return result
+    
+    @staticmethod
+    def _format_column(values):
+        """Числа в строки CSV без лишних нулей, пустая строка для NaN"""
+        return ["" if math.isnan(value) else f"{value:.15g}" for value in values.tolist()]
+    
+    def _parse_dates(self, dates):
+        """Метки времени datetime64[ns] для строк дат, NaT для неразобранных"""
+        parser = TimestampParser()
+        stamps = parser.parse_datetime64(dates)
+        if parser.failures:
+            print(f"Не удалось разобрать {parser.failures} дат, например '{parser.first_failure}'")
+        return stamps
     
     def save_to_csv(self, filename):
         """Сохранить данные в CSV файл"""
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=self.headers)
-            writer.writeheader()
-            writer.writerows(self.data)
+            writer = csv.writer(csvfile)
+            writer.writerow(self.headers)
+            writer.writerows(zip(self.dates, *(self._format_column(self.columns[name])
+                                               for name in self.NUMERIC_COLUMNS)))
     
     def load_from_csv(self, filename):
         """Загрузить данные из CSV файла"""
-        self.data = []
+        self.clear()
         try:
             with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    self.data.append(row)
+                reader = csv.reader(csvfile)
+                header = next(reader, [])
+                rows = list(reader)
+            
+            # Столбцы по именам заголовка, отсутствующие заполняются пустыми строками
+            columns = dict(zip(header, zip(*rows))) if rows else {}
+            empty = [""] * len(rows)
+            self._append(list(columns.get("Date", empty)),
+                         {name: list(columns.get(name, empty)) for name in self.NUMERIC_COLUMNS})
             return True
         except Exception as e:
             print(f"Ошибка загрузки CSV: {e}")
             return False
     
     def parse_russian_date(self, date_string):
-        """Функция для преобразования русской даты"""
-        try:
-            # Удаляем часовой пояс (например, " GMT")
-            date_string = date_string.replace(" GMT", "")
-            
-            # Разбиваем строку на части
-            parts = date_string.split()
-            if len(parts) < 5:
-                raise ValueError(f"Некорректная дата: {date_string}")
-            
-            # Заменяем русские названия дней недели и месяцев на английские
-            day_of_week = RUSSIAN_DAYS.get(parts[0], parts[0])
-            day = parts[1]
-            month = RUSSIAN_MONTHS.get(parts[2], parts[2])
-            year = parts[3]
-            time = parts[4]
-            
-            # Формируем строку в английском формате
-            english_date = f"{day_of_week} {day} {month} {year} {time}"
-            
-            # Преобразуем строку в объект datetime
-            return datetime.strptime(english_date, "%a %d %b %Y %H:%M:%S")
-        except Exception as e:
-            print(f"Ошибка при парсинге даты '{date_string}': {e}")
+        """Функция для преобразования русской даты (или ISO) в datetime, None при ошибке"""
+        stamp = TimestampParser().parse([date_string])[0]
+        if stamp == NAT_NS:
+            print(f"Ошибка при парсинге даты '{date_string}'")
             return None
+        return datetime(1970, 1, 1) + timedelta(microseconds=int(stamp) // 1000)
     
     def analyze_changes(self):
-        """Анализ изменений в данных"""
-        if len(self.data) < 2:
-            return []
+        """Анализ изменений в данных
         
-        changes = []
-        
-        # Найти изменения в дисциплинировании и Tau
-        for i in range(1, len(self.data)):
-            prev_disc = self.data[i-1]["Disciplining"]
-            curr_disc = self.data[i]["Disciplining"]
-            prev_tau = self.data[i-1]["TauPps0"]
-            curr_tau = self.data[i]["TauPps0"]
-            
-            if prev_disc != curr_disc or prev_tau != curr_tau:
-                try:
-                    curr_date = self.parse_russian_date(self.data[i]["Date"])
-                    prev_date = self.parse_russian_date(self.data[i-1]["Date"])
-                    
-                    if curr_date and prev_date:
-                        duration = (curr_date - prev_date).total_seconds()
-                        
-                        change_info = {
-                            "index": i,
-                            "date": self.data[i]["Date"],
-                            "disciplining": curr_disc,
-                            "tau": curr_tau,
-                            "duration": duration,
-                            "phase_start": self.data[i-1]["Phase"],
-                            "phase_end": self.data[i]["Phase"]
-                        }
-                        changes.append(change_info)
-                except Exception as e:
-                    print(f"Ошибка анализа изменений: {e}")
-                    continue
+        Изменение - запись, у которой Disciplining или TauPps0 отличается
+        от предыдущей; записи с неразобранной датой (своей или
+        предыдущей) пропускаются.
+        """
+        if len(self) < 2:
+            return []
         
-        return changes
+        disciplining = self.columns["Disciplining"]
+        tau = self.columns["TauPps0"]
+        phase = self.columns["Phase"]
+        
+        def differs(values):
+            same = (values[1:] == values[:-1]) | (np.isnan(values[1:]) & np.isnan(values[:-1]))
+            return ~same
+        
+        dated = ~np.isnat(self.timestamps)
+        indices = np.flatnonzero((differs(disciplining) | differs(tau)) & dated[1:] & dated[:-1]) + 1
+        durations = (self.timestamps[indices] - self.timestamps[indices - 1]) / np.timedelta64(1, 's')
+        
+        return [
+            {
+                "index": int(i),
+                "date": self.dates[i],
+                "disciplining": disciplining[i],
+                "tau": tau[i],
+                "duration": duration,
+                "phase_start": phase[i - 1],
+                "phase_end": phase[i]
+            }
+            for i, duration in zip(indices.tolist(), durations.tolist())
+        ]
+    
+    def holdover_periods(self):
+        """Периоды holdover (Disciplining = 0): границы, длительность, дрейф и скорость дрейфа фазы
+        
+        Возвращает словарь массивов, по элементу на период; дрейф - разность
+        фазы в конце и в начале периода (нс), скорость - модуль дрейфа за
+        час, NaN для периода нулевой длительности.
+        """
+        holdover = self.columns["Disciplining"] == 0
+        edges = np.diff(np.concatenate(([False], holdover, [False])).astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+        
+        phase = self.columns["Phase"]
+        durations = (self.timestamps[ends] - self.timestamps[starts]) / np.timedelta64(1, 's')
+        drifts = phase[ends] - phase[starts]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(durations > 0, np.abs(drifts) / (durations / 3600), np.nan)
+        
+        return {
+            "start": starts,
+            "end": ends,
+            "duration": durations,
+            "phase_drift": drifts,
+            "drift_rate": rates
+        }
     
     def generate_analysis_report(self):
         """Генерация отчета анализа данных"""
         changes = self.analyze_changes()
+        periods = self.holdover_periods()
         report = []
         
         report.append("=== АНАЛИЗ ДАННЫХ ТЕСТИРОВАНИЯ ===\n")
-        report.append(f"Общее количество записей: {len(self.data)}")
+        report.append(f"Общее количество записей: {len(self)}")
         report.append(f"Количество изменений состояния: {len(changes)}\n")
         
         for i, change in enumerate(changes):
             report.append(f"Изменение {i+1}:")
             report.append(f"  Время: {change['date']}")
-            report.append(f"  Дисциплинирование: {change['disciplining']}")
-            report.append(f"  Tau: {change['tau']}")
+            report.append(f"  Дисциплинирование: {change['disciplining']:g}")
+            report.append(f"  Tau: {change['tau']:g}")
             report.append(f"  Длительность предыдущего состояния: {change['duration']:.0f} сек ({change['duration']/3600:.3f} ч)")
-            report.append(f"  Фаза в начале: {change['phase_start']}")
-            report.append(f"  Фаза в конце: {change['phase_end']}")
-            
-            # Анализ holdover периодов (когда дисциплинирование = 0)
-            if change['disciplining'] == '0':
-                try:
-                    phase_start = float(change['phase_start'])
-                    phase_end = float(change['phase_end'])
-                    phase_drift = abs(phase_end - phase_start)
-                    report.append(f"  Дрейф фазы за период holdover: {phase_drift:.0f} нс")
-                    
-                    if change['duration'] > 0:
-                        drift_rate = phase_drift / (change['duration'] / 3600)  # нс/час
-                        report.append(f"  Скорость дрейфа: {drift_rate:.2f} нс/час")
-                except ValueError:
-                    pass
-            
+            report.append(f"  Фаза в начале: {change['phase_start']:g}")
+            report.append(f"  Фаза в конце: {change['phase_end']:g}")
+            report.append("")
+        
+        # Анализ holdover периодов (когда дисциплинирование = 0)
+        report.append(f"Периодов holdover: {len(periods['start'])}\n")
+        for i, start in enumerate(periods['start'].tolist()):
+            report.append(f"Период holdover {i+1}:")
+            report.append(f"  Начало: {self.dates[start]}")
+            report.append(f"  Длительность: {periods['duration'][i]:.0f} сек ({periods['duration'][i]/3600:.3f} ч)")
+            if not np.isnan(periods['phase_drift'][i]):
+                report.append(f"  Дрейф фазы за период holdover: {abs(periods['phase_drift'][i]):.0f} нс")
+            if not np.isnan(periods['drift_rate'][i]):
+                report.append(f"  Скорость дрейфа: {periods['drift_rate'][i]:.2f} нс/час")
             report.append("")
         
         return "\n".join(report)
@@ -231,6 +496,13 @@ class MACMonitorGUI:
         self.test_active = False
         self.test_thread = None
         
+        # Фильтр Калмана фазы, частоты и дрейфа; шум процесса подбирается по ADEV,
+        # измеренной по фазе во время мониторинга (до измерений - значения по умолчанию)
+        self.clock_filter = None
+        self.phase_adev = None
+        if ClockKalmanFilter:
+            self.clock_filter = ClockKalmanFilter()
+        
         # Создание интерфейса
         self.create_menu()
         self.create_widgets()
@@ -338,6 +610,9 @@ class MACMonitorGUI:
         for param in MAC_COMMANDS_GET:
             item_id = self.params_tree.insert("", tk.END, values=(param, "—", "—", "—"))
             self.param_items[param] = item_id
+        if self.clock_filter:
+            for param in KALMAN_ROWS:
+                self.param_items[param] = self.params_tree.insert("", tk.END, values=(param, "—", "—", "—"))
     
     def create_settings_tab(self):
         """Создание вкладки настроек"""
@@ -573,10 +848,12 @@ class MACMonitorGUI:
             return
         
         timestamp = datetime.now().strftime("%H:%M:%S")
+        readings = {}
         
         for param in MAC_COMMANDS_GET:
             try:
                 value = self.get_parameter(param)
+                readings[f"raw_{param}"] = value
                 
                 # Определение единиц измерения
                 units = ""
@@ -593,6 +870,43 @@ class MACMonitorGUI:
                 
             except Exception as e:
                 self.log_message(f"Ошибка обновления {param}: {str(e)}")
+        
+        self.update_clock_filter(readings, timestamp)
+    
+    def update_clock_filter(self, readings, timestamp):
+        """Обновление оценки фильтра Калмана по Phase и LastCorrection"""
+        if not self.clock_filter:
+            return
+        
+        try:
+            state = self.clock_filter.update_from_parameters(time.monotonic(), readings)
+        except ValueError as e:
+            self.log_message(f"Ошибка фильтра Калмана: {str(e)}")
+            return
+        if not state['samples']:
+            return
+        self.update_process_noise(readings)
+        
+        rows = [
+            (f"{state['phase_ns']:.2f} ± {state['phase_std_ns']:.2f}", "нс"),
+            (f"{state['frequency']:.3e} ± {state['frequency_std']:.1e}", ""),
+            (f"{state['drift_per_day']:.2e} ± {state['drift_per_day_std']:.1e}", "1/сут")
+        ]
+        for param, (value, units) in zip(KALMAN_ROWS, rows):
+            self.params_tree.item(self.param_items[param], values=(param, value, units, timestamp))
+    
+    def update_process_noise(self, readings):
+        """Уточнение шума процесса фильтра по ADEV фазы, измеренной в цикле мониторинга"""
+        if not self.monitoring_active or not self.phase_adev:
+            return
+        try:
+            self.phase_adev.update(float(readings.get("raw_Phase")) * 1e-9)
+        except (TypeError, ValueError):
+            return
+        
+        if self.phase_adev.sample_count % KALMAN_ADEV_REFRESH == 0:
+            taus, adevs = measured_adev(self.phase_adev.results(), min_edf=KALMAN_ADEV_MIN_EDF)
+            self.clock_filter.refresh_process_noise(taus, adevs)
     
     def start_monitoring(self):
         """Запуск мониторинга"""
@@ -601,6 +915,8 @@ class MACMonitorGUI:
             return
         
         self.monitoring_active = True
+        if self.clock_filter:
+            self.phase_adev = StreamingAllanDeviation(tau0=self.update_interval.get(), input_type='phase')
         self.start_monitoring_btn.config(state=tk.DISABLED)
         self.stop_monitoring_btn.config(state=tk.NORMAL)
         
@@ -658,7 +974,16 @@ class MACMonitorGUI:
             self.log_test_message("Дисциплинирование остановлено")
             
             # Очистка данных теста
-            self.test_data.data = []
+            self.test_data.clear()
+            
+            # Модель дрейфа фазы для прогноза времени до PhaseLimit
+            drift_model = PhaseDriftModel() if PhaseDriftModel else None
+            phase_limit = None
+            if drift_model:
+                try:
+                    phase_limit = abs(float(self.get_parameter("PhaseLimit")))
+                except (TypeError, ValueError):
+                    self.log_test_message("PhaseLimit недоступен, прогноз отключен")
             
             start_time = time.time()
             
@@ -678,7 +1003,19 @@ class MACMonitorGUI:
                     
                     elapsed = time.time() - start_time
                     remaining = duration - elapsed
-                    self.test_status.config(text=f"Holdover тест: {remaining:.0f} сек осталось")
+                    status_text = f"Holdover тест: {remaining:.0f} сек осталось"
+                    
+                    if drift_model and phase_limit:
+                        try:
+                            drift_model.update(elapsed, float(phase))
+                        except (TypeError, ValueError):
+                            pass
+                        if drift_model.ready:
+                            limit_time = drift_model.time_to_limit(phase_limit)
+                            limit_text = "за горизонтом" if limit_time is None else f"{limit_time / 3600:.1f} ч"
+                            status_text += f", до ±{phase_limit:g} нс: {limit_text}"
+                    
+                    self.test_status.config(text=status_text)
                     
                     time.sleep(5)  # Интервал записи данных
                     
@@ -929,7 +1266,7 @@ class MACMonitorGUI:
     
     def save_test_data(self):
         """Сохранение данных теста"""
-        if not self.test_data.data:
+        if not len(self.test_data):
             messagebox.showwarning("Предупреждение", "Нет данных для сохранения")
             return
         
@@ -952,13 +1289,13 @@ class MACMonitorGUI:
         if filename:
             if self.test_data.load_from_csv(filename):
                 messagebox.showinfo("Успех", f"Данные загружены из {filename}")
-                self.log_message(f"Загружено {len(self.test_data.data)} записей из {filename}")
+                self.log_message(f"Загружено {len(self.test_data)} записей из {filename}")
             else:
                 messagebox.showerror("Ошибка", "Не удалось загрузить данные")
     
     def analyze_test_data(self):
         """Анализ данных теста"""
-        if not self.test_data.data:
+        if not len(self.test_data):
             messagebox.showwarning("Предупреждение", "Нет данных для анализа")
             return
         
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the log ingest engines
+Compares the text (open/readlines) and mmap engines of LogParser on the
+uploaded demo logs and on generated synthetic logs of a given size.
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# Add current directory to path for imports
+sys.path.append(str(Path(__file__).parent))
+
+from utils.log_parser import LogParser, INGEST_ENGINES
+
+
+def generate_synthetic_log(path: Path, size_mb: float, fmt: str = 'csv', seed: int = 0):
+    """Write a synthetic 1 s holdover log of roughly size_mb megabytes"""
+
+    rng = np.random.default_rng(seed)
+    separator = ',' if fmt == 'csv' else ' '
+    target = int(size_mb * 1024 * 1024)
+    block = 100000
+    start = 0
+
+    with open(path, 'w') as f:
+        f.write(f"# Synthetic SA5X holdover log ({fmt})\n")
+        while f.tell() < target:
+            t = np.arange(start, start + block, dtype=float)
+            freq = 1.2e-4 + 1e-10 * t + rng.normal(0, 1e-6, block)
+            temp = 25 + 0.5 * np.sin(t / 3600) + rng.normal(0, 0.05, block)
+            rows = np.column_stack((t, freq, temp, np.full(block, 12.0), np.full(block, 0.15)))
+            lines = [separator.join(values) + separator + 'LOCKED'
+                     for values in np.char.mod(['%.1f', '%.6e', '%.2f', '%.1f', '%.2f'], rows).tolist()]
+            f.write('\n'.join(lines) + '\n')
+            start += block
+
+
+def time_engine(parser: LogParser, log_file: str, engine: str, measure_memory: bool):
+    """Load a log with one engine; returns (seconds, rows, peak MB or None)"""
+
+    if measure_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    rows = sum(chunk['count'] for chunk in parser.iter_log_chunks(log_file, engine=engine))
+    elapsed = time.perf_counter() - start
+    peak = None
+    if measure_memory:
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return elapsed, rows, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark LogParser ingest engines')
+    parser.add_argument('files', nargs='*', help='Log files to benchmark (default: uploads/*)')
+    parser.add_argument('--synthetic-mb', type=float, nargs='*', default=[64],
+                       help='Sizes of generated synthetic logs in MB (e.g. 64 1024 4096)')
+    parser.add_argument('--format', choices=['csv', 'whitespace'], default='csv',
+                       help='Format of synthetic logs')
+    parser.add_argument('--memory', action='store_true',
+                       help='Also report peak Python allocations (slower)')
+    args = parser.parse_args()
+
+    log_parser = LogParser()
+    files = args.files or sorted(str(p) for p in (Path(__file__).parent / 'uploads').glob('*') if p.is_file())
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size_mb in args.synthetic_mb or []:
+            path = Path(temp_dir) / f'synthetic_{size_mb:g}mb.log'
+            print(f"Generating {path.name}...", file=sys.stderr)
+            generate_synthetic_log(path, size_mb, args.format)
+            files.append(str(path))
+
+        print(f"{'File':<36} {'MB':>8} {'Rows':>10} " +
+              " ".join(f"{engine + ', s':>10}" for engine in INGEST_ENGINES) + f" {'Speedup':>8}")
+        for log_file in files:
+            timings = {}
+            for engine in INGEST_ENGINES:
+                elapsed, rows, peak = time_engine(log_parser, log_file, engine, args.memory)
+                timings[engine] = elapsed
+                if peak is not None:
+                    print(f"  {engine}: peak {peak:.1f} MB", file=sys.stderr)
+            size = Path(log_file).stat().st_size / 1e6
+            speedup = timings['text'] / timings['mmap'] if timings['mmap'] > 0 else float('nan')
+            print(f"{Path(log_file).name:<36} {size:>8.1f} {rows:>10} " +
+                  " ".join(f"{timings[engine]:>10.3f}" for engine in INGEST_ENGINES) + f" {speedup:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
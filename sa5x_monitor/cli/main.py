@@ -8,6 +8,7 @@ import argparse
 import sys
 import time
 import logging
+import math
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -15,8 +16,11 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.sa5x_controller import SA5XController
 from utils.holdover_test import HoldoverTest
-from utils.log_parser import LogParser
+from utils.log_parser import LogParser, expand_log_paths
 from utils.config_manager import ConfigManager
+from utils.clock_kalman import ClockKalmanFilter, measured_adev
+from utils.stability import FREQUENCY_UNIT_SCALE, StreamingAllanDeviation
+from utils.multi_device import analyze_logs
 
 
 def setup_logging(verbose=False):
@@ -32,6 +36,84 @@ def setup_logging(verbose=False):
     )
 
 
+def print_multiple_log_results(parser, log_files, args):
+    """Analyze several logs in parallel and print one summary line per file"""
+    
+    def progress(completed, total, log_file):
+        print(f"[{completed}/{total}] {log_file}", file=sys.stderr)
+    
+    all_results = parser.parse_multiple_logs(log_files, max_workers=args.workers,
+                                             progress_callback=progress, streaming=args.streaming)
+    
+    print(f"{'File':<40} {'Duration, s':>12} {'Freq Stab.':>11} {'ADEV(1s)':>10} {'Mask':>6}")
+    failed = 0
+    for log_file, results in all_results.items():
+        if 'error' in results:
+            failed += 1
+            print(f"{log_file:<40} ERROR: {results['error']}")
+            continue
+        compliance = results.get('compliance')
+        verdict = ('PASS' if compliance['passed'] else 'FAIL') if compliance else '-'
+        print(f"{log_file:<40} {results['duration']:>12.1f} {results['freq_stability']:>11.2e} "
+              f"{results['allan_deviation']:>10.2e} {verdict:>6}")
+    print(f"Parsed {len(all_results) - failed} of {len(all_results)} logs")
+
+
+def follow_log(parser, log_file, args):
+    """Tail a growing log and print the live analysis after each batch of new lines"""
+    
+    print(f"Following {log_file} (Ctrl+C to stop)")
+    try:
+        for chunk, results in parser.tail_holdover_log(log_file, poll_interval=args.poll_interval):
+            compliance = results.get('compliance')
+            verdict = ('PASS' if compliance['passed'] else 'FAIL') if compliance else '-'
+            print(f"\rSamples: {results['measurement_count']}, Duration: {results['duration']:.0f}s, "
+                  f"Freq Stab.: {results['freq_stability']:.2e}, ADEV(1s): {results['allan_deviation']:.2e}, "
+                  f"Mask: {verdict}", end='', flush=True)
+    except KeyboardInterrupt:
+        print("\nFollowing stopped by user")
+
+
+def print_spectrum(parser, log_file, args):
+    """Print the phase PSD at about five points per decade and the noise type per tau"""
+    
+    spectrum = parser.analyze_spectrum(log_file, segment_length=args.psd_segment)
+    print(f"Phase Spectrum: {spectrum['segments']} segments, resolution {spectrum['resolution'] or 0:.3e} Hz"
+          f" ({spectrum['skipped_segments']} skipped for gaps)")
+    
+    frequencies = spectrum['frequencies']
+    if frequencies:
+        print(f"{'f, Hz':>11} {'S_x, s²/Hz':>12} {'S_y, 1/Hz':>12} {'L(f), dBc/Hz':>13}")
+        next_frequency = 0.0
+        for i, frequency in enumerate(frequencies):
+            if frequency < next_frequency:
+                continue
+            next_frequency = frequency * 10 ** 0.2
+            print(f"{frequency:>11.3e} {spectrum['phase_psd'][i]:>12.3e} {spectrum['frequency_psd'][i]:>12.3e} "
+                  f"{spectrum['phase_noise_dbc'][i]:>13.1f}")
+    
+    print(f"{'Tau, s':>10} {'Alpha':>6}  Noise Type")
+    for noise in spectrum['noise_types']:
+        print(f"{noise['tau']:>10g} {noise['alpha']:>6.2f}  {noise['noise_type']}")
+
+
+def print_cornered_hat(config, log_files):
+    """Print pairwise and per-unit Allan deviations of logs recorded against the same reference"""
+    
+    hat = analyze_logs(log_files, config)
+    print(f"N-Cornered Hat: {hat['units']} units, {hat['grid_points']} grid points at {hat['step']:g}s")
+    for unit, log_file in enumerate(hat['log_files']):
+        print(f"  Unit {unit}: {log_file}")
+    
+    pair_names = [f"{i}-{j}" for i, j in hat['pairs']]
+    print(f"{'Tau, s':>10}" + "".join(f" {f'Unit {unit}':>10}" for unit in range(hat['units']))
+          + "".join(f" {f'Pair {name}':>10}" for name in pair_names))
+    for k, tau in enumerate(hat['taus']):
+        units = "".join(f" {'-' if math.isnan(dev) else f'{dev:.2e}':>10}" for dev in hat['unit_adev'][k])
+        pairs = "".join(f" {'-' if math.isnan(dev) else f'{dev:.2e}':>10}" for dev in hat['pair_adev'][k])
+        print(f"{tau:>10g}" + units + pairs)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='SA5X Rubidium Generator Monitor and Test Suite',
@@ -41,6 +123,10 @@ Examples:
   %(prog)s --port /dev/ttyS6 --monitor
   %(prog)s --port /dev/ttyS6 --holdover-test --duration 3600
   %(prog)s --parse-log holdover_log.txt
+  %(prog)s --parse-log archive/ "runs/*.log" --workers 8
+  %(prog)s --parse-log holdover_log.txt --follow
+  %(prog)s --parse-log holdover_log.txt --psd
+  %(prog)s --parse-log unit_a.log unit_b.log unit_c.log --hat
         """
     )
     
@@ -56,8 +142,24 @@ Examples:
                        help='Start continuous monitoring')
     parser.add_argument('--holdover-test', action='store_true',
                        help='Run holdover test')
-    parser.add_argument('--parse-log', metavar='FILE',
-                       help='Parse existing holdover log file')
+    parser.add_argument('--parse-log', metavar='PATH', nargs='+',
+                       help='Parse existing holdover log files, glob patterns or directories')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for parsing several logs (default: one per core)')
+    parser.add_argument('--engine', choices=['text', 'mmap'], default=None,
+                       help='Log ingest engine (default: analysis.ingest_engine)')
+    parser.add_argument('--streaming', action='store_true', default=None,
+                       help='Analyze the log in chunks with bounded memory (default: by file size)')
+    parser.add_argument('--follow', '-f', action='store_true',
+                       help='Keep reading a growing log and update the analysis as lines arrive')
+    parser.add_argument('--poll-interval', type=float, default=None,
+                       help='Seconds between checks for new lines with --follow (default: analysis.tail_poll_interval)')
+    parser.add_argument('--psd', action='store_true',
+                       help='Print the phase/frequency PSD and noise types of the log')
+    parser.add_argument('--psd-segment', type=int, default=None,
+                       help='Samples per Welch segment with --psd (default: analysis.psd_segment_length)')
+    parser.add_argument('--hat', action='store_true',
+                       help='Separate per-unit Allan deviation of three or more simultaneous logs (N-cornered hat)')
     
     # Test parameters
     parser.add_argument('--duration', type=int, default=3600,
@@ -82,16 +184,56 @@ Examples:
     try:
         # Load configuration
         config = ConfigManager(args.config)
+        if args.engine:
+            config.set('analysis.ingest_engine', args.engine, save=False)
         
         if args.parse_log:
+            parser = LogParser(config)
+            log_files = expand_log_paths(args.parse_log)
+            if not log_files:
+                logger.error("No log files found")
+                sys.exit(1)
+            
+            if args.hat:
+                print_cornered_hat(config, log_files)
+                return
+            
+            if len(log_files) > 1:
+                print_multiple_log_results(parser, log_files, args)
+                return
+            
+            if args.follow:
+                follow_log(parser, log_files[0], args)
+                return
+            
+            if args.psd:
+                print_spectrum(parser, log_files[0], args)
+                return
+            
             # Parse existing log file
-            parser = LogParser()
-            results = parser.parse_holdover_log(args.parse_log)
+            results = parser.parse_holdover_log(log_files[0], streaming=args.streaming)
             print("Holdover Test Results:")
             print(f"Duration: {results['duration']:.2f} seconds")
             print(f"Frequency Stability: {results['freq_stability']:.2e}")
             print(f"Allan Deviation: {results['allan_deviation']:.2e}")
             print(f"Temperature Stability: {results['temp_stability']:.3f}°C")
+            drift = results.get('drift_model') or {}
+            if 'time_to_limit' in drift:
+                limit_time = drift['time_to_limit']
+                print(f"Aging: {drift['aging_per_day']:.2e}/day, time to ±{drift['phase_limit_ns']:g} ns: "
+                      f"{'beyond horizon' if limit_time is None else f'{limit_time / 3600:.1f} h'}")
+            thermal = results.get('thermal') or {}
+            if 'sensitivity' in thermal:
+                print(f"Temperature Sensitivity: {thermal['sensitivity_ppb_per_c']:.3f} ppb/°C "
+                      f"(lag {thermal['lag']:.0f}s, r={thermal['correlation']:.2f})")
+            quality = results.get('data_quality')
+            if quality:
+                print(f"Data Coverage: {quality['coverage'] * 100:.2f}% "
+                      f"({quality['gap_count']} gaps, {quality['restarts']} restarts)")
+            compliance = results.get('compliance')
+            if compliance:
+                verdict = 'PASS' if compliance['passed'] else 'FAIL'
+                print(f"Mask Compliance ({compliance['mask']}): {verdict}")
             return
         
         if not args.port:
@@ -119,13 +261,31 @@ Examples:
         elif args.monitor:
             # Start continuous monitoring
             logger.info("Starting continuous monitoring")
+            clock_filter = ClockKalmanFilter.from_config(config)
+            units = config.get('analysis.frequency_error_units', 'ppm')
+            scale = FREQUENCY_UNIT_SCALE[units]
+            
+            # Live ADEV of the fractional frequency; the filter's process noise is refitted to it
+            allan = StreamingAllanDeviation(tau0=args.interval,
+                                            max_octaves=config.get('analysis.streaming_allan_octaves', 12))
+            refresh_samples = config.get('kalman.adev_refresh_samples', 60)
             try:
                 while True:
                     status = controller.get_status()
                     freq_error = controller.get_frequency_error()
                     temperature = controller.get_temperature()
                     
-                    print(f"\rStatus: {status}, Freq Error: {freq_error:.2e}, Temp: {temperature:.2f}°C", 
+                    filtered = ""
+                    if clock_filter:
+                        allan.update(freq_error * scale)
+                        if allan.sample_count % refresh_samples == 0:
+                            taus, adevs = measured_adev(allan.results(), min_edf=config.get('kalman.adev_min_edf', 10))
+                            clock_filter.refresh_process_noise(taus, adevs, config.get('kalman.adev_min_points', 2))
+                        
+                        state = clock_filter.update_from_parameters(time.monotonic(), {'frequency_error': freq_error}, units)
+                        filtered = f" (filtered {state['frequency'] / scale:.2e} ± {state['frequency_std'] / scale:.1e} {units})"
+                    
+                    print(f"\rStatus: {status}, Freq Error: {freq_error:.2e} {units}{filtered}, Temp: {temperature:.2f}°C", 
                           end='', flush=True)
                     
                     time.sleep(args.interval)
@@ -0,0 +1,75 @@
+"""
+Tests for the analysis cache
+"""
+
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.analysis_cache import AnalysisCache
+from utils.log_parser import LogParser
+
+
+def write_log(path, count=100, freq='1.0e-4'):
+    """Write a small CSV holdover log"""
+    path.write_text("".join(f"{i}.0,{freq},25.0,12.0,0.5,LOCKED\n" for i in range(count)))
+    return str(path)
+
+
+class TestAnalysisCache:
+    """Test content-addressed caching"""
+
+    def test_content_addressed(self, tmp_path):
+        """Test copies of a log share an entry and options change the key"""
+        cache = AnalysisCache(str(tmp_path / 'cache'))
+        first = write_log(tmp_path / 'a.log')
+        copy = write_log(tmp_path / 'b.log')
+        other = write_log(tmp_path / 'c.log', freq='2.0e-4')
+
+        cache.put(first, {'units': 'ppm'}, {'results': {'value': 1}})
+
+        assert cache.get(copy, {'units': 'ppm'}) == {'results': {'value': 1}}
+        assert cache.get(copy, {'units': 'ppb'}) is None
+        assert cache.get(other, {'units': 'ppm'}) is None
+
+    def test_lru_eviction(self, tmp_path):
+        """Test least recently used entries are evicted first"""
+        cache = AnalysisCache(str(tmp_path / 'cache'), max_size_mb=0.25)
+        logs = [write_log(tmp_path / f'{i}.log', freq=f'{i}.0e-4') for i in range(3)]
+        payload = {'data': b'x' * 100000}
+
+        cache.put(logs[0], {}, payload)
+        cache.put(logs[1], {}, payload)
+        for age, log_file in enumerate(logs[:2]):
+            os.utime(cache._entry_path(cache.key(log_file, {})), (age, age))
+        cache.get(logs[0], {})
+        cache.put(logs[2], {}, payload)
+
+        assert cache.get(logs[0], {}) is not None
+        assert cache.get(logs[1], {}) is None
+        assert cache.get(logs[2], {}) is not None
+        assert cache.size() <= cache.max_size
+
+    def test_parser_uses_cache(self, tmp_path):
+        """Test repeated analysis is served from the cache"""
+        log_file = write_log(tmp_path / 'run.log')
+        parser = LogParser()
+        parser.cache = AnalysisCache(str(tmp_path / 'cache'))
+
+        arrays, results = parser.load_and_analyze(log_file)
+        assert len(list(parser.cache.cache_dir.glob('*.pkl'))) == 1
+
+        parser.load_log_arrays = None  # a cache miss would fail here
+        cached_arrays, cached_results = parser.load_and_analyze(log_file)
+
+        assert cached_results['measurement_count'] == results['measurement_count'] == 100
+        assert (cached_arrays['frequency_error'] == arrays['frequency_error']).all()
+        assert parser.parse_stats['format'] == 'csv'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
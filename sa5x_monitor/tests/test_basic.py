@@ -5,6 +5,7 @@ Basic tests for SA5X Monitor
 import pytest
 import sys
 import os
+import numpy as np
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -52,6 +53,17 @@ class TestConfigManager:
         # Test getting non-existent value
         assert config.get('non.existent', 'default') == 'default'
     
+    def test_config_set_in_memory(self, tmp_path):
+        """Test save=False leaves the config file untouched, even for a missing section"""
+        config_file = tmp_path / 'config.json'
+        config_file.write_text('{"serial": {"port": "/dev/ttyUSB0"}}')
+        config = ConfigManager(str(config_file))
+        del config.config['analysis']
+        
+        config.set('analysis.ingest_engine', 'mmap', save=False)
+        assert config.get('analysis.ingest_engine') == 'mmap'
+        assert config_file.read_text() == '{"serial": {"port": "/dev/ttyUSB0"}}'
+    
     def test_config_validation(self):
         """Test configuration validation"""
         config = ConfigManager()
@@ -104,6 +116,184 @@ class TestLogParser:
         assert result['timestamp'] == 1234567890.123
         assert result['frequency_error'] == 1.23e-9
         assert result['temperature'] == 25.5
+    
+    def test_parse_log_file_sniffs_format(self, tmp_path):
+        """Test format sniffing and unparsable line counting"""
+        parser = LogParser()
+        log_file = tmp_path / 'holdover.log'
+        log_file.write_text(
+            "# header\n"
+            "[0.0] 1.0e-9 25.0 12.0 0.5 LOCKED\n"
+            "garbage line\n"
+            "[10.0] 1.1e-9 25.1 12.0 0.5 LOCKED\n"
+            "20.0,1.2e-9,25.2,12.0,0.5,HOLDOVER\n"
+        )
+        
+        measurements = parser._parse_log_file(str(log_file))
+        
+        assert len(measurements) == 3
+        assert measurements[1]['timestamp'] == 10.0
+        assert measurements[2]['status'] == 'HOLDOVER'
+        assert parser.parse_stats['format'] == 'bracketed'
+        assert parser.parse_stats['unparsed_lines'] == 1
+        assert parser.parse_stats['unparsed_samples'][0][0] == 3
+    
+    def test_load_log_arrays(self, tmp_path):
+        """Test bulk column loading matches the line parser"""
+        parser = LogParser()
+        log_file = tmp_path / 'holdover.log'
+        lines = [f"{i}.0,{1e-9 * i},25.0,12.0,0.5,{'HOLDOVER' if i % 3 else 'LOCKED'}" for i in range(50)]
+        log_file.write_text("# header\n" + "\n".join(lines[:20]) + "\nbad,line\n" + "\n".join(lines[20:]) + "\n")
+        
+        arrays = parser.load_log_arrays(str(log_file))
+        measurements = parser._parse_log_file(str(log_file))
+        
+        assert arrays['count'] == 50
+        assert arrays['frequency_error'].dtype == np.float64
+        np.testing.assert_allclose(arrays['frequency_error'], [m['frequency_error'] for m in measurements])
+        labels = [arrays['status_labels'][code] for code in arrays['status']]
+        assert labels == [m['status'] for m in measurements]
+        assert parser.parse_stats['unparsed_lines'] == 1
+        assert parser.parse_stats['unparsed_samples'][0][0] == 22
+    
+    def test_mmap_engine_matches_text(self, tmp_path):
+        """Test the mmap engine gives the text engine's columns and line accounting"""
+        parser = LogParser()
+        log_file = tmp_path / 'holdover.log'
+        lines = [f"[{i}.0] {1e-9 * i} 25.0 12.0 0.5 {'HOLDOVER' if i // 10 % 2 else 'LOCKED'}" for i in range(300)]
+        lines.insert(150, "# restart")
+        lines.insert(200, "[x] broken")
+        log_file.write_text("\n".join(lines))
+        
+        chunks = {}
+        stats = {}
+        for engine in ('text', 'mmap'):
+            chunks[engine] = list(parser.iter_log_chunks(str(log_file), chunk_chars=2048, engine=engine))
+            stats[engine] = parser.parse_stats
+        
+        for name in ('timestamp', 'frequency_error'):
+            np.testing.assert_array_equal(np.concatenate([c[name] for c in chunks['mmap']]),
+                                          np.concatenate([c[name] for c in chunks['text']]))
+        statuses = {engine: [c['status_labels'][code] for c in chunks[engine] for code in c['status']]
+                    for engine in chunks}
+        assert statuses['mmap'] == statuses['text']
+        assert stats['mmap']['unparsed_samples'] == stats['text']['unparsed_samples'] == [(201, '[x] broken')]
+        assert stats['mmap']['format'] == 'bracketed'
+    
+    def test_non_finite_lines_are_unparsed(self, tmp_path):
+        """Test nan/inf values and negative timestamps are counted as unparsed by every path"""
+        parser = LogParser()
+        log_file = tmp_path / 'holdover.log'
+        lines = [f"{i}.0,{1e-9 * (i % 7)},25.0,12.0,0.5,LOCKED" for i in range(200)]
+        lines[50] = "50.0,nan,25.0,12.0,0.5,LOCKED"
+        lines[120] = "120.0,1e-9,inf,12.0,0.5,LOCKED"
+        lines[150] = "-150.0,1e-9,25.0,12.0,0.5,LOCKED"
+        log_file.write_text("\n".join(lines) + "\n")
+        
+        assert len(parser._parse_log_file(str(log_file))) == 197
+        for engine in ('text', 'mmap'):
+            arrays = parser._collect_chunks(parser.iter_log_chunks(str(log_file), engine=engine), 200)
+            assert arrays['count'] == 197
+            assert np.isfinite(arrays['frequency_error']).all() and np.isfinite(arrays['temperature']).all()
+            assert [line for line, _ in parser.parse_stats['unparsed_samples']] == [51, 121, 151]
+        
+        results = parser.parse_holdover_log(str(log_file))
+        assert np.isfinite(results['freq_stability']) and np.isfinite(results['allan_deviation'])
+    
+    def test_streaming_matches_in_memory(self, tmp_path):
+        """Test chunked analysis gives the in-memory report"""
+        parser = LogParser()
+        log_file = tmp_path / 'holdover.log'
+        rng = np.random.default_rng(7)
+        times = np.cumsum(rng.choice([1.0, 1.0, 0.5, 3.0], size=3000))
+        log_file.write_text("".join(
+            f"{t:.1f},{1e-4 + 1e-6 * rng.normal():.6e},{25 + rng.normal():.2f},12.0,0.15,"
+            f"{'LOCKED' if i % 5 else 'HOLDOVER'}\n" for i, t in enumerate(times)))
+        
+        in_memory = parser.parse_holdover_log(str(log_file), streaming=False)
+        streamed = parser.analyze_log_streaming(str(log_file), chunk_chars=4096)
+        
+        for key in ('freq_stability', 'freq_drift_rate', 'temp_drift_rate', 'voltage_mean', 'duration'):
+            assert streamed[key] == pytest.approx(in_memory[key])
+        assert streamed['status_distribution'] == in_memory['status_distribution']
+        for tau, value in streamed['allan_deviations'].items():
+            assert value == pytest.approx(in_memory['allan_deviations'][tau])
+        for tau, value in streamed['mtie'].items():
+            assert value == pytest.approx(in_memory['mtie'][tau])
+    
+    def test_follow_partial_lines_and_rotation(self, tmp_path):
+        """Test tailing holds back partial lines and reopens a rotated log"""
+        parser = LogParser()
+        log_file = tmp_path / 'live.log'
+        log_file.write_text("".join(f"{i}.0,1.0e-4,25.0,12.0,0.5,LOCKED\n" for i in range(20)) + "20.0,1.0e-4")
+        
+        chunks = parser.follow(str(log_file), poll_interval=0.01)
+        assert list(next(chunks)['timestamp']) == [float(i) for i in range(20)]
+        
+        with open(log_file, 'a') as f:
+            f.write(",25.0,12.0,0.5,HOLDOVER\n21.0,1.0e-4,25.0,12.0,0.5,HOLDOVER\n")
+        chunk = next(chunks)
+        assert list(chunk['timestamp']) == [20.0, 21.0]
+        assert [chunk['status_labels'][code] for code in chunk['status']] == ['HOLDOVER', 'HOLDOVER']
+        
+        log_file.rename(tmp_path / 'live.log.1')
+        log_file.write_text("[22.0] 1.0e-4 25.0 12.0 0.5 LOCKED\n")
+        assert list(next(chunks)['timestamp']) == [22.0]
+        chunks.close()
+        
+        tail = parser.follow(str(log_file), poll_interval=0.01, from_start=False)
+        with open(log_file, 'a') as f:
+            f.write("[23.0] 1.0e-4 25.0 12.0 0.5 LOCKED\n")
+        assert list(next(tail)['timestamp']) == [23.0]
+        tail.close()
+    
+    def test_tail_updates_incrementally(self, tmp_path):
+        """Test the live report over appended lines matches a full parse"""
+        parser = LogParser()
+        log_file = tmp_path / 'live.log'
+        rng = np.random.default_rng(3)
+        lines = [f"{i}.0,{1e-4 + 1e-6 * rng.normal():.6e},{25 + rng.normal():.2f},12.0,0.15,LOCKED\n"
+                 for i in range(600)]
+        log_file.write_text("".join(lines[:5]))
+        
+        updates = parser.tail_holdover_log(str(log_file), poll_interval=0.01)
+        with open(log_file, 'a') as f:
+            f.write("".join(lines[5:300]))
+        chunk, results = next(updates)
+        assert results['measurement_count'] == 300
+        
+        with open(log_file, 'a') as f:
+            f.write("".join(lines[300:]))
+        chunk, results = next(updates)
+        updates.close()
+        
+        expected = parser.parse_holdover_log(str(log_file), streaming=False)
+        assert chunk['count'] == 300
+        for key in ('measurement_count', 'freq_stability', 'freq_drift_rate', 'temp_stability'):
+            assert results[key] == pytest.approx(expected[key])
+        for tau, value in expected['allan_deviations'].items():
+            assert results['allan_deviations'][tau] == pytest.approx(value)
+    
+    def test_parse_multiple_logs_parallel(self, tmp_path):
+        """Test process pool parsing isolates failing files"""
+        from utils.log_parser import expand_log_paths
+        
+        for name in ('a.log', 'b.log'):
+            (tmp_path / name).write_text("".join(f"{i}.0,1.0e-4,25.0,12.0,0.5,LOCKED\n" for i in range(100)))
+        (tmp_path / 'bad.log').write_text("not a log\n")
+        (tmp_path / 'notes.md').write_text("ignored\n")
+        
+        log_files = expand_log_paths([str(tmp_path), str(tmp_path / '*.log')])
+        assert [Path(f).name for f in log_files] == ['a.log', 'b.log', 'bad.log']
+        
+        progress = []
+        results = LogParser().parse_multiple_logs(log_files, max_workers=2,
+                                                  progress_callback=lambda done, total, f: progress.append(done))
+        
+        assert list(results) == log_files
+        assert results[log_files[0]]['measurement_count'] == 100
+        assert 'error' in results[log_files[2]]
+        assert progress == [1, 2, 3]
 
 
 class TestHoldoverTest:
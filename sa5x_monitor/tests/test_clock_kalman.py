@@ -0,0 +1,127 @@
+"""
+Tests for the Kalman clock-state tracker
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.clock_kalman import ClockKalmanFilter, measured_adev, process_noise_from_adev, ADEV_NOISE_TERMS
+from utils.stability import StreamingAllanDeviation
+
+
+class StubConfig:
+    """Minimal dotted-key config"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+def simulate_clock(count, dt=1.0, frequency=2e-11, drift=1e-16, white_fm=1e-22, phase_noise=1.0, seed=1):
+    """Phase readings (ns) and the true fractional frequency of a drifting clock"""
+    rng = np.random.default_rng(seed)
+    phase = np.empty(count)
+    truth = np.empty(count)
+    x, y = 0.0, frequency
+    for i in range(count):
+        phase[i] = x * 1e9 + rng.normal(0, phase_noise)
+        truth[i] = y
+        x += y * dt + rng.normal(0, np.sqrt(white_fm * dt))
+        y += drift * dt
+    return phase, truth
+
+
+class TestClockKalmanFilter:
+    """Test the ADEV fit, tracking and parameter handling"""
+
+    def test_process_noise_from_adev(self):
+        """Test an ADEV curve built from known coefficients is fitted exactly"""
+        taus = np.logspace(0, 5, 11)
+        q = np.array([1e-22, 1e-28, 1e-38])
+        adevs = np.sqrt(sum(coefficient * term(taus) for coefficient, term in zip(q, ADEV_NOISE_TERMS)))
+        np.testing.assert_allclose(process_noise_from_adev(taus, adevs), q, rtol=1e-6)
+
+        # Falling faster than white FM: the other terms would need negative coefficients
+        q_white, q_walk, q_drift = process_noise_from_adev([1, 10, 100], [1e-11, 3e-12, 5e-13])
+        assert q_white > 0 and q_walk == 0 and q_drift == 0
+
+        with pytest.raises(ValueError):
+            process_noise_from_adev([1, 10], [1e-11])
+
+    def test_tracks_simulated_clock(self):
+        """Test phase readings give frequency within a few sigma of the truth"""
+        phase, truth = simulate_clock(3000)
+        clock_filter = ClockKalmanFilter(q_white_fm=1e-22, q_random_walk_fm=1e-30, q_drift=1e-40)
+        for i, reading in enumerate(phase):
+            state = clock_filter.update(float(i), reading)
+
+        assert state['samples'] == 3000
+        assert abs(state['frequency'] - truth[-1]) < 4 * state['frequency_std']
+        assert abs(state['normalized_innovation']) < 5
+        assert np.allclose(state['covariance'], np.transpose(state['covariance']))
+
+    def test_corrections_and_frequency_readings(self):
+        """Test controller samples use Phase, else frequency_error, and LastCorrection steps"""
+        clock_filter = ClockKalmanFilter(correction_scale=1e-12)
+        clock_filter.update_from_parameters(0.0, {'raw_Phase': '10', 'raw_LastCorrection': '5'})
+        state = clock_filter.update_from_parameters(1.0, {'raw_Phase': 'Ошибка', 'raw_LastCorrection': '7',
+                                                          'frequency_error': 1e-5}, 'ppm')
+        assert state['samples'] == 2
+        assert state['frequency'] == pytest.approx(1e-11, rel=0.05)
+        assert state['phase_ns'] == pytest.approx(10.0, abs=1.0)
+
+        # A 2-unit correction steps the predicted frequency by 2e-12
+        before = clock_filter.results()['frequency']
+        clock_filter.update_from_parameters(1.0, {'raw_LastCorrection': '9'})
+        assert clock_filter.results()['frequency'] == pytest.approx(before + 2e-12)
+
+        with pytest.raises(ValueError):
+            clock_filter.update(0.5, 10.0)
+        clock_filter.reset()
+        assert clock_filter.results()['samples'] == 0
+
+    def test_from_config(self):
+        """Test the filter is built from the kalman section or disabled"""
+        assert ClockKalmanFilter.from_config(StubConfig({'kalman.enabled': False})) is None
+        clock_filter = ClockKalmanFilter.from_config(StubConfig({
+            'kalman.enabled': True,
+            'kalman.adev': {'1': 1e-11, '10': 3.16e-12},
+            'kalman.phase_noise_ns': 2.0
+        }))
+        assert clock_filter.phase_variance == 4.0
+        assert clock_filter.q[0] == pytest.approx(1e-22 * 1e18, rel=0.01)
+
+        # A measured curve takes precedence over the table
+        measured = (np.array([1.0, 10.0]), np.array([2e-11, 6.32e-12]))
+        clock_filter = ClockKalmanFilter.from_config(StubConfig({'kalman.enabled': True}), measured)
+        assert clock_filter.q[0] == pytest.approx(4e-22 * 1e18, rel=0.01)
+
+    def test_process_noise_from_measured_adev(self):
+        """Test the process noise is refitted to a streaming ADEV of white FM"""
+        rng = np.random.default_rng(3)
+        estimator = StreamingAllanDeviation(tau0=1.0, max_octaves=8)
+        estimator.update_many(rng.normal(0, 1e-11, 20000))
+
+        taus, adevs = measured_adev(estimator.results(), min_edf=10)
+        assert len(taus) >= 4 and np.all(np.diff(taus) > 0)
+
+        clock_filter = ClockKalmanFilter()
+        assert clock_filter.refresh_process_noise(taus, adevs)
+        assert clock_filter.q[0] == pytest.approx(1e-22 * 1e18, rel=0.1)
+        assert not clock_filter.refresh_process_noise(taus[:1], adevs[:1])
+
+        # Log results map tau to deviation in log units; unavailable points are 0.0
+        taus, adevs = measured_adev({1: 1e-5, 10: 0.0, 100: 1e-6}, scale=1e-6)
+        np.testing.assert_allclose(taus, [1, 100])
+        np.testing.assert_allclose(adevs, [1e-11, 1e-12])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
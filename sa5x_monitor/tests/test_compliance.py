@@ -0,0 +1,86 @@
+"""
+Tests for mask compliance checking
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.compliance import ComplianceChecker, mask_limits, BUILTIN_MASKS
+
+
+class DictConfig:
+    """Minimal stand-in for ConfigManager.get"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key_path, default=None):
+        return self.values.get(key_path, default)
+
+
+class TestComplianceChecker:
+    """Test compliance checker"""
+
+    def test_mask_limits(self):
+        """Test piecewise mask evaluation"""
+        limits = mask_limits(BUILTIN_MASKS['G.812-I']['mtie'], [0.05, 1, 100, 1000, 20000])
+
+        assert np.isnan(limits[0])
+        assert limits[1] == pytest.approx(24.0)
+        assert limits[2] == pytest.approx(80.0)
+        assert limits[3] == pytest.approx(160.0)
+        assert np.isnan(limits[4])
+
+    def test_evaluate_pass_and_fail(self):
+        """Test evaluation of quiet and drifting phase records"""
+        checker = ComplianceChecker()
+        quiet = np.zeros(2000)
+        drifting = np.linspace(0, 5000, 2000)
+
+        passed = checker.evaluate(quiet, 1.0, 'G.8262-EEC1')
+        failed = checker.evaluate(drifting, 1.0, 'G.8262-EEC1')
+
+        assert passed['passed'] is True
+        assert failed['passed'] is False
+        assert failed['mtie']['worst_margin'] < 0
+        assert all('margin' in point for point in failed['mtie']['points'])
+
+    def test_user_defined_mask(self):
+        """Test masks loaded from configuration"""
+        config = DictConfig({'compliance.masks': {
+            'flat-100ns': {'mtie': [{'tau_min': 0, 'offset': 100.0}]}
+        }})
+        checker = ComplianceChecker(config)
+
+        assert 'flat-100ns' in checker.list_masks()
+        result = checker.evaluate_curves('flat-100ns', [1, 10], mtie=[50.0, 150.0])
+        assert result['passed'] is False
+        assert result['mtie']['points'][0]['margin'] == pytest.approx(50.0)
+
+    def test_unknown_mask(self):
+        """Test unknown mask names are rejected"""
+        with pytest.raises(ValueError):
+            ComplianceChecker().get_mask('missing')
+
+    def test_live_monitor_detects_violation(self):
+        """Test incremental MTIE check reports the first violation"""
+        monitor = ComplianceChecker().live_monitor('G.8262-EEC1', 1.0, taus=[1, 10, 100])
+
+        violation = None
+        for i in range(200):
+            violation = monitor.update(i * 10.0) or violation
+            if violation:
+                break
+
+        assert violation is not None
+        assert violation['tau'] == 10
+        assert violation['mtie'] > violation['limit']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,88 @@
+"""
+Tests for compressed log support
+"""
+
+import gzip
+import lzma
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.compressed_log import BackgroundDecompressor, detect_compression, estimate_content_size
+from utils.log_parser import LogParser, expand_log_paths
+
+
+LOG_TEXT = "# header\n" + "".join(
+    f"{i}.0,{1e-9 * i:.3e},25.0,12.0,0.5,{'LOCKED' if i % 7 else 'HOLDOVER'}\n" for i in range(2000)
+) + "2000.0,2.0e-6,25.0,12.0,0.5,LOCKED"
+
+
+@pytest.fixture
+def logs(tmp_path):
+    """The same log as plain text, gzip and xz"""
+    plain = tmp_path / 'run.log'
+    plain.write_text(LOG_TEXT)
+    (tmp_path / 'run.log.gz').write_bytes(gzip.compress(LOG_TEXT.encode()))
+    (tmp_path / 'run.log.xz').write_bytes(lzma.compress(LOG_TEXT.encode()))
+    return tmp_path
+
+
+class TestCompressedLog:
+    """Test detection and streaming decompression"""
+
+    def test_detect_compression(self, logs):
+        """Test detection by magic bytes, not by suffix"""
+        (logs / 'renamed.log').write_bytes((logs / 'run.log.gz').read_bytes())
+
+        assert detect_compression(str(logs / 'run.log')) is None
+        assert detect_compression(str(logs / 'run.log.gz')) == 'gzip'
+        assert detect_compression(str(logs / 'run.log.xz')) == 'xz'
+        assert detect_compression(str(logs / 'renamed.log')) == 'gzip'
+        assert estimate_content_size(str(logs / 'run.log.gz'), 'gzip') == len(LOG_TEXT)
+
+    @pytest.mark.parametrize('name', ['run.log.gz', 'run.log.xz'])
+    def test_compressed_matches_plain(self, logs, name):
+        """Test compressed logs load into the plain log's columns"""
+        parser = LogParser()
+        plain = parser.load_log_arrays(str(logs / 'run.log'))
+        for engine in ('text', 'mmap'):
+            parser.ingest_engine = engine
+            arrays = parser.load_log_arrays(str(logs / name))
+            np.testing.assert_array_equal(arrays['timestamp'], plain['timestamp'])
+            assert [arrays['status_labels'][c] for c in arrays['status']] == \
+                   [plain['status_labels'][c] for c in plain['status']]
+
+        chunks = list(parser.iter_log_chunks(str(logs / name), chunk_chars=4096))
+        assert len(chunks) > 1
+        assert sum(chunk['count'] for chunk in chunks) == 2001
+        assert len(parser._parse_log_file(str(logs / name))) == 2001
+
+    def test_zstd(self, logs):
+        """Test zstd logs when the optional package is installed"""
+        zstandard = pytest.importorskip('zstandard')
+        (logs / 'run.log.zst').write_bytes(zstandard.ZstdCompressor().compress(LOG_TEXT.encode()))
+
+        arrays = LogParser().load_log_arrays(str(logs / 'run.log.zst'))
+        assert arrays['count'] == 2001
+
+    def test_reader_errors_reach_consumer(self, logs):
+        """Test a corrupt archive raises in the parsing thread"""
+        data = (logs / 'run.log.gz').read_bytes()
+        (logs / 'broken.log.gz').write_bytes(data[:len(data) // 2])
+
+        with pytest.raises(EOFError):
+            list(BackgroundDecompressor(str(logs / 'broken.log.gz'), 'gzip', block_size=1024))
+
+    def test_expand_log_paths(self, logs):
+        """Test directories pick up compressed logs"""
+        (logs / 'notes.gz').write_bytes(gzip.compress(b'notes'))
+        names = [Path(p).name for p in expand_log_paths([str(logs)])]
+        assert names == ['run.log', 'run.log.gz', 'run.log.xz']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,98 @@
+"""
+Tests for the phase drift model and time-to-limit prediction
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.drift_model import PhaseDriftModel
+from utils.log_parser import LogParser
+
+
+def quadratic_phase(times, offset=5.0, frequency=1e-3, aging=2e-9, noise=0.0, seed=0):
+    """Phase in ns for a frequency offset in ns/s and aging in ns/s^2"""
+    rng = np.random.default_rng(seed)
+    return offset + frequency * times + 0.5 * aging * times ** 2 + rng.normal(0, noise, len(times))
+
+
+class TestPhaseDriftModel:
+    """Test the incremental fit, bands and time-to-limit"""
+
+    def test_recovers_coefficients(self):
+        """Test chunked updates match a one-shot polynomial fit"""
+        times = np.arange(0.0, 2 * 86400, 10.0)
+        phase = quadratic_phase(times, noise=2.0)
+
+        model = PhaseDriftModel()
+        for start in range(0, len(times), 777):
+            model.update(times[start:start + 777], phase[start:start + 777])
+        results = model.results()
+
+        aging, frequency, offset = np.polyfit(times, phase, 2)
+        assert results['phase_offset_ns'] == pytest.approx(offset, rel=1e-9)
+        assert results['frequency_offset'] == pytest.approx(frequency * 1e-9, rel=1e-9)
+        assert results['aging_per_day'] == pytest.approx(2 * aging * 1e-9 * 86400, rel=1e-6)
+        assert results['residual_rms_ns'] == pytest.approx(2.0, rel=0.05)
+        assert abs(results['aging_per_day'] - 2e-9 * 1e-9 * 86400) < 4 * results['aging_per_day_std']
+
+    def test_time_to_limit(self):
+        """Test the limit crossing of a noiseless model and the band ordering"""
+        times = np.arange(0.0, 3600.0, 1.0)
+        model = PhaseDriftModel()
+        model.update(times, quadratic_phase(times))
+
+        # 5 + 1e-3 t + 1e-9 t^2 = 1000
+        crossing = (-1e-3 + np.sqrt(1e-6 + 4e-9 * 995)) / 2e-9
+        assert model.time_to_limit(1000.0) == pytest.approx(crossing - times[-1], rel=1e-6)
+        assert model.time_to_limit(1.0) == 0.0
+        assert model.time_to_limit(1e30) is None
+
+        model.update(times + 3600, quadratic_phase(times + 3600, noise=5.0))
+        results = model.results(1000.0)
+        assert results['time_to_limit_earliest'] < results['time_to_limit']
+        latest = results['time_to_limit_latest']
+        assert latest is None or latest > results['time_to_limit']
+
+    def test_weights(self):
+        """Test zero weights exclude samples"""
+        times = np.arange(0.0, 1000.0)
+        phase = quadratic_phase(times)
+        corrupted = phase.copy()
+        corrupted[::10] += 1e4
+
+        model = PhaseDriftModel()
+        model.update(times, corrupted, np.where(np.arange(1000) % 10, 1.0, 0.0))
+        assert model.count == 900
+        assert model.results()['frequency_offset'] == pytest.approx(1e-12, rel=1e-6)
+
+    def test_not_ready(self):
+        """Test too few samples give no coefficients"""
+        model = PhaseDriftModel()
+        model.update([0.0, 1.0], [0.0, 1.0])
+        assert model.results(100.0) == {'samples': 2}
+        with pytest.raises(ValueError):
+            model.predict(5.0)
+        with pytest.raises(ValueError):
+            PhaseDriftModel(confidence=1.5)
+
+    def test_log_analysis_includes_prediction(self, tmp_path):
+        """Test parsed logs report the drift model against the phase limit"""
+        log_file = tmp_path / 'run.log'
+        log_file.write_text("".join(f"{i}.0,{1e-6 + 1e-10 * i:.6e},25.0,12.0,0.5,HOLDOVER\n" for i in range(2000)))
+
+        drift = LogParser().parse_holdover_log(str(log_file))['drift_model']
+        assert drift['phase_limit_ns'] == 1000.0
+        assert drift['aging_per_day'] == pytest.approx(1e-10 * 1e-6 * 86400, rel=1e-3)
+
+        # 1e-3 t + 0.5e-7 t^2 = 1000 ns, counted from the last sample
+        crossing = (-1e-3 + np.sqrt(1e-6 + 2e-4)) / 1e-7
+        assert drift['time_to_limit'] == pytest.approx(crossing - 1999, rel=1e-3)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,105 @@
+"""
+Tests for the sparse log time index
+"""
+
+import os
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.log_index import LogIndex
+from utils.log_parser import LogParser
+
+
+def log_lines(start, stop):
+    """CSV holdover log lines for timestamps start..stop-1"""
+    return "".join(f"{i}.0,{1e-9 * i:.3e},25.0,12.0,0.5,LOCKED\n" for i in range(start, stop))
+
+
+class TestLogIndex:
+    """Test index building, invalidation and range reads"""
+
+    def test_range_matches_full_load(self, tmp_path):
+        """Test a range read returns the filtered full load"""
+        log_file = tmp_path / 'run.log'
+        log_file.write_text("# header\n" + log_lines(0, 1000))
+        parser = LogParser()
+        parser.index_stride = 64
+
+        full = parser.load_log_arrays(str(log_file))
+        for start, end in [(100.5, 300.0), (None, 10.0), (990.0, None), (64.0, 64.0), (2000.0, 3000.0)]:
+            arrays = parser.load_log_range(str(log_file), start, end)
+            keep = np.ones(full['count'], dtype=bool)
+            if start is not None:
+                keep &= full['timestamp'] >= start
+            if end is not None:
+                keep &= full['timestamp'] <= end
+            np.testing.assert_array_equal(arrays['timestamp'], full['timestamp'][keep])
+            assert arrays['count'] == keep.sum()
+
+        index = LogIndex(str(log_file), stride=64).update()
+        assert index.index_file.exists()
+        assert index.summary()['lines'] == 1001
+        start, end, _ = index.byte_range(500.0, 600.0)
+        assert end - start < log_file.stat().st_size / 4
+
+    def test_incremental_extension(self, tmp_path):
+        """Test appended lines extend the index without a rebuild"""
+        log_file = tmp_path / 'run.log'
+        log_file.write_text(log_lines(0, 500) + "500.0,1.0e-9")
+        index = LogIndex(str(log_file), stride=100).update()
+        assert list(index.timestamps) == [0.0, 100.0, 200.0, 300.0, 400.0]
+        assert index.line_count == 500
+
+        with open(log_file, 'a') as f:
+            f.write(",25.0,12.0,0.5,LOCKED\n" + log_lines(501, 1000))
+        reloaded = LogIndex(str(log_file), stride=100)
+        reloaded._load()
+        first_offsets = reloaded.offsets.copy()
+        reloaded.update()
+
+        assert list(reloaded.timestamps) == [100.0 * i for i in range(10)]
+        np.testing.assert_array_equal(reloaded.offsets[:5], first_offsets)
+        assert reloaded.indexed_size == log_file.stat().st_size
+
+    def test_rebuild_after_rewrite(self, tmp_path):
+        """Test a shrunk or rewritten log is re-indexed"""
+        log_file = tmp_path / 'run.log'
+        log_file.write_text(log_lines(0, 500))
+        LogIndex(str(log_file), stride=100).update()
+
+        log_file.write_text(log_lines(1000, 1300))
+        index = LogIndex(str(log_file), stride=100).update()
+        assert list(index.timestamps) == [1000.0, 1100.0, 1200.0]
+
+        text = log_file.read_text().replace("1000.0,", "9000.0,", 1)
+        log_file.write_text(text)
+        stat = log_file.stat()
+        os.utime(log_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        index = LogIndex(str(log_file), stride=100).update()
+        assert index.timestamps[0] == 9000.0
+
+    def test_index_directory(self, tmp_path):
+        """Test indexes kept in a directory stay apart from the logs and from each other"""
+        index_dir = tmp_path / 'cache' / 'index'
+        indexes = []
+        for name in ('a', 'b'):
+            log_file = tmp_path / name / 'run.log'
+            log_file.parent.mkdir()
+            log_file.write_text(log_lines(0, 300))
+            indexes.append(LogIndex(str(log_file), stride=100, index_dir=str(index_dir)).update())
+            assert not (tmp_path / name / 'run.log.idx').exists()
+
+        assert indexes[0].index_file != indexes[1].index_file
+        assert sorted(path.parent for path in index_dir.iterdir()) == [index_dir, index_dir]
+        reloaded = LogIndex(str(tmp_path / 'a' / 'run.log'), stride=100, index_dir=str(index_dir))
+        reloaded._load()
+        assert list(reloaded.timestamps) == [0.0, 100.0, 200.0]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,75 @@
+"""
+Tests for merging several device logs
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.log_merge import LogMerger
+
+
+def write_log(path, times, offset, status='LOCKED'):
+    """Write a CSV log whose frequency error is offset + 1e-6 * time"""
+    path.write_text("".join(f"{t:.3f},{offset + 1e-6 * t:.9e},25.0,12.0,0.5,{status}\n" for t in times))
+    return str(path)
+
+
+class TestLogMerger:
+    """Test k-way merge and grid alignment"""
+
+    def test_merge_is_time_ordered(self, tmp_path):
+        """Test the merged stream is sorted, tagged and complete"""
+        rng = np.random.default_rng(1)
+        times = [np.round(np.cumsum(rng.uniform(0.1, 2.0, 3000)), 3) for _ in range(3)]
+        times[2] = times[0].copy()  # identical timestamps must keep input order
+        files = [write_log(tmp_path / f'{k}.log', t, k, status) for k, (t, status)
+                 in enumerate(zip(times, ['LOCKED', 'HOLDOVER', 'LOCKED']))]
+
+        merger = LogMerger(files, chunk_chars=8192)
+        chunks = list(merger)
+        timestamps = np.concatenate([c['timestamp'] for c in chunks])
+        sources = np.concatenate([c['source'] for c in chunks])
+        statuses = np.concatenate([c['status'] for c in chunks])
+
+        assert len(chunks) > 3
+        assert np.all(np.diff(timestamps) >= 0)
+        np.testing.assert_array_equal(np.sort(np.concatenate(times)), timestamps)
+        for k in range(3):
+            np.testing.assert_array_equal(timestamps[sources == k], times[k])
+        ties = np.flatnonzero(np.isin(sources, [0, 2]))
+        assert list(sources[ties][:4]) == [0, 2, 0, 2]
+        labels = np.array(merger.status_labels)[statuses]
+        assert set(labels[sources == 1]) == {'HOLDOVER'}
+        assert set(labels[sources != 1]) == {'LOCKED'}
+
+    def test_align_to_grid(self, tmp_path):
+        """Test interpolation onto the common grid with NaN across gaps"""
+        first = write_log(tmp_path / 'a.log', np.arange(0.0, 1000.0, 1.0), 0.0)
+        times = np.concatenate((np.arange(10.5, 500.0, 2.0), np.arange(700.5, 1200.0, 2.0)))
+        second = write_log(tmp_path / 'b.log', times, 1.0)
+
+        blocks = list(LogMerger([first, second], chunk_chars=4096).align(
+            1.0, columns=('frequency_error',), max_gap=10.0, block_size=100))
+        grid = np.concatenate([b['time'] for b in blocks])
+        values = np.concatenate([b['frequency_error'] for b in blocks])
+
+        np.testing.assert_allclose(grid, np.arange(10.5, 999.0, 1.0))
+        assert values.shape == (len(grid), 2)
+        valid = ~np.isnan(values[:, 1])
+        np.testing.assert_allclose(values[:, 0], 1e-6 * grid, rtol=1e-6)
+        np.testing.assert_allclose(values[valid, 1], 1.0 + 1e-6 * grid[valid], rtol=1e-9)
+        assert np.all(np.isnan(values[(grid > 499.0) & (grid < 700.5), 1]))
+        assert valid.sum() == len(grid) - np.count_nonzero((grid > 498.5) & (grid < 700.5))
+
+        union = list(LogMerger([first, second]).align(5.0, common=False))
+        union_grid = np.concatenate([b['time'] for b in union])
+        assert union_grid[0] == 0.0 and union_grid[-1] == 1195.0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,103 @@
+"""
+Tests for the columnar measurement block
+"""
+
+import pickle
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.measurement_block import MeasurementBlock
+from utils.log_parser import LogParser
+
+
+def make_measurements(count, start=1700000000.0):
+    """Live-test style measurement dicts with wall-clock timestamps"""
+    return [{
+        'timestamp': start + 10 * i,
+        'elapsed_time': 10.0 * i,
+        'frequency_error': 1e-9 * i,
+        'temperature': 25.0 + 0.01 * i,
+        'voltage': 12.0,
+        'current': 0.5,
+        'status': 'HOLDOVER' if i % 3 else 'LOCKED'
+    } for i in range(count)]
+
+
+class TestMeasurementBlock:
+    """Test growth, slicing, conversion and storage"""
+
+    def test_append_and_dict_round_trip(self):
+        """Test rows appended one by one come back as the same dicts"""
+        measurements = make_measurements(2500)
+        block = MeasurementBlock(capacity=4, separate_elapsed=True)
+        for measurement in measurements:
+            block.append(measurement)
+
+        assert len(block) == block['count'] == 2500
+        assert block['status_labels'] == ['LOCKED', 'HOLDOVER']
+        np.testing.assert_array_equal(block['elapsed_time'], 10.0 * np.arange(2500))
+        assert block.to_dicts() == measurements
+        assert MeasurementBlock.from_dicts(measurements).to_dicts() == measurements
+
+    def test_extend_remaps_status_codes(self):
+        """Test chunks with their own label order keep their statuses"""
+        block = MeasurementBlock()
+        block.extend(MeasurementBlock.from_dicts(make_measurements(4)))
+        other = MeasurementBlock.from_dicts([dict(m, status='ALARM' if i else 'HOLDOVER')
+                                             for i, m in enumerate(make_measurements(3))])
+        block.extend(other)
+
+        assert block.status_labels == ['LOCKED', 'HOLDOVER', 'ALARM']
+        assert block.statuses().tolist() == ['LOCKED', 'HOLDOVER', 'HOLDOVER', 'LOCKED',
+                                             'HOLDOVER', 'ALARM', 'ALARM']
+
+    def test_slicing_shares_memory(self):
+        """Test slices are views and masks select rows"""
+        block = MeasurementBlock.from_dicts(make_measurements(100))
+        part = block[10:20]
+
+        assert len(part) == 10
+        assert np.shares_memory(part['temperature'], block['temperature'])
+        assert part.statuses().tolist() == block.statuses()[10:20].tolist()
+
+        between = block.between(block['timestamp'][5], block['timestamp'][9])
+        np.testing.assert_array_equal(between['elapsed_time'], [50.0, 60.0, 70.0, 80.0, 90.0])
+
+    def test_save_load_and_pickle(self, tmp_path):
+        """Test .npz storage and pickling keep only the filled rows"""
+        block = MeasurementBlock(capacity=1000, separate_elapsed=True)
+        for measurement in make_measurements(7):
+            block.append(measurement)
+
+        block.save(str(tmp_path / 'run.npz'))
+        loaded = MeasurementBlock.load(str(tmp_path / 'run.npz'))
+        assert loaded.to_dicts() == block.to_dicts()
+
+        restored = pickle.loads(pickle.dumps(block))
+        assert len(restored._status) == 7
+        assert restored.to_dicts() == block.to_dicts()
+
+        with pytest.raises(FileNotFoundError):
+            MeasurementBlock.load(str(tmp_path / 'missing.npz'))
+
+    def test_parser_returns_block(self, tmp_path):
+        """Test load_log_arrays and load_log_range return blocks"""
+        log_file = tmp_path / 'run.log'
+        log_file.write_text("".join(f"{i}.0,{1e-9 * i:.3e},25.0,12.0,0.5,LOCKED\n" for i in range(50)))
+
+        parser = LogParser()
+        arrays = parser.load_log_arrays(str(log_file))
+        assert isinstance(arrays, MeasurementBlock)
+        assert np.shares_memory(arrays['elapsed_time'], arrays['timestamp'])
+
+        part = parser.load_log_range(str(log_file), 10.0, 19.0)
+        np.testing.assert_array_equal(part['timestamp'], np.arange(10.0, 20.0))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
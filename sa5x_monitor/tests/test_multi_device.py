@@ -0,0 +1,65 @@
+"""
+Tests for the N-cornered hat
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.multi_device import CorneredHat, cornered_hat, analyze_logs
+
+
+class TestCorneredHat:
+    """Test the per-unit separation of pairwise ADEV"""
+
+    def test_exact_three_cornered_hat(self):
+        """Test the solution is exact for consistent pair variances, with any number of units"""
+        unit = np.array([[1.0, 4.0, 9.0, 16.0], [0.5, 2.0, 3.0, 1.0]])
+        pairs = [(i, j) for i in range(4) for j in range(i + 1, 4)]
+        pair_variances = np.array([[row[i] + row[j] for i, j in pairs] for row in unit])
+        np.testing.assert_allclose(cornered_hat(pair_variances, pairs, 4), unit)
+        np.testing.assert_allclose(cornered_hat(pair_variances[:, [0, 1, 3]], pairs[:2] + pairs[3:4], 3),
+                                   unit[:, :3])
+
+        with pytest.raises(ValueError):
+            cornered_hat(pair_variances[:, :1], pairs[:1], 2)
+
+    def test_separates_units_despite_common_reference(self):
+        """Test per-unit White FM levels are recovered and common reference noise cancels"""
+        rng = np.random.default_rng(2)
+        levels = np.array([1.0, 2.0, 3.0, 4.0])
+        reference = rng.normal(0, 10, 40000)
+        hat = CorneredHat(4, max_octaves=4)
+        hat.update(rng.normal(size=(40000, 4)) * levels + reference[:, None])
+
+        results = hat.results()
+        np.testing.assert_allclose(results['unit_adev'][0], levels, rtol=0.05)
+        np.testing.assert_allclose(results['unit_adev'][2], levels / 2, rtol=0.1)
+
+    def test_analyze_logs(self, tmp_path):
+        """Test logs are aligned, scaled from ppm and separated"""
+        rng = np.random.default_rng(3)
+        reference = rng.normal(0, 5e-5, 4000)
+        files = []
+        for k, level in enumerate([1e-5, 2e-5, 4e-5]):
+            freq = reference + rng.normal(0, level, 4000)
+            path = tmp_path / f'unit{k}.log'
+            path.write_text("".join(f"{t:.1f},{f:.6e},25.0,12.0,0.5,HOLDOVER\n"
+                                    for t, f in enumerate(freq)))
+            files.append(str(path))
+
+        results = analyze_logs(files, chunk_chars=8192)
+        assert results['step'] == 1.0 and results['units'] == 3
+        assert results['grid_points'] == 4000
+        np.testing.assert_allclose(results['unit_adev'][0], [1e-11, 2e-11, 4e-11], rtol=0.1)
+
+        with pytest.raises(ValueError):
+            analyze_logs(files[:2])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
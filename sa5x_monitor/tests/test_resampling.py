@@ -0,0 +1,112 @@
+"""
+Tests for uniform-grid resampling
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.resampling import UniformResampler, resample_uniform
+
+
+def jittered_times(count, seed=0, jitter=0.05):
+    """Nominal 1 s sampling with Gaussian timestamp jitter"""
+    rng = np.random.default_rng(seed)
+    return np.arange(count) + rng.normal(0, jitter, count)
+
+
+class TestUniformResampler:
+    """Test interpolation, gap handling and quality metrics"""
+
+    def test_matches_linear_interpolation(self):
+        """Test the grid values equal np.interp where there are no gaps"""
+        times = jittered_times(5000)
+        values = np.sin(times / 50)
+
+        result = resample_uniform(times, {'frequency_error': values}, interval=1.0)
+        grid = result['time']
+
+        assert grid[0] == times[0]
+        assert np.allclose(np.diff(grid), 1.0)
+        assert grid[-1] <= times[-1]
+        assert result['valid'].all()
+        np.testing.assert_allclose(result['frequency_error'], np.interp(grid, times, values), rtol=0, atol=1e-12)
+
+    def test_chunking_does_not_change_grid(self):
+        """Test any chunking yields the same grid points and values"""
+        times = jittered_times(3000, seed=1)
+        times = np.delete(times, np.arange(100, 3000, 97))
+        values = np.cos(times / 20)
+        whole = resample_uniform(times, {'value': values}, interval=1.0, fill='interpolate')
+
+        resampler = UniformResampler(interval=1.0)
+        parts = []
+        for start, stop in [(0, 1), (1, 7), (7, 1500), (1500, 1500), (1500, len(times))]:
+            parts.append(resampler.update(times[start:stop], {'value': values[start:stop]}))
+
+        np.testing.assert_array_equal(np.concatenate([p[0] for p in parts]), whole['time'])
+        np.testing.assert_allclose(np.concatenate([p[1]['value'] for p in parts]), whole['value'], atol=1e-12)
+        np.testing.assert_array_equal(np.concatenate([p[2] for p in parts]), whole['valid'])
+        assert resampler.quality()['jitter_rms'] == pytest.approx(whole['quality']['jitter_rms'])
+
+    def test_gaps_are_not_bridged(self):
+        """Test points inside an outage are invalid, NaN-filled or split off"""
+        times = np.concatenate((np.arange(0.0, 100.0), np.arange(110.0, 200.0)))
+        values = np.ones(len(times))
+
+        result = resample_uniform(times, {'value': values})
+        missing = np.isnan(result['value'])
+        assert result['quality']['nominal_interval'] == 1.0
+        np.testing.assert_array_equal(result['time'][missing], np.arange(100.0, 110.0))
+        assert result['quality']['gap_count'] == 1
+        assert result['quality']['longest_gap'] == 11.0
+        assert result['quality']['missing_points'] == 10
+
+        segments = resample_uniform(times, {'value': values}, fill='split')['segments']
+        assert [(s['time'][0], s['time'][-1]) for s in segments] == [(0.0, 99.0), (110.0, 199.0)]
+        assert all(np.all(s['value'] == 1.0) for s in segments)
+
+    def test_restart_is_rebased(self):
+        """Test a backwards time step starts a new segment after a gap"""
+        times = np.concatenate((np.arange(0.0, 50.0), np.arange(0.0, 50.0)))
+        values = np.concatenate((np.zeros(50), np.ones(50)))
+
+        resampler = UniformResampler()
+        grid, resampled, valid = resampler.update(times[:60], {'value': values[:60]})
+        grid2, resampled2, valid2 = resampler.update(times[60:], {'value': values[60:]})
+
+        grid = np.concatenate((grid, grid2))
+        valid = np.concatenate((valid, valid2))
+        value = np.concatenate((resampled['value'], resampled2['value']))
+
+        # The second run continues 3 intervals (twice the gap threshold) after the first
+        assert resampler.restarts == 1
+        np.testing.assert_array_equal(grid, np.arange(102.0))
+        np.testing.assert_array_equal(grid[~valid], [50.0, 51.0])
+        assert np.all(value[valid] == np.concatenate((np.zeros(50), np.ones(50))))
+
+    def test_quality_metrics(self):
+        """Test duplicates, jitter and coverage are reported"""
+        times = np.array([0.0, 1.0, 1.0, 2.1, 2.9, 4.0, 5.0])
+        quality = resample_uniform(times, {'value': times}, interval=1.0)['quality']
+
+        assert quality['sample_count'] == 7
+        assert quality['grid_points'] == 6
+        assert quality['duplicate_timestamps'] == 1
+        assert quality['coverage'] == 1.0
+        assert quality['jitter_rms'] == pytest.approx(np.sqrt((0.1 ** 2 + 0.2 ** 2 + 0.1 ** 2) / 5))
+
+    def test_invalid_arguments(self):
+        """Test bad intervals and fill modes are rejected"""
+        with pytest.raises(ValueError):
+            UniformResampler(interval=0)
+        with pytest.raises(ValueError):
+            resample_uniform(np.arange(10.0), {}, fill='zero')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
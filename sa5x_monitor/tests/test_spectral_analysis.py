@@ -0,0 +1,73 @@
+"""
+Tests for the Welch PSD and lag-1 autocorrelation noise identification
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.spectral_analysis import WelchPSD, LagOneNoiseID, phase_spectrum
+from utils.log_parser import LogParser
+
+
+class TestSpectralAnalysis:
+    """Test PSD levels, chunk invariance and noise identification"""
+
+    def test_white_noise_level(self):
+        """Test white phase noise gives the flat one-sided level 2 * sigma^2 * tau0"""
+        rng = np.random.default_rng(0)
+        welch = WelchPSD(segment_length=512, interval=0.5)
+        welch.update(rng.normal(0, 2.0, 200000))
+        results = welch.results()
+
+        assert results['frequencies'][-1] == pytest.approx(1.0)
+        assert np.mean(results['psd']) == pytest.approx(2 * 4.0 * 0.5, rel=0.02)
+
+    def test_chunking_and_gaps(self):
+        """Test chunked input gives the same PSD and gaps skip their segments"""
+        rng = np.random.default_rng(1)
+        phase = np.cumsum(rng.normal(size=50000))
+        whole = phase_spectrum(phase, segment_length=1000)
+        chunked = phase_spectrum(phase, segment_length=1000, chunk_size=777)
+        np.testing.assert_allclose(chunked['phase_psd'], whole['phase_psd'], rtol=1e-9)
+        assert [n['alpha'] for n in chunked['noise_types']] == pytest.approx([n['alpha'] for n in whole['noise_types']])
+
+        valid = np.ones(len(phase), dtype=bool)
+        valid[10000] = False
+        gapped = phase_spectrum(phase, segment_length=1000, valid=valid)
+        assert gapped['skipped_segments'] == 2
+        assert gapped['segments'] == whole['segments'] - 2
+
+    @pytest.mark.parametrize('integrations, noise_type', [(0, 'White PM'), (1, 'White FM'), (2, 'Random Walk FM')])
+    def test_noise_identification(self, integrations, noise_type):
+        """Test power-law noises are identified at every tau"""
+        phase = np.random.default_rng(2).normal(size=1 << 16)
+        for _ in range(integrations):
+            phase = np.cumsum(phase)
+
+        noise_id = LagOneNoiseID(max_octaves=8)
+        noise_id.update(phase)
+        assert {n['noise_type'] for n in noise_id.results()} == {noise_type}
+
+    def test_frequency_psd_and_log_spectrum(self, tmp_path):
+        """Test white FM logs give a flat S_y and are identified as White FM"""
+        rng = np.random.default_rng(3)
+        log_file = tmp_path / 'run.log'
+        log_file.write_text("".join(f"{i}.0,{freq:.6e},25.0,12.0,0.5,HOLDOVER\n"
+                                    for i, freq in enumerate(rng.normal(0, 1e-5, 20000))))
+
+        spectrum = LogParser().analyze_spectrum(str(log_file), segment_length=256)
+        assert spectrum['interval'] == 1.0
+        assert spectrum['noise_types'][0]['noise_type'] == 'White FM'
+
+        # White FM of 1e-11 rms at tau0 = 1 s: S_y = 2e-22 / Hz, flat below Nyquist
+        low = np.array(spectrum['frequency_psd'][:60])
+        assert np.mean(low) == pytest.approx(2e-22, rel=0.1)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
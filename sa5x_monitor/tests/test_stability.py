@@ -0,0 +1,300 @@
+"""
+Tests for stability analysis
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+import utils.stability as stability
+from utils.stability import (calculate_mtie, calculate_tdev, calculate_adev, calculate_dynamic_adev, MTIETracker,
+                             StreamingAllanDeviation, WanderAccumulator, frequency_to_phase, adev_edf,
+                             adev_confidence, chi2_quantile, noise_alpha_from_slope)
+from utils.log_parser import LogParser
+from utils.holdover_test import HoldoverTest
+
+
+def naive_mtie(phase, n):
+    """Reference MTIE for a window of n intervals"""
+    return max(np.ptp(phase[k:k + n + 1]) for k in range(len(phase) - n))
+
+
+class TestMTIE:
+    """Test MTIE computation"""
+
+    def test_matches_naive(self):
+        """Test sparse-table MTIE against direct computation"""
+        rng = np.random.default_rng(1)
+        phase = np.cumsum(rng.normal(size=500))
+        taus = [1, 2, 3, 7, 16, 50, 333]
+
+        result = calculate_mtie(phase, taus)
+
+        for tau, value in zip(taus, result['mtie']):
+            assert value == pytest.approx(naive_mtie(phase, tau))
+        assert result['passed'] is None
+
+    def test_unusable_tau_is_nan(self):
+        """Test taus outside the record are not computed"""
+        phase = np.arange(10, dtype=float)
+        result = calculate_mtie(phase, [0.2, 5, 100])
+
+        assert np.isnan(result['mtie'][0])
+        assert result['mtie'][1] == 5
+        assert np.isnan(result['mtie'][2])
+
+    def test_stop_on_violation(self):
+        """Test early termination against a mask"""
+        phase = np.arange(1000, dtype=float)
+        result = calculate_mtie(phase, [1, 10, 100], limits=[5, 5, 500],
+                                stop_on_violation=True)
+
+        assert result['passed'] is False
+        assert result['violation']['tau'] == 10
+        assert np.isnan(result['mtie'][2])
+
+    def test_tracker_matches_batch(self):
+        """Test streaming MTIE against the batch computation"""
+        rng = np.random.default_rng(2)
+        phase = np.cumsum(rng.normal(size=300))
+        taus = [1, 4, 32, 299, 400]
+
+        tracker = MTIETracker(taus)
+        for value in phase:
+            tracker.update(value)
+
+        np.testing.assert_allclose(tracker.results()['mtie'],
+                                   calculate_mtie(phase, taus)['mtie'])
+
+    def test_frequency_to_phase(self):
+        """Test integration of frequency into phase"""
+        phase = frequency_to_phase(np.array([1.0, 2.0, 3.0]), tau0=10.0)
+        np.testing.assert_allclose(phase, [0.0, 10.0, 30.0, 60.0])
+
+
+class TestTDEV:
+    """Test TDEV computation"""
+
+    def test_matches_definition(self):
+        """Test cumulative-sum TDEV against the textbook double sum"""
+        rng = np.random.default_rng(3)
+        phase = rng.normal(size=200)
+        n = 5
+
+        terms = []
+        for j in range(len(phase) - 3 * n + 1):
+            inner = sum(phase[i + 2 * n] - 2 * phase[i + n] + phase[i] for i in range(j, j + n))
+            terms.append(inner ** 2)
+        expected = np.sqrt(np.mean(terms) / (6 * n * n))
+
+        assert calculate_tdev(phase, [n])['tdev'][0] == pytest.approx(expected)
+
+    def test_chunked_wander_matches_batch(self):
+        """Test chunked MTIE/TDEV against the whole-record computation"""
+        rng = np.random.default_rng(6)
+        phase = np.cumsum(rng.normal(size=2000))
+        taus = [1, 3, 20, 150, 600, 1999, 2500]
+
+        accumulator = WanderAccumulator(taus)
+        for chunk in np.array_split(phase, [1, 5, 400, 401, 1500]):
+            accumulator.update_many(chunk)
+        result = accumulator.results()
+
+        np.testing.assert_allclose(result['mtie'], calculate_mtie(phase, taus)['mtie'])
+        np.testing.assert_allclose(result['tdev'], calculate_tdev(phase, taus)['tdev'])
+
+
+class TestStreamingAllanDeviation:
+    """Test streaming ADEV estimator"""
+
+    def test_matches_batch(self):
+        """Test per-sample updates against batch overlapping ADEV"""
+        rng = np.random.default_rng(4)
+        freq = rng.normal(size=700)
+        estimator = StreamingAllanDeviation(tau0=2.0, max_octaves=6)
+        for value in freq:
+            estimator.update(value)
+
+        batch = calculate_adev(frequency_to_phase(freq, 2.0), estimator.taus, 2.0)['adev']
+        np.testing.assert_allclose(estimator.deviations(), batch)
+        assert estimator.sample_count == 700
+
+    def test_block_updates_match_single_updates(self):
+        """Test vectorized block updates give the same state"""
+        rng = np.random.default_rng(5)
+        freq = rng.normal(size=500)
+        single = StreamingAllanDeviation(max_octaves=7)
+        blocks = StreamingAllanDeviation(max_octaves=7)
+
+        for value in freq:
+            single.update(value)
+        for chunk in np.array_split(freq, [3, 10, 11, 200, 260]):
+            blocks.update_many(chunk)
+
+        np.testing.assert_allclose(blocks.deviations(), single.deviations())
+        np.testing.assert_array_equal(blocks.counts, single.counts)
+
+    def test_columns_match_batch(self):
+        """Test block updates of several columns match single-series ADEV"""
+        rng = np.random.default_rng(0)
+        freq = rng.normal(size=(5000, 3)) + [5.0, -2.0, 0.0]
+        estimator = StreamingAllanDeviation(0.5, max_octaves=8, columns=3)
+        for block in np.array_split(freq, [1, 7, 300, 3001]):
+            estimator.update_many(block)
+
+        adev = estimator.deviations()
+        for column in range(3):
+            batch = calculate_adev(frequency_to_phase(freq[:, column], 0.5), estimator.taus, 0.5)['adev']
+            np.testing.assert_allclose(adev[:, column], batch, rtol=1e-9)
+
+    def test_gaps_are_excluded(self):
+        """Test second differences spanning NaN samples are skipped"""
+        freq = np.random.default_rng(1).normal(size=(1000, 2))
+        freq[400:410, 1] = np.nan
+        blocks = StreamingAllanDeviation(max_octaves=3, columns=2)
+        single = StreamingAllanDeviation(max_octaves=3, columns=2)
+        blocks.update_many(freq)
+        for row in freq:
+            single.update(row)
+
+        assert list(blocks.counts[:, 0]) == [999, 997, 993]
+        assert list(blocks.counts[:, 1]) == [999 - 11, 997 - 13, 993 - 17]
+        np.testing.assert_array_equal(single.counts, blocks.counts)
+        np.testing.assert_allclose(single.deviations(), blocks.deviations())
+
+    def test_results_skip_empty_taus(self):
+        """Test taus without data are not reported"""
+        estimator = StreamingAllanDeviation(max_octaves=4)
+        for value in [1.0, 2.0, 4.0]:
+            estimator.update(value)
+
+        taus = [point['tau'] for point in estimator.results()]
+        assert taus == [1.0]
+
+
+
+class TestDynamicAllanDeviation:
+    """Test sliding-window ADEV"""
+
+    def test_windows_match_batch(self):
+        """Test every window equals the batch ADEV of its samples"""
+        rng = np.random.default_rng(6)
+        freq = 1e-9 + rng.normal(0, 1e-11, 3000)
+        result = calculate_dynamic_adev(freq, 0.5, window=1000, step=250)
+
+        assert list(result['taus']) == [0.5 * 2 ** k for k in range(8)]
+        assert result['adev'].shape == (8, 9)
+        np.testing.assert_allclose(result['times'], (np.arange(9) * 250 + 500) * 0.5)
+        for column, start in enumerate(range(0, 2001, 250)):
+            window = freq[start:start + 1000]
+            batch = calculate_adev(frequency_to_phase(window, 0.5), result['taus'], 0.5)['adev']
+            np.testing.assert_allclose(result['adev'][:, column], batch, rtol=1e-6)
+
+    def test_invalid_samples_excluded(self):
+        """Test differences spanning invalid samples are left out"""
+        freq = np.random.default_rng(7).normal(size=400)
+        valid = np.ones(400, dtype=bool)
+        valid[100:300] = False
+        freq[~valid] = 1e6
+        result = calculate_dynamic_adev(freq, 1.0, window=100, step=100, taus=[1.0, 8.0], valid=valid)
+
+        assert np.isnan(result['adev'][:, 1:3]).all()
+        assert np.all(result['adev'][:, [0, 3]] < 10)
+
+    def test_log_parser_matrix_and_report(self, tmp_path):
+        """Test parsed logs carry the JSON-ready matrix and report table"""
+        rng = np.random.default_rng(8)
+        log_file = tmp_path / 'run.log'
+        log_file.write_text("".join(f"{i}.0,{freq:.6e},25.0,12.0,0.5,HOLDOVER\n"
+                                    for i, freq in enumerate(rng.normal(0, 1e-5, 5000))))
+
+        parser = LogParser()
+        results = parser.parse_holdover_log(str(log_file))
+        dynamic = results['dynamic_adev']
+        assert dynamic['window'] == 3600.0 and dynamic['step'] == 600.0
+        assert len(dynamic['times']) == 3 and dynamic['times'][0] == 1800.0
+        assert len(dynamic['adev']) == len(dynamic['taus'])
+        assert "Dynamic Allan Deviation" in parser.generate_report(results)
+
+        assert parser.dynamic_allan_deviation(parser.load_log_arrays(str(log_file)), 6000.0) is None
+
+
+
+class TestAdevConfidence:
+    """Test EDF and chi-squared confidence bounds"""
+
+    def test_edf_formulas(self):
+        """Test the White FM formula and broadcasting over noise types and taus"""
+        n, m = 1001, 10
+        expected = (3 * (n - 1) / (2 * m) - 2 * (n - 2) / n) * 4 * m * m / (4 * m * m + 5)
+        assert adev_edf(0, n, m) == pytest.approx(expected)
+
+        edf = adev_edf(np.array([[2], [1], [0], [-1], [-2]]), n, np.array([1, 4, 16, 64]))
+        assert edf.shape == (5, 4)
+        assert np.all(np.diff(edf, axis=1) < 0) and np.all(edf >= 1)
+
+    def test_quantile_fallback(self, monkeypatch):
+        """Test the Wilson-Hilferty quantiles without scipy"""
+        monkeypatch.setattr(stability, 'chi2', None)
+        np.testing.assert_allclose(chi2_quantile(0.025, [10, 100]), [3.247, 74.222], rtol=0.01)
+        np.testing.assert_allclose(chi2_quantile(0.975, [10, 100]), [20.483, 129.561], rtol=0.01)
+
+    def test_bounds_cover_true_deviation(self):
+        """Test the 68.3% bounds contain the true White FM ADEV about 68% of the time"""
+        rng = np.random.default_rng(9)
+        freq = rng.normal(size=(400, 1000))
+        m = 8
+        adev = np.array([calculate_adev(frequency_to_phase(row), [m])['adev'][0] for row in freq])
+        bounds = adev_confidence(adev, adev_edf(0, 1001, m), 0.683)
+
+        true = 1 / np.sqrt(m)
+        covered = np.mean((bounds['lower'] <= true) & (true <= bounds['upper']))
+        assert covered == pytest.approx(0.683, abs=0.07)
+
+    def test_slope_noise_and_streaming_points(self):
+        """Test slope noise identification and bounds on live ADEV points"""
+        taus = np.array([1.0, 2.0, 4.0])
+        assert list(noise_alpha_from_slope(taus, taus ** -0.5)) == [0, 0, 0]
+        assert list(noise_alpha_from_slope(taus, taus ** 0.5)) == [-2, -2, -2]
+
+        estimator = StreamingAllanDeviation(max_octaves=5)
+        estimator.update_many(np.random.default_rng(10).normal(size=2000))
+        for point in estimator.results(0.95):
+            assert point['lower'] < point['allan_deviation'] < point['upper']
+            assert point['noise_type'] == 'White FM'
+
+    def test_holdover_results_noise_type(self):
+        """Test holdover test bounds assume White FM for white frequency noise"""
+        freq = np.random.default_rng(12).normal(0, 1e-5, 5000)
+        results = HoldoverTest(None, None)._calculate_results_from_arrays(
+            np.arange(5000.0), freq, np.full(5000, 25.0))
+        confidence = results['allan_confidence']
+        assert {confidence[tau]['noise_type'] for tau in (1, 10, 100)} == {'White FM'}
+        for tau, dev in results['allan_deviations'].items():
+            if dev > 0:
+                assert confidence[tau]['lower'] < dev < confidence[tau]['upper']
+
+    def test_log_results_and_report(self, tmp_path):
+        """Test parsed logs carry bounds per standard tau and print them"""
+        rng = np.random.default_rng(11)
+        log_file = tmp_path / 'run.log'
+        log_file.write_text("".join(f"{i}.0,{freq:.6e},25.0,12.0,0.5,HOLDOVER\n"
+                                    for i, freq in enumerate(rng.normal(0, 1e-5, 3000))))
+
+        parser = LogParser()
+        results = parser.parse_holdover_log(str(log_file))
+        confidence = results['allan_confidence']
+        assert set(confidence) == {1, 10, 100, 1000}
+        assert confidence[1]['noise_type'] == 'White FM'
+        assert confidence[1]['edf'] > confidence[1000]['edf']
+        for tau, dev in results['allan_deviations'].items():
+            assert confidence[tau]['lower'] < dev < confidence[tau]['upper']
+        assert "chi-squared confidence" in parser.generate_report(results)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
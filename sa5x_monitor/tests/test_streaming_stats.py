@@ -0,0 +1,111 @@
+"""
+Tests for streaming statistics
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.streaming_stats import RunningStats, MonitoringStatistics, LinearFit, combine_stats
+
+
+class TestRunningStats:
+    """Test running statistics"""
+
+    def test_matches_numpy(self):
+        """Test Welford moments against numpy"""
+        values = np.random.default_rng(6).normal(5.0, 2.0, size=1000)
+        stats = RunningStats()
+        for value in values:
+            stats.update(value)
+
+        assert stats.count == 1000
+        assert stats.mean == pytest.approx(values.mean())
+        assert stats.std_dev == pytest.approx(values.std(ddof=1))
+        assert stats.min == values.min()
+        assert stats.max == values.max()
+
+    def test_block_update_matches_single(self):
+        """Test vectorized block updates including EWMA and window"""
+        values = np.random.default_rng(7).normal(size=300)
+        single = RunningStats(ewma_alpha=0.2, window_size=50)
+        block = RunningStats(ewma_alpha=0.2, window_size=50)
+        for value in values:
+            single.update(value)
+        block.update_many(values[:120])
+        block.update_many(values[120:])
+
+        assert block.mean == pytest.approx(single.mean)
+        assert block.variance == pytest.approx(single.variance)
+        assert block.ewma == pytest.approx(single.ewma)
+        assert block.to_dict()['window']['std_dev'] == pytest.approx(values[-50:].std(ddof=1))
+
+    def test_merge_slices(self):
+        """Test merging time slices equals one pass over all data"""
+        values = np.random.default_rng(8).normal(size=500)
+        slices = []
+        for chunk in np.array_split(values, 4):
+            stats = RunningStats()
+            stats.update_many(chunk)
+            slices.append(stats)
+
+        merged = combine_stats(slices)
+        assert merged.count == 500
+        assert merged.mean == pytest.approx(values.mean())
+        assert merged.variance == pytest.approx(values.var(ddof=1))
+
+    def test_round_trip_dict(self):
+        """Test summaries can be rebuilt and merged"""
+        stats = RunningStats()
+        stats.update_many([1.0, 2.0, 3.0])
+        rebuilt = RunningStats.from_dict(stats.to_dict())
+
+        merged = rebuilt.merge(stats)
+        assert merged.count == 6
+        assert merged.mean == pytest.approx(2.0)
+
+
+class TestLinearFit:
+    """Test mergeable regression"""
+
+    def test_chunks_match_polyfit(self):
+        """Test chunked slope and intercept against np.polyfit"""
+        rng = np.random.default_rng(8)
+        x = 1.7e9 + np.arange(2000, dtype=float)
+        y = 3e-3 * x + rng.normal(size=2000)
+
+        fit = LinearFit()
+        for xs, ys in zip(np.array_split(x, 7), np.array_split(y, 7)):
+            fit.update_many(xs, ys)
+
+        slope, intercept = np.polyfit(x, y, 1)
+        assert fit.slope == pytest.approx(slope)
+        assert fit.intercept == pytest.approx(intercept)
+        assert fit.count == 2000
+
+
+class TestMonitoringStatistics:
+    """Test per-field monitoring statistics"""
+
+    def test_update_and_merge(self):
+        """Test per-field updates and device merge"""
+        first = MonitoringStatistics()
+        second = MonitoringStatistics()
+        first.update({'frequency_error': 1.0, 'temperature': 25.0, 'status': 'LOCKED'})
+        first.update({'frequency_error': 3.0, 'temperature': 26.0, 'status': 'LOCKED'})
+        second.update({'frequency_error': 5.0, 'temperature': 27.0, 'status': 'HOLDOVER'})
+
+        summary = first.merge(second).summary()
+        assert summary['frequency_error']['mean'] == pytest.approx(3.0)
+        assert summary['frequency_error']['std_dev'] == pytest.approx(2.0)
+        assert summary['temperature']['current'] == 27.0
+        assert summary['status_distribution'] == {'LOCKED': 2, 'HOLDOVER': 1}
+        assert summary['sample_count'] == 3
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
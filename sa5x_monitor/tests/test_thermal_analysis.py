@@ -0,0 +1,96 @@
+"""
+Tests for the temperature sensitivity regression and lag search
+"""
+
+import pytest
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.thermal_analysis import ThermalSensitivity, compensate_temperature
+from utils.log_parser import LogParser
+
+
+def thermal_record(count, lag=120, sensitivity=3e-6, aging=1e-12, noise=1e-8, seed=0):
+    """Grid times, frequency (ppm) lagging a cycling temperature, and temperature"""
+    rng = np.random.default_rng(seed)
+    times = np.arange(count, dtype=float)
+    temperature = 25 + 0.5 * np.sin(2 * np.pi * times / 5000) + np.cumsum(rng.normal(0, 0.002, count))
+    lagged = np.concatenate((np.full(lag, temperature[0]), temperature[:count - lag]))
+    frequency = 1e-5 + aging * times + sensitivity * (lagged - 25) + rng.normal(0, noise, count)
+    return times, frequency, temperature
+
+
+class TestThermalSensitivity:
+    """Test the lag search, chunk invariance and compensation"""
+
+    def test_recovers_lag_and_sensitivity(self):
+        """Test the lagged sensitivity is found despite a frequency trend"""
+        times, frequency, temperature = thermal_record(50000)
+        valid = np.ones(len(times), dtype=bool)
+        valid[1000:1200] = False
+
+        model = ThermalSensitivity(600)
+        model.update(times, frequency, temperature, valid)
+        results = model.results(1.0, 1e-6)
+
+        assert results['lag'] == 120.0
+        assert results['sensitivity'] == pytest.approx(3e-6, rel=1e-3)
+        assert results['sensitivity_ppb_per_c'] == pytest.approx(3e-3, rel=1e-3)
+        assert results['correlation'] > results['correlation_zero_lag'] > 0
+
+    def test_chunked_updates_match(self):
+        """Test any chunking gives the same sums as one update"""
+        times, frequency, temperature = thermal_record(20000)
+        valid = np.ones(len(times), dtype=bool)
+
+        whole = ThermalSensitivity(300)
+        whole.update(times, frequency, temperature, valid)
+        chunked = ThermalSensitivity(300)
+        for part in np.array_split(np.arange(len(times)), 13):
+            chunked.update(times[part], frequency[part], temperature[part], valid[part])
+
+        for pair in ThermalSensitivity.PAIRS:
+            np.testing.assert_allclose(chunked._sums[pair], whole._sums[pair], rtol=1e-9, atol=1e-9)
+        assert chunked.results(1.0) == pytest.approx(whole.results(1.0), rel=1e-6)
+
+    def test_compensation_removes_temperature_term(self):
+        """Test the compensated residual keeps only trend and noise"""
+        times, frequency, temperature = thermal_record(20000, noise=0.0)
+        valid = np.ones(len(times), dtype=bool)
+        model = ThermalSensitivity(300)
+        model.update(times, frequency, temperature, valid)
+
+        residual, residual_valid = compensate_temperature(frequency, temperature, valid, model.results(1.0), 1.0)
+        assert not residual_valid[:120].any() and residual_valid[120:].all()
+        trend = 1e-5 + 1e-12 * times + 3e-6 * (model.temperature_reference - 25)
+        np.testing.assert_allclose(residual[120:], trend[120:], rtol=0, atol=1e-12)
+
+    def test_constant_temperature(self):
+        """Test a constant temperature gives no sensitivity"""
+        times = np.arange(1000, dtype=float)
+        model = ThermalSensitivity(10)
+        model.update(times, np.sin(times), np.full(1000, 25.0), np.ones(1000, dtype=bool))
+        assert model.results(1.0) == {'samples': 1000}
+
+    def test_log_analysis_includes_sensitivity(self, tmp_path):
+        """Test parsed logs report the sensitivity, compensated ADEV and report section"""
+        times, frequency, temperature = thermal_record(20000, lag=30)
+        log_file = tmp_path / 'run.log'
+        log_file.write_text("".join(f"{t:.1f},{f:.9e},{temp:.5f},12.0,0.5,HOLDOVER\n"
+                                    for t, f, temp in zip(times, frequency, temperature)))
+
+        parser = LogParser()
+        results = parser.parse_holdover_log(str(log_file))
+        thermal = results['thermal']
+        assert thermal['lag'] == 30.0
+        assert thermal['sensitivity_ppb_per_c'] == pytest.approx(3e-3, rel=0.01)
+        assert thermal['compensated_allan_deviations'][100] < results['allan_deviations'][100]
+        assert "Temperature Sensitivity:" in parser.generate_report(results)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
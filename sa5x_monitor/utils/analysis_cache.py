@@ -0,0 +1,129 @@
+"""
+Content-addressed cache for parsed holdover logs
+Stores loaded columns and analysis results on disk, evicted LRU by total size
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class AnalysisCache:
+    """On-disk cache of parse results keyed by file content and analysis options
+
+    The key is a hash of the log's bytes, the parser version and the options
+    that affect the analysis, so renamed or re-uploaded copies of a log hit
+    the same entry and any option change misses. Entries are single pickle
+    files; reading one refreshes its mtime, which drives LRU eviction.
+    """
+
+    SUFFIX = '.pkl'
+    HASH_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_dir: str = 'cache/analysis', max_size_mb: float = 512):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+
+        # Content hashes of files already read, keyed by (path, size, mtime)
+        self._hashes = {}
+
+    @classmethod
+    def from_config(cls, config) -> Optional['AnalysisCache']:
+        """Create the cache described by the 'cache' config section, or None if disabled"""
+        if config is None or not config.get('cache.enabled', False):
+            return None
+        return cls(config.get('cache.directory', 'cache/analysis'),
+                   config.get('cache.max_size_mb', 512))
+
+    def file_hash(self, log_file: str) -> str:
+        """Content hash of a file, remembered while its size and mtime are unchanged"""
+
+        stat = os.stat(log_file)
+        identity = (str(Path(log_file).resolve()), stat.st_size, stat.st_mtime_ns)
+        if identity not in self._hashes:
+            digest = hashlib.blake2b(digest_size=20)
+            with open(log_file, 'rb') as f:
+                for block in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b''):
+                    digest.update(block)
+            self._hashes[identity] = digest.hexdigest()
+        return self._hashes[identity]
+
+    def key(self, log_file: str, options: Dict[str, Any]) -> str:
+        """Cache key for a file analyzed with the given options"""
+        encoded = json.dumps(options, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(self.file_hash(log_file).encode() + encoded, digest_size=20).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+    def get(self, log_file: str, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a file, or None on a miss"""
+
+        path = self._entry_path(self.key(log_file, options))
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, log_file: str, options: Dict[str, Any], entry: Dict[str, Any]):
+        """Store an entry for a file and evict old entries beyond the size limit"""
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._entry_path(self.key(log_file, options))
+
+        # Write to a temporary file first so readers never see a partial entry
+        fd, temp_name = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, path)
+        except Exception as e:
+            self.logger.warning(f"Failed to write cache entry for {log_file}: {e}")
+            Path(temp_name).unlink(missing_ok=True)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its size limit"""
+
+        entries = []
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def size(self) -> int:
+        """Total size of cached entries in bytes"""
+        return sum(path.stat().st_size for path in self.cache_dir.glob(f"*{self.SUFFIX}"))
+
+    def clear(self):
+        """Remove all cached entries"""
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            path.unlink(missing_ok=True)
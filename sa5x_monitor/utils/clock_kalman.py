@@ -0,0 +1,263 @@
+"""
+Online Kalman filter for clock phase, frequency and drift
+Three-state clock model with process noise derived from a measured Allan deviation curve
+"""
+
+import itertools
+import logging
+from typing import Dict, Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .stability import FREQUENCY_UNIT_SCALE
+
+
+# Allan variance of each process noise term at tau: white FM q1/tau,
+# random-walk FM q2*tau/3 and random-walk drift q3*tau^3/20
+ADEV_NOISE_TERMS = (
+    lambda tau: 1.0 / tau,
+    lambda tau: tau / 3.0,
+    lambda tau: tau ** 3 / 20.0
+)
+
+
+def process_noise_from_adev(taus: Sequence[float], adevs: Sequence[float]) -> np.ndarray:
+    """Non-negative diffusion coefficients (q1, q2, q3), fractional units, fitted to an ADEV curve
+
+    Allan variances are fitted with relative weights so every tau counts
+    equally; terms that would need a negative coefficient are dropped.
+    """
+
+    taus = np.asarray(taus, dtype=float)
+    variances = np.asarray(adevs, dtype=float) ** 2
+    if len(taus) != len(variances) or not len(taus):
+        raise ValueError("ADEV curve needs matching, non-empty taus and deviations")
+
+    design = np.column_stack([term(taus) for term in ADEV_NOISE_TERMS]) / variances[:, None]
+    target = np.ones(len(taus))
+
+    # Equilibrate columns: the tau^3 term spans many more decades than 1/tau
+    column_scale = 1.0 / np.linalg.norm(design, axis=0)
+    design = design * column_scale
+
+    # Exhaustive active set: at most 7 subsets of 3 terms
+    best, best_error = np.zeros(len(ADEV_NOISE_TERMS)), np.inf
+    for size in range(1, len(ADEV_NOISE_TERMS) + 1):
+        for subset in itertools.combinations(range(len(ADEV_NOISE_TERMS)), size):
+            solution = np.linalg.lstsq(design[:, subset], target, rcond=None)[0]
+            if np.any(solution < 0):
+                continue
+            error = float(np.sum((design[:, subset] @ solution - target) ** 2))
+            if error < best_error:
+                best, best_error = np.zeros(len(ADEV_NOISE_TERMS)), error
+                best[list(subset)] = solution
+    return best * column_scale
+
+
+def measured_adev(points: Union[Sequence[Dict[str, Any]], Dict[Any, float]], scale: float = 1.0,
+                  min_edf: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Usable (taus, adevs) of a measured ADEV curve, deviations multiplied by scale
+
+    points is either StreamingAllanDeviation.results() output or a log's
+    'allan_deviations' mapping of tau to deviation. Points that are not
+    finite and positive, or whose 'edf' is below min_edf, are dropped.
+    """
+
+    if isinstance(points, dict):
+        points = [{'tau': tau, 'allan_deviation': dev} for tau, dev in points.items()]
+    points = [point for point in points or [] if point.get('edf', np.inf) >= min_edf]
+
+    taus = np.array([float(point['tau']) for point in points])
+    adevs = np.array([float(point['allan_deviation']) for point in points]) * scale
+    usable = np.isfinite(taus) & np.isfinite(adevs) & (taus > 0) & (adevs > 0)
+    order = np.argsort(taus[usable])
+    return taus[usable][order], adevs[usable][order]
+
+
+class ClockKalmanFilter:
+    """Kalman filter of clock phase x (ns), frequency y (ns/s) and drift d (ns/s^2)
+
+    State transition over dt is x += y*dt + d*dt^2/2, y += d*dt. Process
+    noise follows the standard continuous clock model with diffusion
+    coefficients q1 (white FM), q2 (random-walk FM) and q3 (random-walk
+    drift), given in fractional-frequency units as fitted by
+    process_noise_from_adev to a measured ADEV curve; they can be refitted
+    while the filter runs as the measured curve improves. Phase and frequency readings can be fed
+    separately or together; frequency corrections applied by disciplining
+    enter as a known control step. Each update costs a fixed number of
+    3x3 operations.
+    """
+
+    def __init__(self, q_white_fm: float = 1e-22, q_random_walk_fm: float = 1e-27, q_drift: float = 0.0,
+                 phase_noise_ns: float = 1.0, frequency_noise: float = 1e-11,
+                 initial_std: Sequence[float] = (1e3, 1e-6, 1e-12), correction_scale: float = 1e-12):
+        self.logger = logging.getLogger(__name__)
+        self.correction_scale = correction_scale
+
+        self.set_process_noise(q_white_fm, q_random_walk_fm, q_drift)
+        self.phase_variance = phase_noise_ns ** 2
+        self.frequency_variance = (frequency_noise * 1e9) ** 2
+        self.initial_covariance = np.diag((np.asarray(initial_std) * [1.0, 1e9, 1e9]) ** 2)
+
+        self.reset()
+
+    @classmethod
+    def from_adev(cls, taus: Sequence[float], adevs: Sequence[float], **kwargs) -> 'ClockKalmanFilter':
+        """Filter whose process noise reproduces a measured ADEV curve"""
+        q_white_fm, q_random_walk_fm, q_drift = process_noise_from_adev(taus, adevs)
+        return cls(q_white_fm, q_random_walk_fm, q_drift, **kwargs)
+
+    @classmethod
+    def from_config(cls, config, measured: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Optional['ClockKalmanFilter']:
+        """Create the filter described by the 'kalman' config section, or None if disabled
+
+        Process noise is fitted to the measured (taus, adevs) curve when it
+        has at least kalman.adev_min_points points; the kalman.adev table
+        is only the fallback until a measurement is available.
+        """
+        if config is None or not config.get('kalman.enabled', False):
+            return None
+
+        if measured is None or len(measured[0]) < config.get('kalman.adev_min_points', 2):
+            measured = measured_adev(config.get('kalman.adev', {'1': 1e-11, '100': 1e-12, '10000': 2e-12}))
+        return cls.from_adev(*measured,
+                             phase_noise_ns=config.get('kalman.phase_noise_ns', 1.0),
+                             frequency_noise=config.get('kalman.frequency_noise', 1e-11),
+                             correction_scale=config.get('kalman.correction_scale', 1e-12))
+
+    def set_process_noise(self, q_white_fm: float, q_random_walk_fm: float, q_drift: float):
+        """Replace the diffusion coefficients (fractional units); the state is kept"""
+        # Diffusion coefficients in ns^2 units of the state
+        self.q = np.array([q_white_fm, q_random_walk_fm, q_drift]) * 1e18
+
+    def refresh_process_noise(self, taus: Sequence[float], adevs: Sequence[float], min_points: int = 2) -> bool:
+        """Refit the process noise to a measured ADEV curve with at least min_points points
+
+        Returns whether the process noise was updated.
+        """
+        if len(taus) < max(min_points, 1):
+            return False
+        self.set_process_noise(*process_noise_from_adev(taus, adevs))
+        return True
+
+    def reset(self):
+        """Forget the state; the next phase reading initializes it"""
+        self.state = np.zeros(3)
+        self.covariance = self.initial_covariance.copy()
+        self.time = None
+        self.samples = 0
+        self.innovation = 0.0
+        self.normalized_innovation = 0.0
+        self._last_correction = None
+
+    def _predict(self, dt: float, correction: float):
+        """Propagate the state and covariance over dt, then apply a frequency step"""
+
+        transition = np.array([[1.0, dt, dt * dt / 2],
+                               [0.0, 1.0, dt],
+                               [0.0, 0.0, 1.0]])
+        q1, q2, q3 = self.q
+        noise = q1 * np.diag([dt, 0.0, 0.0])
+        noise += q2 * np.array([[dt ** 3 / 3, dt ** 2 / 2, 0.0],
+                                [dt ** 2 / 2, dt, 0.0],
+                                [0.0, 0.0, 0.0]])
+        noise += q3 * np.array([[dt ** 5 / 20, dt ** 4 / 8, dt ** 3 / 6],
+                                [dt ** 4 / 8, dt ** 3 / 3, dt ** 2 / 2],
+                                [dt ** 3 / 6, dt ** 2 / 2, dt]])
+
+        self.state = transition @ self.state
+        self.state[1] += correction * 1e9
+        self.covariance = transition @ self.covariance @ transition.T + noise
+
+    def _correct(self, row: int, measurement: float, variance: float):
+        """Scalar measurement update of one state component"""
+
+        innovation = measurement - self.state[row]
+        innovation_variance = self.covariance[row, row] + variance
+        gain = self.covariance[:, row] / innovation_variance
+
+        self.state += gain * innovation
+        self.covariance -= np.outer(gain, self.covariance[row])
+        self.covariance = (self.covariance + self.covariance.T) / 2
+        return innovation, innovation / np.sqrt(innovation_variance)
+
+    def update(self, time: float, phase_ns: Optional[float] = None, frequency: Optional[float] = None,
+               correction: float = 0.0) -> Dict[str, Any]:
+        """Add one sample at time (s); returns the filtered state
+
+        phase_ns is a phase reading, frequency a fractional frequency
+        reading and correction a fractional frequency step applied to the
+        oscillator since the previous sample.
+        """
+
+        if self.time is None:
+            if phase_ns is not None:
+                self.state[0] = phase_ns
+        else:
+            dt = time - self.time
+            if dt < 0:
+                raise ValueError("Samples must be in time order")
+            self._predict(dt, correction)
+        self.time = time
+
+        if phase_ns is not None:
+            self.innovation, self.normalized_innovation = self._correct(0, phase_ns, self.phase_variance)
+        if frequency is not None:
+            innovation, normalized = self._correct(1, frequency * 1e9, self.frequency_variance)
+            if phase_ns is None:
+                self.innovation, self.normalized_innovation = innovation * 1e-9, normalized
+        self.samples += 1
+        return self.results()
+
+    def update_from_parameters(self, time: float, data: Dict[str, Any], frequency_units: str = 'ppm') -> Dict[str, Any]:
+        """Add a controller get_all_parameters() sample
+
+        The raw Phase reading (ns) is used when the controller reports it,
+        otherwise frequency_error in frequency_units. A change of the raw
+        LastCorrection value is applied as a frequency step of
+        correction_scale per unit.
+        """
+
+        phase = _reading(data.get('raw_Phase'))
+        frequency = None
+        if phase is None and data.get('frequency_error') is not None:
+            frequency = float(data['frequency_error']) * FREQUENCY_UNIT_SCALE[frequency_units]
+
+        correction = 0.0
+        last_correction = _reading(data.get('raw_LastCorrection'))
+        if last_correction is not None:
+            if self._last_correction is not None and last_correction != self._last_correction:
+                correction = (last_correction - self._last_correction) * self.correction_scale
+            self._last_correction = last_correction
+
+        return self.update(time, phase, frequency, correction)
+
+    def results(self) -> Dict[str, Any]:
+        """State, standard deviations and covariance in ns and fractional-frequency units"""
+
+        scale = np.array([1.0, 1e-9, 1e-9])
+        covariance = self.covariance * np.outer(scale, scale)
+        std = np.sqrt(np.maximum(np.diag(covariance), 0.0))
+        phase, frequency, drift = self.state * scale
+
+        return {
+            'time': self.time,
+            'samples': self.samples,
+            'phase_ns': float(phase),
+            'frequency': float(frequency),
+            'drift_per_day': float(drift) * 86400,
+            'phase_std_ns': float(std[0]),
+            'frequency_std': float(std[1]),
+            'drift_per_day_std': float(std[2]) * 86400,
+            'covariance': covariance.tolist(),
+            'innovation': float(self.innovation),
+            'normalized_innovation': float(self.normalized_innovation)
+        }
+
+
+def _reading(value: Any) -> Optional[float]:
+    """Numeric value of a raw controller reading, None when missing or not a number"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
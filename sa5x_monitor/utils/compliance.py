@@ -0,0 +1,208 @@
+"""
+ITU-T mask compliance checking for SA5X holdover runs
+MTIE/TDEV masks in the style of G.811, G.812 and G.8262
+"""
+
+import logging
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+from .stability import calculate_mtie, calculate_tdev, default_taus, MTIETracker
+
+
+# Mask segments: limit = offset + coefficient * tau ** exponent (ns),
+# valid for tau_min < tau <= tau_max (seconds, tau_max may be omitted)
+BUILTIN_MASKS = {
+    'G.811': {
+        'description': 'G.811 primary reference clock, wander generation',
+        'mtie': [
+            {'tau_min': 0.1, 'tau_max': 1000, 'offset': 25.0, 'coefficient': 0.275, 'exponent': 1.0},
+            {'tau_min': 1000, 'tau_max': float('inf'), 'offset': 290.0, 'coefficient': 0.01, 'exponent': 1.0}
+        ],
+        'tdev': [
+            {'tau_min': 0.1, 'tau_max': 100, 'offset': 3.0, 'coefficient': 0.0, 'exponent': 0.0},
+            {'tau_min': 100, 'tau_max': 1000, 'offset': 0.0, 'coefficient': 0.03, 'exponent': 1.0},
+            {'tau_min': 1000, 'tau_max': 10000, 'offset': 30.0, 'coefficient': 0.0, 'exponent': 0.0}
+        ]
+    },
+    'G.812-I': {
+        'description': 'G.812 Type I SSU, wander generation at constant temperature',
+        'mtie': [
+            {'tau_min': 0.1, 'tau_max': 9, 'offset': 24.0, 'coefficient': 0.0, 'exponent': 0.0},
+            {'tau_min': 9, 'tau_max': 400, 'offset': 0.0, 'coefficient': 8.0, 'exponent': 0.5},
+            {'tau_min': 400, 'tau_max': 10000, 'offset': 160.0, 'coefficient': 0.0, 'exponent': 0.0}
+        ],
+        'tdev': [
+            {'tau_min': 0.1, 'tau_max': 25, 'offset': 3.0, 'coefficient': 0.0, 'exponent': 0.0},
+            {'tau_min': 25, 'tau_max': 100, 'offset': 0.0, 'coefficient': 0.12, 'exponent': 1.0},
+            {'tau_min': 100, 'tau_max': 10000, 'offset': 12.0, 'coefficient': 0.0, 'exponent': 0.0}
+        ]
+    },
+    'G.8262-EEC1': {
+        'description': 'G.8262 EEC option 1, wander generation at constant temperature',
+        'mtie': [
+            {'tau_min': 0.1, 'tau_max': 1, 'offset': 40.0, 'coefficient': 0.0, 'exponent': 0.0},
+            {'tau_min': 1, 'tau_max': 100, 'offset': 0.0, 'coefficient': 40.0, 'exponent': 0.1},
+            {'tau_min': 100, 'tau_max': 1000, 'offset': 0.0, 'coefficient': 25.25, 'exponent': 0.2}
+        ],
+        'tdev': [
+            {'tau_min': 0.1, 'tau_max': 25, 'offset': 3.2, 'coefficient': 0.0, 'exponent': 0.0},
+            {'tau_min': 25, 'tau_max': 100, 'offset': 0.0, 'coefficient': 0.64, 'exponent': 0.5},
+            {'tau_min': 100, 'tau_max': 1000, 'offset': 6.4, 'coefficient': 0.0, 'exponent': 0.0}
+        ]
+    }
+}
+
+
+def mask_limits(segments: List[Dict[str, float]], taus: Sequence[float]) -> np.ndarray:
+    """Evaluate a piecewise mask at the given taus (NaN where the mask is undefined)"""
+
+    taus = np.asarray(taus, dtype=float)
+    limits = np.full(len(taus), np.nan)
+    for segment in segments:
+        inside = (taus > segment.get('tau_min', 0.0)) & (taus <= segment.get('tau_max', np.inf))
+        limits[inside] = (segment.get('offset', 0.0)
+                          + segment.get('coefficient', 0.0) * taus[inside] ** segment.get('exponent', 0.0))
+    return limits
+
+
+def compare_to_mask(taus: Sequence[float], values: Sequence[float], limits: np.ndarray) -> Dict[str, Any]:
+    """Compare a stability curve to mask limits; positive margin means headroom"""
+
+    taus = np.asarray(taus, dtype=float)
+    values = np.asarray(values, dtype=float)
+    margin = limits - values
+    checked = ~np.isnan(margin)
+    failed = checked & (margin < 0)
+
+    points = []
+    for tau, value, limit, point_margin, ok in zip(taus[checked], values[checked], limits[checked],
+                                                   margin[checked], ~failed[checked]):
+        points.append({
+            'tau': float(tau),
+            'value': float(value),
+            'limit': float(limit),
+            'margin': float(point_margin),
+            'passed': bool(ok)
+        })
+
+    return {
+        'passed': bool(checked.any() and not failed.any()),
+        'checked_points': int(checked.sum()),
+        'worst_margin': float(margin[checked].min()) if checked.any() else None,
+        'points': points
+    }
+
+
+class ComplianceChecker:
+    """Evaluates holdover phase data against MTIE/TDEV masks"""
+
+    def __init__(self, config=None):
+        self.logger = logging.getLogger(__name__)
+        self.masks = dict(BUILTIN_MASKS)
+
+        # User-defined masks from the configuration override built-in ones
+        if config is not None:
+            user_masks = config.get('compliance.masks', {}) or {}
+            for name, mask in user_masks.items():
+                if not mask.get('mtie') and not mask.get('tdev'):
+                    self.logger.warning(f"Ignoring mask {name}: no MTIE or TDEV segments")
+                    continue
+                self.masks[name] = mask
+
+    def list_masks(self) -> Dict[str, str]:
+        """Return available mask names and descriptions"""
+        return {name: mask.get('description', '') for name, mask in self.masks.items()}
+
+    def get_mask(self, name: str) -> Dict[str, Any]:
+        """Get mask definition by name"""
+        if name not in self.masks:
+            raise ValueError(f"Unknown compliance mask: {name}")
+        return self.masks[name]
+
+    def evaluate_curves(self, mask_name: str, taus: Sequence[float],
+                        mtie: Optional[Sequence[float]] = None,
+                        tdev: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+        """Evaluate precomputed MTIE/TDEV curves against a mask"""
+
+        mask = self.get_mask(mask_name)
+        result = {'mask': mask_name, 'description': mask.get('description', '')}
+        verdicts = []
+
+        for metric, values in (('mtie', mtie), ('tdev', tdev)):
+            if values is None or not mask.get(metric):
+                continue
+            limits = mask_limits(mask[metric], taus)
+            result[metric] = compare_to_mask(taus, values, limits)
+            if result[metric]['checked_points']:
+                verdicts.append(result[metric]['passed'])
+
+        result['passed'] = bool(verdicts) and all(verdicts)
+        return result
+
+    def evaluate(self, phase: np.ndarray, tau0: float, mask_name: str,
+                 taus: Optional[Sequence[float]] = None) -> Dict[str, Any]:
+        """Compute MTIE/TDEV of a phase series (ns) and evaluate them against a mask"""
+
+        phase = np.asarray(phase, dtype=float)
+        if taus is None:
+            taus = default_taus(len(phase), tau0)
+        taus = np.asarray(taus, dtype=float)
+
+        mtie = calculate_mtie(phase, taus, tau0)['mtie']
+        tdev = calculate_tdev(phase, taus, tau0)['tdev']
+
+        result = self.evaluate_curves(mask_name, taus, mtie, tdev)
+        result['taus'] = taus.tolist()
+        return result
+
+    def live_monitor(self, mask_name: str, tau0: float,
+                     taus: Optional[Sequence[float]] = None) -> 'LiveComplianceMonitor':
+        """Create an incremental MTIE monitor for a running test"""
+        return LiveComplianceMonitor(self.get_mask(mask_name), tau0, taus, mask_name)
+
+
+class LiveComplianceMonitor:
+    """Incremental MTIE mask check during a live holdover test
+
+    MTIE over a growing record can only increase, so a violation seen
+    mid-test is final and the test can be aborted. TDEV is not monotonic
+    and is evaluated on the complete record instead.
+    """
+
+    def __init__(self, mask: Dict[str, Any], tau0: float,
+                 taus: Optional[Sequence[float]] = None, name: str = 'custom'):
+        if not mask.get('mtie'):
+            raise ValueError(f"Mask {name} has no MTIE segments for live checking")
+
+        if taus is None:
+            # Decade taus up to one day, limited to the mask's definition
+            taus = default_taus(int(86400 / tau0) + 1, tau0)
+        taus = np.asarray(taus, dtype=float)
+        limits = mask_limits(mask['mtie'], taus)
+        defined = ~np.isnan(limits)
+
+        self.name = name
+        self.taus = taus[defined]
+        self.limits = limits[defined]
+        self.tracker = MTIETracker(self.taus, tau0)
+        self.violation = None
+
+    def update(self, phase: float) -> Optional[Dict[str, Any]]:
+        """Add one phase sample (ns); returns violation details on the first failure"""
+
+        mtie = self.tracker.update(phase)
+        if self.violation is None:
+            exceeded = np.flatnonzero(mtie > self.limits)
+            if exceeded.size:
+                idx = exceeded[0]
+                self.violation = {
+                    'mask': self.name,
+                    'tau': float(self.taus[idx]),
+                    'mtie': float(mtie[idx]),
+                    'limit': float(self.limits[idx]),
+                    'sample': self.tracker.count
+                }
+                return self.violation
+        return None
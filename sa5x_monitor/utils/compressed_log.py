@@ -0,0 +1,158 @@
+"""
+Compressed log support
+Detects gzip/xz/zstd logs by magic bytes and decompresses them on a background thread
+"""
+
+import io
+import gzip
+import lzma
+import queue
+import struct
+import threading
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .zst logs
+    zstandard = None
+
+
+# Leading bytes of each supported container
+COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'xz': b'\xfd7zXZ\x00',
+    'zstd': b'\x28\xb5\x2f\xfd'
+}
+
+COMPRESSED_SUFFIXES = ('.gz', '.xz', '.zst')
+
+# Uncompressed/compressed size ratio assumed when the container does not record it
+TYPICAL_COMPRESSION_RATIO = 8
+
+
+def detect_compression(log_file: str) -> Optional[str]:
+    """Compression of a file by its magic bytes: 'gzip', 'xz', 'zstd' or None for plain text"""
+    with open(log_file, 'rb') as f:
+        head = f.read(max(len(magic) for magic in COMPRESSION_MAGIC.values()))
+    for name, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_decompressed(log_file: str, compression: str) -> BinaryIO:
+    """Binary stream of the decompressed content"""
+
+    if compression == 'gzip':
+        return gzip.open(log_file, 'rb')
+    if compression == 'xz':
+        return lzma.open(log_file, 'rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("Reading .zst logs requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(open(log_file, 'rb'), closefd=True)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def open_log_text(log_file: str) -> io.TextIOBase:
+    """Open a plain or compressed log for reading text lines"""
+    compression = detect_compression(log_file)
+    if compression is None:
+        return open(log_file, 'r')
+    return io.TextIOWrapper(open_decompressed(log_file, compression))
+
+
+def estimate_content_size(log_file: str, compression: Optional[str] = None) -> int:
+    """Decompressed size of a log in bytes, estimated where the container does not record it"""
+
+    size = Path(log_file).stat().st_size
+    if compression is None:
+        return size
+
+    try:
+        if compression == 'gzip':
+            # ISIZE trailer: size of the last member modulo 2**32
+            with open(log_file, 'rb') as f:
+                f.seek(-4, io.SEEK_END)
+                recorded = struct.unpack('<I', f.read(4))[0]
+            while recorded < size:
+                recorded += 1 << 32
+            return recorded
+        if compression == 'zstd' and zstandard is not None:
+            with open(log_file, 'rb') as f:
+                header = f.read(18)
+            try:
+                recorded = zstandard.frame_content_size(header)
+            except zstandard.ZstdError:
+                recorded = -1
+            if recorded > 0:
+                return recorded
+    except (OSError, struct.error):
+        pass
+    return size * TYPICAL_COMPRESSION_RATIO
+
+
+class BackgroundDecompressor:
+    """Iterate over decompressed blocks produced by a reader thread
+
+    The thread keeps up to queue_depth blocks ahead of the consumer, so
+    decompression (which releases the GIL in zlib, lzma and zstd) overlaps
+    with parsing. Errors raised by the reader are re-raised in the consumer.
+    """
+
+    _DONE = object()
+
+    def __init__(self, log_file: str, compression: str, block_size: int = 2 * 1024 * 1024,
+                 queue_depth: int = 4):
+        self.log_file = log_file
+        self.compression = compression
+        self.block_size = block_size
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __iter__(self) -> Iterator[bytes]:
+        # Open in the consumer so a missing decoder is reported immediately
+        stream = open_decompressed(self.log_file, self.compression)
+        self._thread = threading.Thread(target=self._read, args=(stream,), daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            self.close()
+
+    def _read(self, stream: BinaryIO):
+        """Reader thread: decompress blocks into the queue until EOF, an error or close()"""
+        try:
+            with stream:
+                while not self._stop.is_set():
+                    block = stream.read(self.block_size)
+                    if not block:
+                        break
+                    self._put(block)
+            self._put(self._DONE)
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        """Queue an item, giving up when the consumer has gone away"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        """Stop the reader thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -36,7 +36,9 @@ class ConfigManager:
                 'max_interval': 3600,
                 'min_interval': 1,
                 'log_enabled': True,
-                'log_level': 'INFO'
+                'log_level': 'INFO',
+                'ewma_alpha': 0.1,
+                'statistics_window': 360
             },
             'holdover_test': {
                 'min_duration': 300,
@@ -52,7 +54,50 @@ class ConfigManager:
                 'allan_deviation_taus': [1, 10, 100, 1000],
                 'frequency_stability_threshold': 1e-9,
                 'temperature_stability_threshold': 0.1,
-                'enable_advanced_analysis': True
+                'enable_advanced_analysis': True,
+                'frequency_error_units': 'ppm',
+                'streaming_allan_octaves': 12,
+                'streaming_threshold_mb': 256,
+                'streaming_max_window': 86400,
+                'parallel_workers': None,
+                'ingest_engine': 'text',
+                'tail_poll_interval': 1.0,
+                'resample_interval': None,
+                'resample_gap_factor': 1.5,
+                'phase_limit_ns': 1000.0,
+                'drift_confidence': 0.95,
+                'thermal_max_lag': 3600.0,
+                'psd_segment_length': 4096,
+                'carrier_frequency': 10000000.0,
+                'dynamic_adev_window': 3600.0,
+                'dynamic_adev_step': 600.0,
+                'adev_confidence': 0.683
+            },
+            'compliance': {
+                'default_mask': 'G.8262-EEC1',
+                'live_check': False,
+                'abort_on_violation': True,
+                'masks': {}
+            },
+            'cache': {
+                'enabled': True,
+                'directory': 'cache/analysis',
+                'max_size_mb': 512
+            },
+            'index': {
+                'enabled': True,
+                'stride': 10000,
+                'directory': 'cache/index'
+            },
+            'kalman': {
+                'enabled': True,
+                'adev': {'1': 1e-11, '100': 1e-12, '10000': 2e-12},
+                'adev_min_points': 2,
+                'adev_min_edf': 10,
+                'adev_refresh_samples': 60,
+                'phase_noise_ns': 1.0,
+                'frequency_noise': 1e-11,
+                'correction_scale': 1e-12
             },
             'output': {
                 'default_output_dir': 'results',
@@ -135,8 +180,8 @@ class ConfigManager:
         except (KeyError, TypeError):
             return default
     
-    def set(self, key_path: str, value: Any):
-        """Set configuration value by key path"""
+    def set(self, key_path: str, value: Any, save: bool = True):
+        """Set configuration value by key path; save=False keeps the change in memory only"""
         keys = key_path.split('.')
         config = self.config
         
@@ -148,7 +193,8 @@ class ConfigManager:
         
         # Set the value
         config[keys[-1]] = value
-        self._save_config()
+        if save:
+            self._save_config()
     
     def get_serial_config(self) -> Dict[str, Any]:
         """Get serial configuration"""
@@ -166,6 +212,14 @@ class ConfigManager:
         """Get analysis configuration"""
         return self.config['analysis']
     
+    def get_compliance_config(self) -> Dict[str, Any]:
+        """Get mask compliance configuration"""
+        return self.config['compliance']
+    
+    def get_cache_config(self) -> Dict[str, Any]:
+        """Get analysis cache configuration"""
+        return self.config['cache']
+    
     def get_output_config(self) -> Dict[str, Any]:
         """Get output configuration"""
         return self.config['output']
@@ -0,0 +1,175 @@
+"""
+Phase drift and aging model for holdover prediction
+Incremental weighted least squares of x(t) = x0 + y0*t + D*t^2/2 with time-to-limit estimates
+"""
+
+import logging
+from statistics import NormalDist
+from typing import Dict, Any, Optional, Tuple, Union
+
+import numpy as np
+
+
+# Bisection steps when solving for the time a confidence band reaches the limit
+LIMIT_SEARCH_STEPS = 60
+
+
+class PhaseDriftModel:
+    """Quadratic phase model fitted incrementally by weighted least squares
+
+    Phase x (ns) against time t (s) is modelled as offset x0, frequency
+    offset y0 (ns/s, i.e. 1e-9 fractional) and linear frequency aging D
+    (ns/s^2). Only the weighted normal-equation sums are kept, so updates
+    are O(samples) and memory is constant. Weights are relative (e.g.
+    inverse phase variance); the residual scatter sets the noise level.
+    Confidence bands treat residuals as independent, which understates
+    the uncertainty of random-walk phase noise far beyond the record.
+    """
+
+    TERMS = 3
+
+    def __init__(self, confidence: float = 0.95, max_horizon: float = 10 * 365 * 86400.0):
+        if not 0 < confidence < 1:
+            raise ValueError("Confidence must be between 0 and 1")
+
+        self.logger = logging.getLogger(__name__)
+        self.confidence = confidence
+        self.max_horizon = max_horizon
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+        self.origin = None
+        self.phase_origin = 0.0
+        self.count = 0
+        self.last_time = None
+        self._moments = np.zeros(2 * self.TERMS - 1)  # sum w * t^k, k = 0..4
+        self._cross = np.zeros(self.TERMS)            # sum w * t^k * x, k = 0..2
+        self._phase_sq = 0.0                          # sum w * x^2
+
+    def update(self, times: Union[float, np.ndarray], phase: Union[float, np.ndarray],
+               weights: Optional[Union[float, np.ndarray]] = None):
+        """Add phase samples (ns) at times (s); zero weights exclude samples"""
+
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        phase = np.atleast_1d(np.asarray(phase, dtype=float))
+        if not len(times):
+            return
+        weights = np.ones(len(times)) if weights is None else np.broadcast_to(
+            np.asarray(weights, dtype=float), times.shape)
+
+        # Work relative to the first sample so the sums stay well conditioned
+        if self.origin is None:
+            self.origin = float(times[0])
+            self.phase_origin = float(phase[0])
+        t = times - self.origin
+        x = phase - self.phase_origin
+
+        powers = np.vander(t, 2 * self.TERMS - 1, increasing=True)
+        self._moments += weights @ powers
+        self._cross += (weights * x) @ powers[:, :self.TERMS]
+        self._phase_sq += float(np.dot(weights, x * x))
+        self.count += int(np.count_nonzero(weights))
+        self.last_time = float(times[-1])
+
+    @property
+    def ready(self) -> bool:
+        return self.count > self.TERMS
+
+    def _normal_matrix(self) -> np.ndarray:
+        return np.array([self._moments[i:i + self.TERMS] for i in range(self.TERMS)])
+
+    def _solve(self) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Coefficients, their covariance and the residual variance of an average-weight sample"""
+
+        matrix = self._normal_matrix()
+
+        # Equilibrate: t^4 and t^0 sums differ by many orders of magnitude
+        diagonal = np.diag(matrix)
+        scale = 1.0 / np.sqrt(np.where(diagonal > 0, diagonal, 1.0))
+        scale = np.outer(scale, scale)
+        inverse = np.linalg.pinv(matrix * scale) * scale
+        coefficients = inverse @ self._cross
+
+        # Variance of unit weight from the weighted residual sum of squares
+        residual = max(self._phase_sq - float(coefficients @ self._cross), 0.0)
+        unit_variance = residual / (self.count - self.TERMS)
+        mean_weight = self._moments[0] / self.count
+        return coefficients, inverse * unit_variance, unit_variance / mean_weight
+
+    def _evaluate(self, solution, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Phase and standard deviation at times for a _solve() result"""
+        coefficients, covariance, variance = solution
+        basis = np.vander(np.atleast_1d(times) - self.origin, self.TERMS, increasing=True)
+        phase = self.phase_origin + basis @ coefficients
+        spread = np.einsum('ij,jk,ik->i', basis, covariance, basis)
+        return phase, np.sqrt(spread + variance)
+
+    def predict(self, times: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Predicted phase (ns) and its standard deviation, including residual noise"""
+
+        if not self.ready:
+            raise ValueError("Not enough samples for the drift model")
+        return self._evaluate(self._solve(), np.asarray(times, dtype=float))
+
+    def time_to_limit(self, limit: float, band: float = 0.0) -> Optional[float]:
+        """Seconds after the last sample until |phase| + band * sigma reaches limit
+
+        band=0 uses the fitted curve, +z the early edge of the confidence
+        band and -z the late edge. None when the limit is not reached within
+        max_horizon.
+        """
+
+        if not self.ready:
+            raise ValueError("Not enough samples for the drift model")
+        solution = self._solve()
+
+        def excess(offset: float) -> float:
+            phase, sigma = self._evaluate(solution, np.array([self.last_time + offset]))
+            return float(abs(phase[0]) + band * sigma[0] - limit)
+
+        if excess(0.0) >= 0:
+            return 0.0
+
+        # Bracket the first crossing on a geometric scale, then bisect
+        low, high = 0.0, max(self.last_time - self.origin, 1.0) / 64
+        while excess(high) < 0:
+            if high >= self.max_horizon:
+                return None
+            low, high = high, min(high * 2, self.max_horizon)
+        for _ in range(LIMIT_SEARCH_STEPS):
+            middle = (low + high) / 2
+            if excess(middle) >= 0:
+                high = middle
+            else:
+                low = middle
+        return high
+
+    def results(self, phase_limit: Optional[float] = None) -> Dict[str, Any]:
+        """Model coefficients with uncertainties and, given a limit, time-to-limit estimates"""
+
+        if not self.ready:
+            return {'samples': self.count}
+
+        coefficients, covariance, variance = self._solve()
+        sigma = np.sqrt(np.maximum(np.diag(covariance), 0.0))
+
+        results = {
+            'samples': self.count,
+            'span': self.last_time - self.origin,
+            'phase_offset_ns': self.phase_origin + float(coefficients[0]),
+            'frequency_offset': float(coefficients[1]) * 1e-9,
+            'aging_per_day': 2 * float(coefficients[2]) * 1e-9 * 86400,
+            'phase_offset_std_ns': float(sigma[0]),
+            'frequency_offset_std': float(sigma[1]) * 1e-9,
+            'aging_per_day_std': 2 * float(sigma[2]) * 1e-9 * 86400,
+            'residual_rms_ns': float(np.sqrt(variance)),
+            'confidence': self.confidence
+        }
+
+        if phase_limit is not None:
+            results.update({
+                'phase_limit_ns': phase_limit,
+                'time_to_limit': self.time_to_limit(phase_limit),
+                'time_to_limit_earliest': self.time_to_limit(phase_limit, self.z),
+                'time_to_limit_latest': self.time_to_limit(phase_limit, -self.z)
+            })
+        return results
@@ -8,9 +8,17 @@ import logging
 import json
 import numpy as np
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from pathlib import Path
 
+from .stability import (FREQUENCY_UNIT_SCALE, adev_confidence, adev_edf, calculate_adev, frequency_to_phase,
+                        measurements_to_phase, noise_alpha_from_slope)
+from .spectral_analysis import NOISE_TYPES
+from .compliance import ComplianceChecker
+from .log_parser import LogParser
+from .measurement_block import MeasurementBlock
+from .drift_model import PhaseDriftModel
+
 
 class HoldoverTest:
     """Holdover test implementation for SA5X"""
@@ -26,8 +34,41 @@ class HoldoverTest:
         self.min_interval = 1  # 1 second minimum
         self.max_interval = 60  # 60 seconds maximum
         
-    def run_test(self, duration: int, interval: int, output_file: str) -> Dict[str, Any]:
-        """Run holdover test"""
+        # Analysis options
+        self.frequency_units = self._config_value('analysis.frequency_error_units', 'ppm')
+        self.compliance_mask = self._config_value('compliance.default_mask', 'G.8262-EEC1')
+        self.phase_limit = self._config_value('analysis.phase_limit_ns', 1000.0)
+        self.drift_confidence = self._config_value('analysis.drift_confidence', 0.95)
+        self.adev_confidence = self._config_value('analysis.adev_confidence', 0.683)
+        
+        # Live phase drift model and its latest time-to-limit prediction
+        self.drift_model = None
+        self.prediction = None
+        
+    def _config_value(self, key_path: str, default: Any) -> Any:
+        """Read a configuration value, tolerating a missing config"""
+        if self.config is None:
+            return default
+        return self.config.get(key_path, default)
+    
+    def _create_live_monitor(self, interval: int):
+        """Create the live MTIE mask monitor if enabled in the configuration"""
+        if not self._config_value('compliance.live_check', False):
+            return None
+        try:
+            return ComplianceChecker(self.config).live_monitor(self.compliance_mask, interval)
+        except ValueError as e:
+            self.logger.warning(f"Live compliance check disabled: {e}")
+            return None
+        
+    def run_test(self, duration: int, interval: int, output_file: str,
+                 measurement_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Run holdover test
+        
+        measurement_callback, if given, is called with every new measurement
+        so callers can update live analysis while the test runs; by then
+        self.prediction holds the drift model's time-to-limit estimate.
+        """
         
         # Validate parameters
         if duration < self.min_duration:
@@ -46,7 +87,7 @@ class HoldoverTest:
             'start_time': datetime.now().isoformat(),
             'duration': duration,
             'interval': interval,
-            'measurements': []
+            'measurements': MeasurementBlock(duration // interval + 1, separate_elapsed=True)
         }
         
         # Start holdover mode
@@ -55,6 +96,13 @@ class HoldoverTest:
         
         self.logger.info("Holdover mode started")
         
+        live_monitor = self._create_live_monitor(interval)
+        abort_on_violation = self._config_value('compliance.abort_on_violation', True)
+        phase_scale = FREQUENCY_UNIT_SCALE.get(self.frequency_units, 1e-6) * 1e9
+        phase_ns = 0.0
+        self.drift_model = PhaseDriftModel(self.drift_confidence)
+        self.prediction = None
+        
         try:
             # Run measurements
             start_time = time.time()
@@ -81,14 +129,41 @@ class HoldoverTest:
                     'status': status
                 }
                 
+                # Integrate phase from the previous sample held over the elapsed interval
+                measurements = test_data['measurements']
+                if measurements.count:
+                    phase_ns += measurements['frequency_error'][-1] * phase_scale * (
+                        measurement['elapsed_time'] - measurements['elapsed_time'][-1])
+                
                 test_data['measurements'].append(measurement)
                 measurement_count += 1
                 
+                self.drift_model.update(measurement['elapsed_time'], phase_ns)
+                if self.drift_model.ready:
+                    self.prediction = self.drift_model.results(self.phase_limit)
+                
+                if measurement_callback:
+                    try:
+                        measurement_callback(measurement)
+                    except Exception as e:
+                        self.logger.warning(f"Measurement callback failed: {e}")
+                
                 self.logger.debug(f"Measurement {measurement_count}: "
                                 f"freq_error={freq_error:.2e}, "
                                 f"temp={temperature:.2f}°C, "
                                 f"status={status}")
                 
+                if live_monitor:
+                    violation = live_monitor.update(phase_ns)
+                    if violation:
+                        test_data['compliance_violation'] = violation
+                        self.logger.warning(f"MTIE mask {violation['mask']} violated at "
+                                            f"τ={violation['tau']:g}s: {violation['mtie']:.2f} ns "
+                                            f"> {violation['limit']:.2f} ns")
+                        if abort_on_violation:
+                            self.logger.warning("Aborting holdover test on mask violation")
+                            break
+                
                 # Wait for next measurement
                 time.sleep(interval)
             
@@ -98,6 +173,8 @@ class HoldoverTest:
             
             # Calculate results
             results = self._calculate_results(test_data)
+            if 'compliance_violation' in test_data:
+                results['compliance_violation'] = test_data['compliance_violation']
             test_data['results'] = results
             
             # Save results
@@ -117,10 +194,21 @@ class HoldoverTest:
         if len(measurements) < 2:
             raise ValueError("Insufficient measurements for analysis")
         
-        # Extract data arrays
-        elapsed_times = np.array([m['elapsed_time'] for m in measurements])
-        freq_errors = np.array([m['frequency_error'] for m in measurements])
-        temperatures = np.array([m['temperature'] for m in measurements])
+        # Older callers pass a list of measurement dicts
+        if not isinstance(measurements, MeasurementBlock):
+            measurements = {name: np.array([m[name] for m in measurements])
+                            for name in ('elapsed_time', 'frequency_error', 'temperature')}
+        
+        return self._calculate_results_from_arrays(measurements['elapsed_time'], measurements['frequency_error'],
+                                                   measurements['temperature'])
+    
+    def _calculate_results_from_arrays(self, elapsed_times: np.ndarray, freq_errors: np.ndarray,
+                                       temperatures: np.ndarray) -> Dict[str, Any]:
+        """Calculate test results from measurement columns"""
+        
+        measurement_count = len(elapsed_times)
+        if measurement_count < 2:
+            raise ValueError("Insufficient measurements for analysis")
         
         # Calculate frequency stability metrics
         freq_stability = np.std(freq_errors)
@@ -129,19 +217,23 @@ class HoldoverTest:
         # Calculate Allan Deviation (simplified)
         tau_values = [1, 10, 100, 1000]  # Tau values in seconds
         allan_deviations = []
+        pick_counts = []
         
         for tau in tau_values:
-            if tau < len(measurements) // 2:
+            if tau < measurement_count // 2:
                 # Calculate Allan deviation for this tau
-                m = len(measurements) // tau
+                m = measurement_count // tau
                 if m > 1:
                     freq_diff = np.diff(freq_errors[:m*tau:tau])
                     allan_dev = np.sqrt(np.mean(freq_diff**2) / 2)
                     allan_deviations.append(allan_dev)
+                    pick_counts.append(m)
                 else:
                     allan_deviations.append(0.0)
+                    pick_counts.append(0)
             else:
                 allan_deviations.append(0.0)
+                pick_counts.append(0)
         
         # Calculate temperature stability
         temp_stability = np.std(temperatures)
@@ -152,11 +244,12 @@ class HoldoverTest:
         
         results = {
             'test_duration': elapsed_times[-1],
-            'measurement_count': len(measurements),
+            'measurement_count': measurement_count,
             'freq_stability': freq_stability,
             'freq_drift_rate': freq_drift,
             'allan_deviation_1s': allan_deviation_1s,
             'allan_deviations': dict(zip(tau_values, allan_deviations)),
+            'allan_confidence': self._allan_confidence(freq_errors, tau_values, allan_deviations, pick_counts),
             'temp_stability': temp_stability,
             'temp_drift_rate': temp_drift,
             'freq_error_min': np.min(freq_errors),
@@ -164,11 +257,62 @@ class HoldoverTest:
             'freq_error_mean': np.mean(freq_errors),
             'temp_min': np.min(temperatures),
             'temp_max': np.max(temperatures),
-            'temp_mean': np.mean(temperatures)
+            'temp_mean': np.mean(temperatures),
+            'drift_model': self._fit_drift_model(elapsed_times, freq_errors),
+            'compliance': self._evaluate_compliance(elapsed_times, freq_errors)
         }
         
         return results
     
+    def _allan_confidence(self, freq_errors: np.ndarray, tau_values: List[int], allan_deviations: List[float],
+                          pick_counts: List[int]) -> Dict[int, Dict[str, Any]]:
+        """EDF and chi-squared bounds of each Allan deviation, noise type from the ADEV slope
+        
+        The picked deviations are not averaged over tau, so white FM looks
+        flat in them; the slope is read from the overlapping ADEV of the
+        same samples instead.
+        """
+        
+        ready = [i for i, dev in enumerate(allan_deviations) if dev > 0]
+        if not ready:
+            return {}
+        
+        taus = np.array([tau_values[i] for i in ready], dtype=float)
+        adev = np.array([allan_deviations[i] for i in ready])
+        averaged = calculate_adev(frequency_to_phase(freq_errors), taus)['adev']
+        usable = np.isfinite(averaged) & (averaged > 0)
+        alphas = np.zeros(len(taus), dtype=int)
+        alphas[usable] = noise_alpha_from_slope(taus[usable], averaged[usable])
+        # m picks at spacing tau are a series of m - 1 pairs, i.e. m + 1 phase points at m = 1
+        edf = adev_edf(alphas, np.array([pick_counts[i] for i in ready]) + 1, 1)
+        bounds = adev_confidence(adev, edf, self.adev_confidence)
+        
+        return {
+            tau_values[i]: {'edf': float(edf[k]), 'lower': float(bounds['lower'][k]),
+                            'upper': float(bounds['upper'][k]), 'noise_type': NOISE_TYPES[int(alphas[k])]}
+            for k, i in enumerate(ready)
+        }
+    
+    def _fit_drift_model(self, elapsed_times: np.ndarray, freq_errors: np.ndarray) -> Dict[str, Any]:
+        """Fit the phase drift model to the whole run and predict the time to the phase limit"""
+        
+        phase_data = measurements_to_phase(elapsed_times, freq_errors, self.frequency_units)
+        model = PhaseDriftModel(self.drift_confidence)
+        model.update(elapsed_times, phase_data['phase'])
+        return model.results(self.phase_limit)
+    
+    def _evaluate_compliance(self, elapsed_times: np.ndarray, freq_errors: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Evaluate the run's MTIE/TDEV against the configured mask"""
+        
+        phase_data = measurements_to_phase(elapsed_times, freq_errors, self.frequency_units)
+        
+        try:
+            return ComplianceChecker(self.config).evaluate(
+                phase_data['phase'], phase_data['tau0'], self.compliance_mask)
+        except ValueError as e:
+            self.logger.warning(f"Compliance check skipped: {e}")
+            return None
+    
     def _save_results(self, test_data: Dict[str, Any], output_file: str):
         """Save test results to file"""
         
@@ -176,7 +320,10 @@ class HoldoverTest:
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Save detailed results as JSON
+        # Save detailed results as JSON, measurements in their per-sample dict form
+        measurements = test_data['measurements']
+        if isinstance(measurements, MeasurementBlock):
+            test_data = dict(test_data, measurements=measurements.to_dicts())
         with open(output_file, 'w') as f:
             json.dump(test_data, f, indent=2, default=str)
         
@@ -198,6 +345,18 @@ class HoldoverTest:
             f.write(f"  Max Error: {results['freq_error_max']:.2e}\n")
             f.write(f"  Mean Error: {results['freq_error_mean']:.2e}\n\n")
             
+            drift = results.get('drift_model') or {}
+            if 'time_to_limit' in drift:
+                f.write("Phase Drift Model:\n")
+                f.write(f"  Frequency Offset: {drift['frequency_offset']:.3e}\n")
+                f.write(f"  Aging: {drift['aging_per_day']:.3e}/day\n")
+                f.write(f"  Residual Noise (RMS): {drift['residual_rms_ns']:.2f} ns\n")
+                for key, label in (('time_to_limit', 'Time to Limit'), ('time_to_limit_earliest', '  earliest'),
+                                   ('time_to_limit_latest', '  latest')):
+                    value = drift[key]
+                    f.write(f"  {label}: {'beyond horizon' if value is None else f'{value / 3600:.1f} h'}\n")
+                f.write("\n")
+            
             f.write("Temperature Stability:\n")
             f.write(f"  Stability (std): {results['temp_stability']:.3f}°C\n")
             f.write(f"  Drift Rate: {results['temp_drift_rate']:.3f}°C/s\n")
@@ -206,8 +365,23 @@ class HoldoverTest:
             f.write(f"  Mean Temp: {results['temp_mean']:.2f}°C\n\n")
             
             f.write("Allan Deviations:\n")
+            confidence = results.get('allan_confidence', {})
             for tau, dev in results['allan_deviations'].items():
-                f.write(f"  τ={tau}s: {dev:.2e}\n")
+                bounds = confidence.get(tau)
+                if bounds:
+                    f.write(f"  τ={tau}s: {dev:.2e} [{bounds['lower']:.2e}, {bounds['upper']:.2e}] "
+                            f"({bounds['noise_type']}, EDF {bounds['edf']:.1f})\n")
+                else:
+                    f.write(f"  τ={tau}s: {dev:.2e}\n")
+            
+            compliance = results.get('compliance')
+            if compliance:
+                f.write(f"\nMask Compliance ({compliance['mask']}): "
+                        f"{'PASS' if compliance['passed'] else 'FAIL'}\n")
+            violation = results.get('compliance_violation')
+            if violation:
+                f.write(f"  Live MTIE violation at τ={violation['tau']:g}s after "
+                        f"{violation['sample']} samples\n")
         
         self.logger.info(f"Results saved to {output_file} and {summary_file}")
     
@@ -217,37 +391,14 @@ class HoldoverTest:
         if not Path(log_file).exists():
             raise FileNotFoundError(f"Log file not found: {log_file}")
         
-        # Parse log file
-        measurements = []
-        with open(log_file, 'r') as f:
-            for line in f:
-                try:
-                    # Parse log line format: timestamp,freq_error,temperature,voltage,current,status
-                    parts = line.strip().split(',')
-                    if len(parts) >= 6:
-                        measurement = {
-                            'timestamp': float(parts[0]),
-                            'elapsed_time': float(parts[0]),
-                            'frequency_error': float(parts[1]),
-                            'temperature': float(parts[2]),
-                            'voltage': float(parts[3]),
-                            'current': float(parts[4]),
-                            'status': parts[5]
-                        }
-                        measurements.append(measurement)
-                except (ValueError, IndexError):
-                    continue
-        
-        if not measurements:
-            raise ValueError("No valid measurements found in log file")
+        # Load columns with the shared bulk loader
+        arrays = LogParser(self.config).load_log_arrays(log_file)
         
-        # Create test data structure
-        test_data = {
-            'start_time': datetime.fromtimestamp(measurements[0]['timestamp']).isoformat(),
-            'measurements': measurements
-        }
+        if not arrays['count']:
+            raise ValueError("No valid measurements found in log file")
         
         # Calculate results
-        results = self._calculate_results(test_data)
+        results = self._calculate_results_from_arrays(arrays['elapsed_time'], arrays['frequency_error'],
+                                                      arrays['temperature'])
         
         return results
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Sparse time index for seeking into large holdover logs
+Sidecar file of (timestamp, byte offset) every K lines, extended as the log grows
+"""
+
+import os
+import re
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+
+# Leading timestamp of any supported log format ("12.5,...", "[12.5] ...", "12.5: ...")
+TIMESTAMP_PATTERN = re.compile(rb'\s*\[?\s*(\d+\.?\d*)')
+
+INDEX_VERSION = 1
+
+
+class LogIndex:
+    """(timestamp, byte offset, line number) of every stride-th line of a log
+
+    Stored in index_dir as '<log name>.<path hash>.idx', so logs with the
+    same name in different directories do not collide, or next to the log
+    as '<log>.idx' when no directory is given. The index records the size
+    and mtime of the log it covers: a log that shrank or was rewritten in place
+    is re-indexed from scratch, while a log that only grew is indexed from
+    the last covered byte onwards. Timestamps are assumed non-decreasing.
+    """
+
+    SUFFIX = '.idx'
+    SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, log_file: str, stride: int = 10000, index_file: Optional[str] = None,
+                 index_dir: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.log_file = Path(log_file)
+        if index_file:
+            self.index_file = Path(index_file)
+        elif index_dir:
+            path_hash = hashlib.blake2b(str(self.log_file.resolve()).encode(), digest_size=8).hexdigest()
+            self.index_file = Path(index_dir) / f"{self.log_file.name}.{path_hash}{self.SUFFIX}"
+        else:
+            self.index_file = self.log_file.with_name(self.log_file.name + self.SUFFIX)
+        self.stride = stride
+
+        self.timestamps = np.empty(0)
+        self.offsets = np.empty(0, dtype=np.int64)
+        self.lines = np.empty(0, dtype=np.int64)
+        self.indexed_size = 0
+        self.line_count = 0
+        self.mtime_ns = 0
+
+    def update(self) -> 'LogIndex':
+        """Load the sidecar and bring it up to date with the log"""
+
+        stat = self.log_file.stat()
+        if not self.timestamps.size and not self.indexed_size:
+            self._load()
+
+        rewritten = stat.st_size == self.indexed_size and stat.st_mtime_ns != self.mtime_ns
+        if stat.st_size < self.indexed_size or rewritten or not self._prefix_unchanged():
+            self.logger.info(f"Rebuilding index for {self.log_file}")
+            self._reset()
+
+        if stat.st_size > self.indexed_size or stat.st_mtime_ns != self.mtime_ns:
+            self._scan(stat.st_size)
+            self.mtime_ns = stat.st_mtime_ns
+            self._save()
+        return self
+
+    def _reset(self):
+        """Forget all entries"""
+        self.timestamps = np.empty(0)
+        self.offsets = np.empty(0, dtype=np.int64)
+        self.lines = np.empty(0, dtype=np.int64)
+        self.indexed_size = 0
+        self.line_count = 0
+        self.mtime_ns = 0
+
+    def _prefix_unchanged(self) -> bool:
+        """Check the last indexed line still starts where it did"""
+
+        if not self.offsets.size:
+            return True
+        offset = int(self.offsets[-1])
+        with open(self.log_file, 'rb') as f:
+            f.seek(max(offset - 1, 0))
+            if offset > 0 and f.read(1) != b'\n':
+                return False
+            line = f.readline()
+        match = TIMESTAMP_PATTERN.match(line)
+        return bool(match) and float(match.group(1)) == self.timestamps[-1]
+
+    def _scan(self, size: int):
+        """Index complete lines between indexed_size and size"""
+
+        timestamps, offsets, lines = [], [], []
+        position = self.indexed_size
+        line_number = self.line_count
+
+        with open(self.log_file, 'rb') as f:
+            while position < size:
+                f.seek(position)
+                block = f.read(min(self.SCAN_BLOCK_SIZE, size - position))
+                newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+                if not newlines.size:
+                    # Only a partial trailing line remains
+                    break
+
+                starts = np.concatenate(([0], newlines[:-1] + 1))
+                numbers = line_number + np.arange(len(starts))
+                for k in np.flatnonzero(numbers % self.stride == 0):
+                    match = TIMESTAMP_PATTERN.match(block, int(starts[k]))
+                    if match:
+                        timestamps.append(float(match.group(1)))
+                        offsets.append(position + int(starts[k]))
+                        lines.append(int(numbers[k]))
+
+                position += int(newlines[-1]) + 1
+                line_number += len(newlines)
+
+        if timestamps:
+            self.timestamps = np.concatenate((self.timestamps, timestamps))
+            self.offsets = np.concatenate((self.offsets, np.array(offsets, dtype=np.int64)))
+            self.lines = np.concatenate((self.lines, np.array(lines, dtype=np.int64)))
+        self.indexed_size = position
+        self.line_count = line_number
+
+    def _load(self):
+        """Read the sidecar if it exists and was built with the same stride"""
+
+        if not self.index_file.exists():
+            return
+        try:
+            with np.load(self.index_file) as data:
+                if int(data['version']) != INDEX_VERSION or int(data['stride']) != self.stride:
+                    return
+                self.timestamps = data['timestamps']
+                self.offsets = data['offsets']
+                self.lines = data['lines']
+                self.indexed_size = int(data['indexed_size'])
+                self.line_count = int(data['line_count'])
+                self.mtime_ns = int(data['mtime_ns'])
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable index {self.index_file}: {e}")
+            self._reset()
+
+    def _save(self):
+        """Write the sidecar; an unwritable location leaves the index in memory only"""
+
+        temp_file = self.index_file.with_name(self.index_file.name + '.tmp')
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_file, 'wb') as f:
+                np.savez(f, version=INDEX_VERSION, stride=self.stride, timestamps=self.timestamps,
+                         offsets=self.offsets, lines=self.lines, indexed_size=self.indexed_size,
+                         line_count=self.line_count, mtime_ns=self.mtime_ns)
+            os.replace(temp_file, self.index_file)
+        except OSError as e:
+            self.logger.warning(f"Could not write index {self.index_file}: {e}")
+
+    def byte_range(self, start_time: Optional[float] = None,
+                   end_time: Optional[float] = None) -> Tuple[int, int, int]:
+        """Byte range (start, end) and first line number that cover [start_time, end_time]
+
+        The range may include up to one stride of lines on either side,
+        which the caller filters by timestamp.
+        """
+
+        start, line = 0, 0
+        if start_time is not None and self.timestamps.size:
+            # Last indexed line strictly before start_time; equal stamps may precede it
+            position = int(np.searchsorted(self.timestamps, start_time, side='left')) - 1
+            if position >= 0:
+                start, line = int(self.offsets[position]), int(self.lines[position])
+
+        end = self.log_file.stat().st_size
+        if end_time is not None and self.timestamps.size:
+            position = int(np.searchsorted(self.timestamps, end_time, side='right'))
+            if position < self.timestamps.size:
+                end = int(self.offsets[position])
+        return start, max(start, end), line
+
+    def summary(self) -> Dict[str, Any]:
+        """Index coverage for APIs"""
+        return {
+            'entries': int(self.timestamps.size),
+            'stride': self.stride,
+            'lines': self.line_count,
+            'indexed_bytes': self.indexed_size,
+            'start_time': float(self.timestamps[0]) if self.timestamps.size else None,
+            'end_time': float(self.timestamps[-1]) if self.timestamps.size else None
+        }
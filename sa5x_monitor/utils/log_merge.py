@@ -0,0 +1,237 @@
+"""
+Time-ordered merge of several device logs
+K-way merge of streamed log chunks and interpolation onto a shared time grid
+"""
+
+import heapq
+import logging
+from typing import Dict, Any, Optional, Sequence, Iterator
+
+import numpy as np
+
+from .log_parser import LogParser, LOG_COLUMNS
+
+
+class _SourceStream:
+    """Chunks of one log with a read position into the current chunk"""
+
+    def __init__(self, parser: LogParser, log_file: str, chunk_chars: Optional[int]):
+        self.chunks = parser.iter_log_chunks(log_file, chunk_chars)
+        self.chunk = None
+        self.position = 0
+
+        # File-wide status codes of this log mapped to merged codes
+        self.status_lookup = np.empty(0, dtype=np.int32)
+
+    def advance(self) -> bool:
+        """Load the next non-empty chunk; False when the log is exhausted"""
+        for chunk in self.chunks:
+            if chunk['count']:
+                self.chunk = chunk
+                self.position = 0
+                return True
+        self.chunk = None
+        return False
+
+    @property
+    def last_time(self) -> float:
+        return float(self.chunk['timestamp'][-1])
+
+    @property
+    def exhausted_chunk(self) -> bool:
+        return self.position >= self.chunk['count']
+
+
+class _SourceGrid:
+    """Interpolate one log onto consecutive blocks of a time grid
+
+    Keeps only the samples bracketing the current grid block, so memory is
+    one parser chunk plus the samples spanned by a block.
+    """
+
+    def __init__(self, parser: LogParser, log_file: str, columns: Sequence[str],
+                 chunk_chars: Optional[int], max_gap: Optional[float]):
+        self.chunks = parser.iter_log_chunks(log_file, chunk_chars)
+        self.columns = list(columns)
+        self.max_gap = max_gap
+        self.times = np.empty(0)
+        self.values = {name: np.empty(0) for name in self.columns}
+        self.exhausted = False
+        self._read_until(-np.inf)
+
+    @property
+    def first_time(self) -> Optional[float]:
+        return float(self.times[0]) if self.times.size else None
+
+    @property
+    def last_time(self) -> Optional[float]:
+        """Last timestamp of the log, known once it is exhausted"""
+        return float(self.times[-1]) if self.exhausted and self.times.size else None
+
+    def _read_until(self, time: float):
+        """Read chunks until a sample at or after time is buffered or the log ends"""
+        while not self.exhausted and (not self.times.size or self.times[-1] < time):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.exhausted = True
+                break
+            if not chunk['count']:
+                continue
+            self.times = np.concatenate((self.times, chunk['timestamp']))
+            for name in self.columns:
+                self.values[name] = np.concatenate((self.values[name], chunk[name]))
+
+    def interpolate(self, grid: np.ndarray) -> Dict[str, np.ndarray]:
+        """Column values at the grid times, NaN outside the log and across gaps above max_gap"""
+
+        self._read_until(grid[-1])
+        times = self.times
+        result = {}
+        for name in self.columns:
+            if times.size:
+                result[name] = np.interp(grid, times, self.values[name], left=np.nan, right=np.nan)
+            else:
+                result[name] = np.full(len(grid), np.nan)
+
+        if self.max_gap is not None and times.size > 1:
+            after = np.clip(np.searchsorted(times, grid, side='left'), 1, times.size - 1)
+            in_gap = (times[after] - times[after - 1] > self.max_gap) & (times[after] != grid)
+            for name in self.columns:
+                result[name][in_gap] = np.nan
+
+        # Keep the last sample before the next block as its left bracket
+        keep = max(int(np.searchsorted(times, grid[-1], side='right')) - 1, 0)
+        self.times = times[keep:]
+        for name in self.columns:
+            self.values[name] = self.values[name][keep:]
+        return result
+
+
+class LogMerger:
+    """Merge several holdover logs into one time-ordered stream
+
+    Each log is streamed with its own LogParser, so at most one chunk per
+    input is held in memory. Logs must be time-ordered individually.
+    """
+
+    def __init__(self, log_files: Sequence[str], config=None, chunk_chars: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.log_files = list(log_files)
+        self.config = config
+        self.chunk_chars = chunk_chars
+        self.status_labels = []
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Yield merged chunks with LOG_COLUMNS, 'source' and merged status codes
+
+        'source' indexes log_files. A heap ordered by the last timestamp of
+        each input's current chunk gives the merge frontier: every buffered
+        row up to it is final and is emitted, sorted stably by timestamp so
+        equal timestamps keep the input order. The inputs whose chunk ended
+        at the frontier are then refilled.
+        """
+
+        sources = [_SourceStream(LogParser(self.config), log_file, self.chunk_chars)
+                   for log_file in self.log_files]
+        label_codes = {}
+        self.status_labels = []
+
+        heap = []
+        for index, source in enumerate(sources):
+            if source.advance():
+                heapq.heappush(heap, (source.last_time, index))
+
+        while heap:
+            frontier = heap[0][0]
+            pieces = []
+            for index, source in enumerate(sources):
+                if source.chunk is None or source.exhausted_chunk:
+                    continue
+                timestamps = source.chunk['timestamp']
+                end = source.position + int(np.searchsorted(timestamps[source.position:], frontier, side='right'))
+                if end > source.position:
+                    pieces.append((index, source, source.position, end))
+                    source.position = end
+
+            yield self._merge_pieces(pieces, label_codes)
+
+            # Refill every input whose chunk is used up
+            while heap and sources[heap[0][1]].exhausted_chunk:
+                _, index = heapq.heappop(heap)
+                if sources[index].advance():
+                    heapq.heappush(heap, (sources[index].last_time, index))
+
+    def _merge_pieces(self, pieces, label_codes: Dict[str, int]) -> Dict[str, Any]:
+        """Interleave row ranges of several inputs into one chunk ordered by timestamp"""
+
+        columns = {name: [] for name in LOG_COLUMNS}
+        source_ids = []
+        status = []
+        for index, source, start, end in pieces:
+            for name in LOG_COLUMNS:
+                columns[name].append(source.chunk[name][start:end])
+            source_ids.append(np.full(end - start, index, dtype=np.int32))
+
+            labels = source.chunk['status_labels']
+            if len(source.status_lookup) < len(labels):
+                source.status_lookup = np.array(
+                    [label_codes.setdefault(label, len(label_codes)) for label in labels], dtype=np.int32)
+            status.append(source.status_lookup[source.chunk['status'][start:end]])
+
+        timestamps = np.concatenate(columns['timestamp'])
+        order = np.argsort(timestamps, kind='stable')
+
+        merged = {name: np.concatenate(columns[name])[order] for name in LOG_COLUMNS}
+        merged['elapsed_time'] = merged['timestamp']
+        merged['source'] = np.concatenate(source_ids)[order]
+        merged['status'] = np.concatenate(status)[order]
+        self.status_labels = list(label_codes)
+        merged['status_labels'] = self.status_labels
+        merged['count'] = len(order)
+        return merged
+
+    def align(self, step: float, columns: Sequence[str] = ('frequency_error',), start: Optional[float] = None,
+              end: Optional[float] = None, common: bool = True, max_gap: Optional[float] = None,
+              block_size: int = 65536) -> Iterator[Dict[str, Any]]:
+        """Yield the logs linearly interpolated onto a shared grid, block by block
+
+        Each block has 'time' (grid times) and, per requested column, an
+        array of shape (len(time), len(log_files)). With common=True the
+        grid spans the time covered by every log, otherwise any log; values
+        outside a log or inside a gap longer than max_gap seconds are NaN.
+        """
+
+        if step <= 0:
+            raise ValueError("Grid step must be positive")
+
+        grids = [_SourceGrid(LogParser(self.config), log_file, columns, self.chunk_chars, max_gap)
+                 for log_file in self.log_files]
+        first_times = [grid.first_time for grid in grids if grid.first_time is not None]
+        if not first_times or (common and len(first_times) < len(grids)):
+            return
+
+        if start is None:
+            start = max(first_times) if common else min(first_times)
+
+        block = 0
+        while True:
+            times = start + step * np.arange(block * block_size, (block + 1) * block_size)
+            values = [grid.interpolate(times) for grid in grids]
+
+            # Stop at the requested end, or once the logs that bound the grid have ended
+            last_times = [grid.last_time for grid in grids if grid.last_time is not None]
+            limit = end
+            if common and last_times:
+                limit = min(last_times) if limit is None else min(limit, min(last_times))
+            elif not common and len(last_times) == len(grids):
+                limit = max(last_times) if limit is None else min(limit, max(last_times))
+
+            count = len(times) if limit is None else int(np.searchsorted(times, limit, side='right'))
+            if count:
+                aligned = {'time': times[:count]}
+                for name in columns:
+                    aligned[name] = np.column_stack([source[name][:count] for source in values])
+                yield aligned
+            if count < len(times):
+                return
+            block += 1
@@ -3,19 +3,415 @@ Log Parser for SA5X Holdover Tests
 Based on parse_holdover_log.py
 """
 
+import io
+import os
 import re
+import glob
+import math
+import mmap
+import time
 import logging
+import threading
+import warnings
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
 from pathlib import Path
 
+from .stability import (FREQUENCY_UNIT_SCALE, WanderAccumulator, adev_confidence, adev_edf,
+                        calculate_dynamic_adev, default_taus)
+from .compliance import ComplianceChecker
+from .streaming_stats import RunningStats, LinearFit
+from .analysis_cache import AnalysisCache
+from .log_index import LogIndex
+from .resampling import UniformResampler
+from .measurement_block import MeasurementBlock
+from .drift_model import PhaseDriftModel
+from .thermal_analysis import ThermalSensitivity, compensate_temperature
+from .spectral_analysis import PhaseSpectrum, LagOneNoiseID, NOISE_TYPES
+from .compressed_log import (COMPRESSED_SUFFIXES, BackgroundDecompressor, detect_compression,
+                             estimate_content_size, open_log_text)
+
+
+# Bump when parsing or analysis output changes so cached results are not reused
+PARSER_VERSION = 7
+
+
+# Numeric columns of the supported log formats, in file order
+LOG_COLUMNS = ['timestamp', 'frequency_error', 'temperature', 'voltage', 'current']
+
+# Characters turned into whitespace so every format splits like the whitespace one
+FORMAT_BYTE_SEPARATORS = {
+    'csv': bytes.maketrans(b',\r', b'  '),
+    'whitespace': bytes.maketrans(b'\r', b' '),
+    'bracketed': bytes.maketrans(b'[]\r', b'   '),
+    'colon': bytes.maketrans(b':,\r', b'   ')
+}
+
+# Most window rows printed for the dynamic Allan deviation in reports
+REPORT_DYNAMIC_ROWS = 24
+
+# Row layout decoded by the mmap engine; status labels at the width limit are rejected
+STATUS_WIDTH = 32
+MMAP_ROW_DTYPE = np.dtype([('values', np.float64, (len(LOG_COLUMNS),)), ('status', f'S{STATUS_WIDTH}')])
+
+INGEST_ENGINES = ('text', 'mmap')
+
+# File suffixes picked up when a directory is given as a log source, also with COMPRESSED_SUFFIXES
+LOG_FILE_SUFFIXES = ('.log', '.txt', '.csv')
+
+
+def _is_log_file(path: Path) -> bool:
+    """True for files named like logs, compressed or not"""
+    suffixes = [suffix.lower() for suffix in path.suffixes[-2:]]
+    if suffixes and suffixes[-1] in COMPRESSED_SUFFIXES:
+        suffixes.pop()
+    return path.is_file() and bool(suffixes) and suffixes[-1] in LOG_FILE_SUFFIXES
+
+
+def expand_log_paths(sources: Iterable[str]) -> List[str]:
+    """Expand files, glob patterns and directories into a sorted list of log files"""
+    
+    files = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            matches = [str(p) for p in path.iterdir() if _is_log_file(p)]
+        elif glob.has_magic(source):
+            matches = [p for p in glob.glob(source, recursive=True) if Path(p).is_file()]
+        else:
+            matches = [source]
+        files.extend(sorted(matches))
+    
+    # Keep the first occurrence of files named by several sources
+    return list(dict.fromkeys(files))
+
+
+def _format_hours(seconds: Optional[float]) -> str:
+    """Time-to-limit for reports: hours, or 'beyond horizon' when not reached"""
+    return 'beyond horizon' if seconds is None else f"{seconds / 3600:.1f} h"
+
+
+def _parse_log_worker(config, log_file: str, streaming: Optional[bool]) -> Dict[str, Any]:
+    """Process pool entry point: analyze one log with errors returned, not raised"""
+    
+    try:
+        return LogParser(config).parse_holdover_log(log_file, streaming=streaming)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+class _GridAllan:
+    """Allan deviation of resampled frequency picked every tau, fed in chunks
+    
+    Picks are every round(tau / tau0)-th grid point counted from the start
+    of the record; pairs of picks that involve an invalid (gap) point are
+    skipped instead of differencing across the gap.
+    """
+    
+    def __init__(self, tau: float):
+        self.tau = tau
+        self.index = 0
+        self.last = None
+        self.pairs = 0
+        self.sq_sum = 0.0
+    
+    def update(self, values: np.ndarray, valid: np.ndarray, tau0: float):
+        """Add a chunk of uniform-grid values and their valid mask"""
+        
+        step = max(1, int(round(self.tau / tau0)))
+        start = (-self.index) % step
+        self.index += len(values)
+        
+        picked = values[start::step]
+        picked_valid = valid[start::step]
+        if not len(picked):
+            return
+        if self.last is not None:
+            picked = np.concatenate(([self.last[0]], picked))
+            picked_valid = np.concatenate(([self.last[1]], picked_valid))
+        
+        diffs = np.diff(picked)[picked_valid[1:] & picked_valid[:-1]]
+        self.sq_sum += float(np.dot(diffs, diffs))
+        self.pairs += len(diffs)
+        self.last = (float(picked[-1]), bool(picked_valid[-1]))
+    
+    def deviation(self) -> float:
+        """Allan deviation, 0.0 until a pair of valid picks is seen"""
+        return float(np.sqrt(self.sq_sum / self.pairs / 2)) if self.pairs else 0.0
+
+
+class _PhaseIntegrator:
+    """Integrate resampled frequency error into phase (ns), fed in chunks
+    
+    Each grid step advances the phase by the frequency at its start, so
+    invalid (gap) points are bridged by holding the last frequency.
+    """
+    
+    def __init__(self, frequency_units: str, tau0: float):
+        self.scale = FREQUENCY_UNIT_SCALE[frequency_units] * 1e9 * tau0
+        self.phase = 0.0
+        self.last_value = None
+    
+    def update(self, freq: np.ndarray) -> np.ndarray:
+        """Phase at each grid point of a chunk"""
+        
+        if self.last_value is None:
+            phase = np.concatenate(([0.0], np.cumsum(freq[:-1] * self.scale)))
+        else:
+            phase = self.phase + np.cumsum(np.concatenate(([self.last_value], freq[:-1])) * self.scale)
+        self.phase = float(phase[-1])
+        self.last_value = float(freq[-1])
+        return phase
+
+
+class LogAnalysisAccumulator:
+    """Mergeable-state analysis of a holdover log fed in column chunks
+    
+    Statistics, drift regressions, status counts, tau-picked Allan deviation
+    and MTIE/TDEV state are all updated per chunk, so memory is bounded by
+    the chunk size plus the longest wander window. A single chunk holding the
+    whole log gives the same results as the in-memory analysis.
+    
+    Statistics use the raw samples. Allan deviation and MTIE/TDEV use the
+    frequency resampled onto a uniform grid (UniformResampler), with gaps
+    excluded from Allan pairs and bridged linearly in the phase. The phase
+    drift model is fitted to the valid grid points of that phase, and the
+    temperature sensitivity to the resampled frequency and temperature.
+    Each Allan deviation carries its EDF and chi-squared bounds, using the
+    noise type identified from the lag-1 autocorrelation of that phase.
+    """
+    
+    ALLAN_TAUS = [1, 10, 100, 1000]
+    
+    def __init__(self, frequency_units: str = 'ppm', expected_samples: Optional[int] = None,
+                 max_window: Optional[int] = None, resample_interval: Optional[float] = None,
+                 gap_factor: float = 1.5, phase_limit: Optional[float] = None, drift_confidence: float = 0.95,
+                 thermal_max_lag: float = 3600.0, adev_confidence: float = 0.683):
+        if frequency_units not in FREQUENCY_UNIT_SCALE:
+            raise ValueError(f"Unknown frequency units: {frequency_units}")
+        
+        self.frequency_units = frequency_units
+        self.expected_samples = expected_samples
+        self.max_window = max_window
+        
+        self.count = 0
+        self.first_time = None
+        self.last_time = None
+        self.stats = {name: RunningStats() for name in LOG_COLUMNS[1:]}
+        self.freq_fit = LinearFit()
+        self.temp_fit = LinearFit()
+        self.status_counts = {}
+        self.allan = [_GridAllan(tau) for tau in self.ALLAN_TAUS]
+        self.resampler = UniformResampler(resample_interval, gap_factor)
+        self.drift = PhaseDriftModel(drift_confidence)
+        self.phase_limit = phase_limit
+        self.thermal_max_lag = thermal_max_lag
+        self.thermal = None
+        self.adev_confidence = adev_confidence
+        
+        self.tau0 = None
+        self.wander = None
+        self.integrator = None
+        self.noise_id = None
+    
+    def update(self, arrays: Dict[str, Any]):
+        """Add a chunk in the load_log_arrays column format"""
+        
+        elapsed = arrays['elapsed_time']
+        freq = arrays['frequency_error']
+        if not len(elapsed):
+            return
+        
+        if self.first_time is None:
+            self.first_time = float(elapsed[0])
+        self.last_time = float(elapsed[-1])
+        self.count += len(elapsed)
+        
+        for name, stats in self.stats.items():
+            stats.update_many(arrays[name])
+        self.freq_fit.update_many(elapsed, freq)
+        self.temp_fit.update_many(elapsed, arrays['temperature'])
+        
+        counts = np.bincount(arrays['status'], minlength=len(arrays['status_labels']))
+        for label, count in zip(arrays['status_labels'], counts):
+            if count:
+                self.status_counts[label] = self.status_counts.get(label, 0) + int(count)
+        
+        # Stability estimators run on the uniform grid
+        grid, resampled, valid = self.resampler.update(elapsed, {'frequency_error': freq,
+                                                                 'temperature': arrays['temperature']})
+        self.tau0 = self.resampler.interval
+        grid_freq = resampled['frequency_error']
+        for allan in self.allan:
+            allan.update(grid_freq, valid, self.tau0)
+        
+        self._update_wander(grid, grid_freq, valid)
+        
+        if self.thermal is None:
+            self.thermal = ThermalSensitivity(int(round(self.thermal_max_lag / self.tau0)))
+        self.thermal.update(grid, grid_freq, resampled['temperature'], valid)
+    
+    def _update_wander(self, grid: np.ndarray, freq: np.ndarray, valid: np.ndarray):
+        """Integrate resampled frequency into phase (ns) and feed the MTIE/TDEV state and drift model"""
+        
+        if not len(freq):
+            return
+        
+        if self.wander is None:
+            # The tau grid is fixed from the first chunk
+            taus = default_taus(self.expected_samples or len(freq), self.tau0)
+            if self.max_window:
+                taus = taus[taus / self.tau0 <= self.max_window]
+            self.wander = WanderAccumulator(taus, self.tau0)
+            self.integrator = _PhaseIntegrator(self.frequency_units, self.tau0)
+            self.noise_id = LagOneNoiseID(self.tau0)
+        
+        phase = self.integrator.update(freq)
+        self.wander.update_many(phase)
+        self.noise_id.update(phase)
+        self.drift.update(grid, phase, valid)
+    
+    def _allan_confidence(self, allan_deviations: Dict[Any, float]) -> Dict[Any, Dict[str, Any]]:
+        """EDF, bounds and noise type of each Allan deviation
+        
+        The picks of a _GridAllan form their own series at spacing tau, so
+        the EDF is that of m = 1 over pairs + 2 phase points.
+        """
+        
+        allans = [allan for allan in self.allan if allan.pairs]
+        if not allans:
+            return {}
+        
+        taus = np.array([allan.tau for allan in allans], dtype=float)
+        adev = np.array([allan.deviation() for allan in allans])
+        alphas = self.noise_id.alphas(taus) if self.noise_id else np.zeros(len(taus), dtype=int)
+        edf = adev_edf(alphas, np.array([allan.pairs for allan in allans]) + 2, 1)
+        bounds = adev_confidence(adev, edf, self.adev_confidence)
+        
+        return {
+            allan.tau: {'edf': float(edf[i]), 'lower': float(bounds['lower'][i]),
+                        'upper': float(bounds['upper'][i]), 'noise_type': NOISE_TYPES[int(alphas[i])]}
+            for i, allan in enumerate(allans)
+        }
+    
+    def results(self) -> Dict[str, Any]:
+        """Analysis results in the parse_holdover_log format, without compliance"""
+        
+        if self.count < 2:
+            raise ValueError("Insufficient measurements for analysis")
+        
+        duration = self.last_time - self.first_time
+        freq = self.stats['frequency_error']
+        temp = self.stats['temperature']
+        voltage = self.stats['voltage']
+        current = self.stats['current']
+        allan_deviations = {allan.tau: allan.deviation() for allan in self.allan}
+        wander = self.wander.results() if self.wander else {'taus': [], 'mtie': [], 'tdev': []}
+        
+        return {
+            'duration': duration,
+            'measurement_count': self.count,
+            'measurement_interval': duration / (self.count - 1),
+            
+            # Frequency analysis
+            'freq_stability': freq.population_std_dev,
+            'freq_drift_rate': self.freq_fit.slope,
+            'freq_error_min': freq.min,
+            'freq_error_max': freq.max,
+            'freq_error_mean': freq.mean,
+            'freq_error_std': freq.population_std_dev,
+            
+            # Allan deviation analysis
+            'allan_deviation': allan_deviations.get(1, 0.0),  # 1-second Allan deviation
+            'allan_deviations': allan_deviations,
+            'allan_confidence': self._allan_confidence(allan_deviations),
+            'adev_confidence': self.adev_confidence,
+            'noise_types': self.noise_id.results() if self.noise_id else [],
+            
+            # Temperature analysis
+            'temp_stability': temp.population_std_dev,
+            'temp_drift_rate': self.temp_fit.slope,
+            'temp_min': temp.min,
+            'temp_max': temp.max,
+            'temp_mean': temp.mean,
+            'temp_std': temp.population_std_dev,
+            
+            # Power analysis
+            'voltage_stability': voltage.population_std_dev,
+            'current_stability': current.population_std_dev,
+            'voltage_min': voltage.min,
+            'voltage_max': voltage.max,
+            'voltage_mean': voltage.mean,
+            'current_min': current.min,
+            'current_max': current.max,
+            'current_mean': current.mean,
+            
+            # Status analysis
+            'status_distribution': dict(self.status_counts),
+            'primary_status': max(self.status_counts.items(), key=lambda x: x[1])[0] if self.status_counts else 'UNKNOWN',
+            
+            # Phase wander
+            'mtie': LogParser._tau_dict(wander['taus'], wander['mtie']),
+            'tdev': LogParser._tau_dict(wander['taus'], wander['tdev']),
+            
+            # Phase drift model and holdover prediction
+            'drift_model': self.drift.results(self.phase_limit),
+            
+            # Frequency sensitivity to (lagged) temperature
+            'thermal': self.thermal.results(self.tau0, FREQUENCY_UNIT_SCALE[self.frequency_units])
+                       if self.thermal else {'samples': 0},
+            
+            # Timing quality found while resampling
+            'data_quality': self.resampler.quality()
+        }
+
 
 class LogParser:
     """Parser for SA5X holdover test logs"""
     
-    def __init__(self):
+    # Unparsable lines kept for the summary warning
+    MAX_UNPARSED_SAMPLES = 5
+    
+    # Characters of log text converted per bulk chunk
+    CHUNK_CHARS = 1024 * 1024
+    
+    # Bytes of a memory-mapped log decoded per chunk by the mmap engine
+    MMAP_CHUNK_BYTES = 2 * 1024 * 1024
+    
+    # Measurements collected before live tail analysis fixes its nominal interval
+    TAIL_WARMUP_SAMPLES = 10
+    
+    def __init__(self, config=None):
         self.logger = logging.getLogger(__name__)
+        self.config = config
+        
+        # Analysis options
+        self.frequency_units = config.get('analysis.frequency_error_units', 'ppm') if config else 'ppm'
+        self.compliance_mask = config.get('compliance.default_mask', 'G.8262-EEC1') if config else 'G.8262-EEC1'
+        self.streaming_threshold_mb = config.get('analysis.streaming_threshold_mb', 256) if config else 256
+        self.streaming_max_window = config.get('analysis.streaming_max_window', 86400) if config else 86400
+        self.ingest_engine = config.get('analysis.ingest_engine', 'text') if config else 'text'
+        self.tail_poll_interval = config.get('analysis.tail_poll_interval', 1.0) if config else 1.0
+        self.resample_interval = config.get('analysis.resample_interval', None) if config else None
+        self.gap_factor = config.get('analysis.resample_gap_factor', 1.5) if config else 1.5
+        self.phase_limit = config.get('analysis.phase_limit_ns', 1000.0) if config else 1000.0
+        self.drift_confidence = config.get('analysis.drift_confidence', 0.95) if config else 0.95
+        self.thermal_max_lag = config.get('analysis.thermal_max_lag', 3600.0) if config else 3600.0
+        self.psd_segment_length = config.get('analysis.psd_segment_length', 4096) if config else 4096
+        self.carrier_frequency = config.get('analysis.carrier_frequency', 10e6) if config else 10e6
+        self.dynamic_adev_window = config.get('analysis.dynamic_adev_window', 3600.0) if config else 3600.0
+        self.adev_confidence = config.get('analysis.adev_confidence', 0.683) if config else 0.683
+        self.dynamic_adev_step = config.get('analysis.dynamic_adev_step', 600.0) if config else 600.0
+        
+        # Disk cache of parsed columns and results (None when disabled)
+        self.cache = AnalysisCache.from_config(config)
+        
+        # Time index written on first parse, under index.directory (next to the log if unset)
+        self.index_enabled = config.get('index.enabled', True) if config else False
+        self.index_stride = config.get('index.stride', 10000) if config else 10000
+        self.index_directory = config.get('index.directory', 'cache/index') if config else None
         
         # Common log formats
         self.log_patterns = [
@@ -31,202 +427,864 @@ class LogParser:
             # Format: timestamp: freq_error, temp, voltage, current, status
             r'^(\d+\.?\d*):\s*([+-]?\d+\.?\d*(?:[eE][+-]?\d+)?),\s*([+-]?\d+\.?\d*),\s*([+-]?\d+\.?\d*),\s*([+-]?\d+\.?\d*),\s*(\w+)$'
         ]
+        
+        # Format names in the same order as log_patterns
+        self.log_formats = ['csv', 'whitespace', 'bracketed', 'colon']
+        self._compiled_patterns = [re.compile(pattern) for pattern in self.log_patterns]
+        
+        # Format sniffed from the first valid line of the current file
+        self.detected_format = None
+        self.parse_stats = {}
     
-    def parse_holdover_log(self, log_file: str) -> Dict[str, Any]:
-        """Parse holdover log file and return analysis results"""
+    def parse_holdover_log(self, log_file: str, streaming: Optional[bool] = None) -> Dict[str, Any]:
+        """Parse holdover log file and extract analysis data
+        
+        With streaming=None, files larger than analysis.streaming_threshold_mb
+        are analyzed chunk by chunk instead of being loaded into memory.
+        """
         
         if not Path(log_file).exists():
             raise FileNotFoundError(f"Log file not found: {log_file}")
         
-        self.logger.info(f"Parsing holdover log: {log_file}")
+        if streaming is None:
+            content_size = estimate_content_size(log_file, detect_compression(log_file))
+            streaming = content_size > self.streaming_threshold_mb * 1024 * 1024
+        if streaming:
+            return self._cached(log_file, True, lambda: {'results': self.analyze_log_streaming(log_file)})['results']
         
-        # Parse log file
-        measurements = self._parse_log_file(log_file)
+        return self.load_and_analyze(log_file)[1]
+    
+    def load_and_analyze(self, log_file: str):
+        """Load a log into columns and analyze it; returns (arrays, results)
         
-        if not measurements:
-            raise ValueError("No valid measurements found in log file")
+        Served from the analysis cache when one is configured and the same
+        content was analyzed before with the same options.
+        """
         
-        # Calculate analysis results
-        results = self._analyze_measurements(measurements)
+        def compute():
+            if self.index_enabled and detect_compression(log_file) is None:
+                self.get_log_index(log_file)
+            
+            # Load numeric columns straight into arrays
+            arrays = self.load_log_arrays(log_file)
+            
+            if not arrays['count']:
+                raise ValueError("No valid measurements found in log file")
+            
+            # Calculate analysis results
+            results = self.analyze_arrays(arrays)
+            results['unparsed_lines'] = self.parse_stats.get('unparsed_lines', 0)
+            return {'arrays': arrays, 'results': results}
         
+        entry = self._cached(log_file, False, compute)
+        return entry['arrays'], entry['results']
+    
+    def analysis_options(self, streaming: bool = False) -> Dict[str, Any]:
+        """Everything besides file content that affects the analysis output"""
+        options = {
+            'parser_version': PARSER_VERSION,
+            'frequency_units': self.frequency_units,
+            'compliance_mask': self.compliance_mask,
+            'masks': self.config.get('compliance.masks', {}) if self.config else {},
+            'streaming': streaming,
+            'resample_interval': self.resample_interval,
+            'gap_factor': self.gap_factor,
+            'phase_limit': self.phase_limit,
+            'drift_confidence': self.drift_confidence,
+            'thermal_max_lag': self.thermal_max_lag,
+            'dynamic_adev': (self.dynamic_adev_window, self.dynamic_adev_step),
+            'adev_confidence': self.adev_confidence
+        }
+        if streaming:
+            options['max_window'] = self.streaming_max_window
+        return options
+    
+    def _cached(self, log_file: str, streaming: bool, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cache entry for log_file, computing and storing it on a miss"""
+        
+        if self.cache is None:
+            return compute()
+        
+        options = self.analysis_options(streaming)
+        entry = self.cache.get(log_file, options)
+        if entry is not None:
+            self.logger.debug(f"Analysis cache hit for {log_file}")
+            self.parse_stats = entry.get('parse_stats', {})
+            return entry
+        
+        entry = compute()
+        entry['parse_stats'] = self.parse_stats
+        self.cache.put(log_file, options, entry)
+        return entry
+    
+    def analyze_log_streaming(self, log_file: str, chunk_chars: Optional[int] = None) -> Dict[str, Any]:
+        """Analyze a log of any size in fixed-size chunks with bounded memory
+        
+        Produces the parse_holdover_log report. Wander taus are limited to
+        analysis.streaming_max_window samples and the nominal interval is
+        taken from the first chunk.
+        """
+        
+        analysis = None
+        for chunk in self.iter_log_chunks(log_file, chunk_chars):
+            if analysis is None:
+                # Estimate the record length from the first chunk's line density
+                bytes_per_row = max(chunk['bytes'] / max(chunk['count'], 1), 1.0)
+                expected = int(estimate_content_size(log_file, detect_compression(log_file)) / bytes_per_row)
+                analysis = self._new_accumulator(expected, self.streaming_max_window)
+            analysis.update(chunk)
+        
+        if analysis is None or not analysis.count:
+            raise ValueError("No valid measurements found in log file")
+        
+        results = self._with_compliance(analysis.results())
+        results['unparsed_lines'] = self.parse_stats.get('unparsed_lines', 0)
         return results
     
+    def analyze_spectrum(self, log_file: str, segment_length: Optional[int] = None,
+                         chunk_chars: Optional[int] = None) -> Dict[str, Any]:
+        """Welch PSD and noise identification of a log's phase, read in chunks
+        
+        The frequency error is resampled onto the uniform analysis grid and
+        integrated into phase as for MTIE/TDEV; segments with gaps are left
+        out of the PSD. Memory is bounded by the chunk and segment sizes.
+        """
+        
+        if not Path(log_file).exists():
+            raise FileNotFoundError(f"Log file not found: {log_file}")
+        
+        resampler = UniformResampler(self.resample_interval, self.gap_factor)
+        spectrum = integrator = None
+        for chunk in self.iter_log_chunks(log_file, chunk_chars):
+            grid, resampled, valid = resampler.update(chunk['elapsed_time'],
+                                                      {'frequency_error': chunk['frequency_error']})
+            if not len(grid):
+                continue
+            if spectrum is None:
+                spectrum = PhaseSpectrum(resampler.interval, segment_length or self.psd_segment_length,
+                                         carrier_frequency=self.carrier_frequency)
+                integrator = _PhaseIntegrator(self.frequency_units, resampler.interval)
+            spectrum.update(integrator.update(resampled['frequency_error']), valid)
+        
+        if spectrum is None:
+            raise ValueError("No valid measurements found in log file")
+        return spectrum.results()
+    
+    def load_log_arrays(self, log_file: str) -> MeasurementBlock:
+        """Load a log file into typed NumPy columns in one chunked pass
+        
+        Returns a MeasurementBlock: float64 arrays for LOG_COLUMNS
+        ('elapsed_time' is the timestamp array), int32 'status' codes
+        indexing 'status_labels', and 'count'. No per-row objects are
+        created on the bulk path.
+        """
+        
+        if not Path(log_file).exists():
+            raise FileNotFoundError(f"Log file not found: {log_file}")
+        
+        # Size the columns from the (decompressed) file size to avoid repeated growth
+        estimated_rows = estimate_content_size(log_file, detect_compression(log_file)) // 40 + 1
+        return self._collect_chunks(self.iter_log_chunks(log_file), estimated_rows)
+    
+    def load_log_range(self, log_file: str, start_time: Optional[float] = None,
+                       end_time: Optional[float] = None) -> MeasurementBlock:
+        """Load only the measurements with start_time <= timestamp <= end_time
+        
+        The sidecar time index locates the byte range, so only about one
+        index stride beyond the requested interval is read and parsed.
+        Compressed logs cannot be seeked and are loaded whole.
+        """
+        
+        if detect_compression(log_file) is not None:
+            arrays = self.load_log_arrays(log_file)
+        else:
+            byte_range = self.get_log_index(log_file).byte_range(start_time, end_time)
+            arrays = self._collect_chunks(self.iter_log_chunks(log_file, byte_range=byte_range),
+                                          (byte_range[1] - byte_range[0]) // 40 + 1)
+        return arrays.between(start_time, end_time)
+    
+    def get_log_index(self, log_file: str) -> LogIndex:
+        """Sparse time index of a log, built or extended as needed"""
+        return LogIndex(log_file, self.index_stride, index_dir=self.index_directory).update()
+    
+    @staticmethod
+    def _collect_chunks(chunks: Iterable[Dict[str, Any]], estimated_rows: int) -> MeasurementBlock:
+        """Concatenate iter_log_chunks output into a whole-file block"""
+        
+        block = MeasurementBlock(estimated_rows)
+        for chunk in chunks:
+            block.extend(chunk)
+        return block
+    
+    def iter_log_chunks(self, log_file: str, chunk_chars: Optional[int] = None, engine: Optional[str] = None,
+                        byte_range: Optional[Tuple[int, int, int]] = None):
+        """Yield a log file as column chunks of about chunk_chars characters
+        
+        Each chunk has the load_log_arrays keys plus 'bytes' (characters
+        read); status codes are file-wide and 'status_labels' lists every
+        label seen so far. parse_stats is set once the file is exhausted.
+        
+        engine 'text' (default: analysis.ingest_engine) reads lines through
+        open(); 'mmap' maps the file and decodes byte ranges cut at newlines
+        without creating per-line strings. byte_range (start, end, first line
+        number), as given by LogIndex.byte_range, limits reading to part of
+        the file and always uses the mmap engine. gzip/xz/zstd files are
+        detected by their magic bytes and decompressed on a background
+        thread into the byte-range converter, whatever the engine.
+        """
+        
+        if not Path(log_file).exists():
+            raise FileNotFoundError(f"Log file not found: {log_file}")
+        
+        engine = engine or self.ingest_engine
+        if engine not in INGEST_ENGINES:
+            raise ValueError(f"Unknown ingest engine: {engine}")
+        
+        self.detected_format = None
+        stats = {'parsed_lines': 0, 'unparsed_lines': 0, 'unparsed_samples': []}
+        label_codes = {}
+        
+        compression = detect_compression(log_file)
+        if compression is not None:
+            if byte_range is not None:
+                raise ValueError(f"Byte ranges are not supported for {compression} logs")
+            blocks = self._decompressed_blocks(log_file, compression, chunk_chars or self.MMAP_CHUNK_BYTES, stats)
+        elif byte_range is not None:
+            blocks = self._mmap_blocks(log_file, chunk_chars or self.MMAP_CHUNK_BYTES, stats, *byte_range)
+        elif engine == 'mmap':
+            blocks = self._mmap_blocks(log_file, chunk_chars or self.MMAP_CHUNK_BYTES, stats)
+        else:
+            blocks = self._text_blocks(log_file, chunk_chars or self.CHUNK_CHARS, stats)
+        
+        for numeric, labels, codes, size in blocks:
+            yield self._chunk_arrays(numeric, labels, codes, size, label_codes)
+        
+        self.parse_stats = dict(stats, format=self.detected_format)
+        if stats['unparsed_lines']:
+            first_line, first_text = stats['unparsed_samples'][0]
+            self.logger.warning(f"Could not parse {stats['unparsed_lines']} lines in {log_file} "
+                                f"(first at line {first_line}: {first_text})")
+    
+    @staticmethod
+    def _chunk_arrays(numeric: np.ndarray, labels: List[str], codes: np.ndarray, size: int,
+                      label_codes: Dict[str, int]) -> Dict[str, Any]:
+        """Build an iter_log_chunks chunk from a converted block"""
+        
+        arrays = {name: numeric[:, index] for index, name in enumerate(LOG_COLUMNS)}
+        arrays['elapsed_time'] = arrays['timestamp']
+        
+        # Map chunk-local status codes to file-wide codes
+        lookup = np.array([label_codes.setdefault(label, len(label_codes)) for label in labels],
+                          dtype=np.int32)
+        arrays['status'] = lookup[codes]
+        arrays['status_labels'] = list(label_codes)
+        arrays['count'] = len(codes)
+        arrays['bytes'] = size
+        return arrays
+    
+    def follow(self, log_file: str, poll_interval: Optional[float] = None,
+               stop_event: Optional[threading.Event] = None, from_start: bool = True):
+        """Yield column chunks of the lines appended to a growing log, like tail -F
+        
+        Only newly appended bytes are read; a trailing line without its
+        newline is held back until it is complete. When the file is replaced
+        (rotation) or truncated, the rest of the old file is drained and the
+        new one is read from its start. Runs until stop_event is set; with
+        from_start=False the existing content is skipped. parse_stats is
+        kept current while following.
+        """
+        
+        if not Path(log_file).exists():
+            raise FileNotFoundError(f"Log file not found: {log_file}")
+        if detect_compression(log_file) is not None:
+            raise ValueError(f"Cannot follow a compressed log: {log_file}")
+        
+        # Position the file now, so from_start=False skips only what exists at the call
+        f = open(log_file, 'rb')
+        pending = b''
+        if not from_start:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b'\n':
+                    # Started inside a line: drop its head along with the next newline
+                    pending = None
+        
+        self.detected_format = None
+        self.parse_stats = {'parsed_lines': 0, 'unparsed_lines': 0, 'unparsed_samples': []}
+        return self._follow_blocks(f, log_file, poll_interval or self.tail_poll_interval,
+                                   stop_event, pending, self.parse_stats)
+    
+    def _follow_blocks(self, f, log_file: str, poll_interval: float, stop_event: Optional[threading.Event],
+                       pending: Optional[bytes], stats: Dict[str, Any]):
+        """Generator behind follow(); owns and closes the file handle f"""
+        
+        label_codes = {}
+        line_offset = 0
+        try:
+            while stop_event is None or not stop_event.is_set():
+                data = f.read(self.MMAP_CHUNK_BYTES)
+                if data:
+                    if pending is None:
+                        newline = data.find(b'\n')
+                        if newline < 0:
+                            continue
+                        data, pending = data[newline + 1:], b''
+                    pending += data
+                    cut = pending.rfind(b'\n') + 1
+                    if not cut:
+                        continue
+                    block, pending = pending[:cut], pending[cut:]
+                elif self._log_replaced(f, log_file):
+                    self.logger.info(f"{log_file} was rotated or truncated, reopening")
+                    block, pending = (pending + b'\n' if pending else b''), b''
+                    f.close()
+                    f = open(log_file, 'rb')
+                else:
+                    if stop_event is not None:
+                        stop_event.wait(poll_interval)
+                    else:
+                        time.sleep(poll_interval)
+                    continue
+                
+                chunk = self._convert_buffer(block, line_offset, stats) if block else None
+                line_offset += block.count(b'\n')
+                if not data:
+                    # New file: restart line numbers and sniff its format again
+                    line_offset = 0
+                    self.detected_format = None
+                if chunk is not None:
+                    yield self._chunk_arrays(*chunk, len(block), label_codes)
+        finally:
+            f.close()
+            stats['format'] = self.detected_format
+    
+    @staticmethod
+    def _log_replaced(handle, log_file: str) -> bool:
+        """True if the path now names a different file or the file was truncated"""
+        try:
+            current = os.stat(log_file)
+        except FileNotFoundError:
+            # Rotated away and not yet recreated: keep the old handle
+            return False
+        opened = os.fstat(handle.fileno())
+        return ((current.st_ino, current.st_dev) != (opened.st_ino, opened.st_dev)
+                or current.st_size < handle.tell())
+    
+    def tail_holdover_log(self, log_file: str, poll_interval: Optional[float] = None,
+                          stop_event: Optional[threading.Event] = None, from_start: bool = True):
+        """Follow a growing log and yield (new chunk, updated report) as lines arrive
+        
+        Statistics, Allan deviation and MTIE/TDEV are updated incrementally
+        from the new lines only. Wander taus cover up to
+        analysis.streaming_max_window samples; the nominal interval is fixed
+        once TAIL_WARMUP_SAMPLES measurements have been seen.
+        """
+        
+        return self._tail_updates(self.follow(log_file, poll_interval, stop_event, from_start))
+    
+    def _tail_updates(self, chunks: Iterable[Dict[str, Any]]):
+        """Generator behind tail_holdover_log()"""
+        
+        analysis = None
+        warmup = []
+        for chunk in chunks:
+            if analysis is None:
+                warmup.append(chunk)
+                if sum(c['count'] for c in warmup) < self.TAIL_WARMUP_SAMPLES:
+                    continue
+                chunk = self._collect_chunks(warmup, sum(c['count'] for c in warmup))
+                warmup = None
+                analysis = self._new_accumulator(self.streaming_max_window, self.streaming_max_window)
+            
+            analysis.update(chunk)
+            results = self._with_compliance(analysis.results())
+            results['unparsed_lines'] = self.parse_stats.get('unparsed_lines', 0)
+            yield chunk, results
+    
+    def _text_blocks(self, log_file: str, chunk_chars: int, stats: Dict[str, Any]):
+        """Text engine: yield (numeric, labels, codes, size) per block of lines"""
+        
+        line_offset = 0
+        with open(log_file, 'r') as f:
+            while True:
+                lines = f.readlines(chunk_chars)
+                if not lines:
+                    break
+                
+                chunk = self._convert_chunk(lines, line_offset, stats)
+                line_offset += len(lines)
+                if chunk is not None:
+                    yield (*chunk, sum(map(len, lines)))
+    
+    def _mmap_blocks(self, log_file: str, chunk_bytes: int, stats: Dict[str, Any],
+                     start: int = 0, stop: Optional[int] = None, line_offset: int = 0):
+        """mmap engine: yield (numeric, labels, codes, size) per newline-aligned byte range"""
+        
+        size = os.path.getsize(log_file)
+        if stop is not None:
+            size = min(size, stop)
+        if size <= start:
+            return
+        
+        with open(log_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            while start < size:
+                end = min(start + chunk_bytes, size)
+                if end < size:
+                    # Cut after the last complete line; a single over-long line extends the chunk
+                    cut = mapped.rfind(b'\n', start, end)
+                    if cut < 0:
+                        cut = mapped.find(b'\n', end, size)
+                    end = cut + 1 if cut >= 0 else size
+                
+                data = mapped[start:end]
+                chunk = self._convert_buffer(data, line_offset, stats)
+                line_offset += data.count(b'\n')
+                start = end
+                if chunk is not None:
+                    yield (*chunk, len(data))
+    
+    def _decompressed_blocks(self, log_file: str, compression: str, chunk_bytes: int, stats: Dict[str, Any]):
+        """Compressed logs: yield (numeric, labels, codes, size) per newline-aligned decompressed block"""
+        
+        line_offset = 0
+        pending = b''
+        for block in BackgroundDecompressor(log_file, compression, chunk_bytes):
+            data = pending + block
+            cut = data.rfind(b'\n') + 1
+            if not cut:
+                # Keep extending a line longer than the block
+                pending = data
+                continue
+            data, pending = data[:cut], data[cut:]
+            
+            chunk = self._convert_buffer(data, line_offset, stats)
+            line_offset += data.count(b'\n')
+            if chunk is not None:
+                yield (*chunk, len(data))
+        
+        # Last line without a trailing newline
+        if pending:
+            chunk = self._convert_buffer(pending, line_offset, stats)
+            if chunk is not None:
+                yield (*chunk, len(pending))
+    
+    def _convert_buffer(self, data: bytes, line_offset: int, stats: Dict[str, Any]):
+        """Convert a newline-aligned byte range into (numeric matrix, status labels, status codes)"""
+        
+        if self.detected_format is None:
+            self._sniff_buffer(data)
+        
+        bulk = self._convert_buffer_bulk(data) if self.detected_format else None
+        if bulk is not None:
+            stats['parsed_lines'] += len(bulk[2])
+            return bulk
+        
+        # Irregular lines: decode this range only and use the line parser
+        lines = data.decode('utf-8', errors='replace').split('\n')
+        return self._convert_chunk_lines(lines, line_offset, stats)
+    
+    def _sniff_buffer(self, data: bytes):
+        """Detect the format from the first parsable line of a byte range"""
+        
+        position = 0
+        while position < len(data):
+            newline = data.find(b'\n', position)
+            if newline < 0:
+                newline = len(data)
+            line = data[position:newline].strip()
+            position = newline + 1
+            if line and not line.startswith(b'#'):
+                if self._parse_line(line.decode('utf-8', errors='replace')) is not None:
+                    return
+    
+    def _convert_buffer_bulk(self, data: bytes):
+        """Decode a byte range in the sniffed format with NumPy's C reader; None if any line deviates"""
+        
+        data = data.translate(FORMAT_BYTE_SEPARATORS[self.detected_format])
+        
+        with warnings.catch_warnings():
+            # Ranges holding only comments are reported as empty input
+            warnings.simplefilter('ignore', UserWarning)
+            try:
+                rows = np.loadtxt(io.BytesIO(data), dtype=MMAP_ROW_DTYPE, comments='#', ndmin=1)
+            except ValueError:
+                return None
+        
+        if not len(rows):
+            return None
+        
+        # The C reader takes nan/inf and signed timestamps, which the line patterns reject
+        values = rows['values']
+        if not np.isfinite(values).all() or (values[:, 0] < 0).any():
+            return None
+        
+        # Status changes rarely, so label the runs rather than sorting every row
+        statuses = rows['status']
+        run_starts = np.concatenate(([0], np.flatnonzero(statuses[1:] != statuses[:-1]) + 1))
+        raw_labels = sorted(set(statuses[run_starts].tolist()))
+        lookup = {raw: code for code, raw in enumerate(raw_labels)}
+        run_codes = np.array([lookup[raw] for raw in statuses[run_starts].tolist()], dtype=np.int32)
+        codes = np.repeat(run_codes, np.diff(np.append(run_starts, len(statuses))))
+        
+        labels = []
+        for raw in raw_labels:
+            # A misaligned line would push a number into the status column
+            if len(raw) >= STATUS_WIDTH or not raw.isascii():
+                return None
+            label = raw.decode('ascii')
+            if not label.replace('_', '').isalnum() or not any(c.isalpha() for c in label):
+                return None
+            labels.append(label)
+        
+        return np.ascontiguousarray(rows['values']), labels, codes
+    
+    def _convert_chunk(self, lines: List[str], line_offset: int, stats: Dict[str, Any]):
+        """Convert a block of raw lines into (numeric matrix, status labels, status codes)"""
+        
+        # Sniff the format from the first valid line of the file
+        if self.detected_format is None:
+            for line in lines:
+                line = line.strip()
+                if line and not line.startswith('#') and self._parse_line(line) is not None:
+                    break
+        
+        # Same C reader as the mmap engine; comments and blank lines are skipped by it
+        bulk = self._convert_buffer_bulk(''.join(lines).encode('utf-8')) if self.detected_format else None
+        if bulk is not None:
+            stats['parsed_lines'] += len(bulk[2])
+            return bulk
+        
+        return self._convert_chunk_lines(lines, line_offset, stats)
+    
+    def _convert_chunk_lines(self, lines: List[str], line_offset: int, stats: Dict[str, Any]):
+        """Line-by-line conversion for chunks that contain irregular lines"""
+        
+        rows = []
+        statuses = []
+        for line_num, line in enumerate(lines, line_offset + 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            
+            fields = None
+            if self.detected_format is not None:
+                fields = self._split_line(line, self.detected_format)
+            measurement = self._parse_fields(fields) or self._parse_line(line)
+            
+            if measurement:
+                rows.append([measurement[name] for name in LOG_COLUMNS])
+                statuses.append(measurement['status'])
+            else:
+                stats['unparsed_lines'] += 1
+                if len(stats['unparsed_samples']) < self.MAX_UNPARSED_SAMPLES:
+                    stats['unparsed_samples'].append((line_num, line))
+        
+        if not rows:
+            return None
+        
+        stats['parsed_lines'] += len(rows)
+        labels, codes = np.unique(np.array(statuses), return_inverse=True)
+        return np.array(rows, dtype=np.float64), labels.tolist(), codes
+    
     def _parse_log_file(self, log_file: str) -> List[Dict[str, Any]]:
         """Parse log file and extract measurements"""
         
         measurements = []
+        unparsed_count = 0
+        unparsed_samples = []
+        self.detected_format = None
         
-        with open(log_file, 'r') as f:
+        with open_log_text(log_file) as f:
             for line_num, line in enumerate(f, 1):
                 line = line.strip()
                 if not line or line.startswith('#'):
                     continue
                 
-                # Try to match line with known patterns
-                measurement = self._parse_line(line)
+                # Fast path for the sniffed format, full pattern set on mismatch
+                measurement = None
+                if self.detected_format is not None:
+                    measurement = self._parse_fields(self._split_line(line, self.detected_format))
+                if measurement is None:
+                    measurement = self._parse_line(line)
+                
                 if measurement:
                     measurement['line_number'] = line_num
                     measurements.append(measurement)
                 else:
-                    self.logger.warning(f"Could not parse line {line_num}: {line}")
+                    unparsed_count += 1
+                    if len(unparsed_samples) < self.MAX_UNPARSED_SAMPLES:
+                        unparsed_samples.append((line_num, line))
+        
+        self.parse_stats = {
+            'format': self.detected_format,
+            'parsed_lines': len(measurements),
+            'unparsed_lines': unparsed_count,
+            'unparsed_samples': unparsed_samples
+        }
+        
+        if unparsed_count:
+            first_line, first_text = unparsed_samples[0]
+            self.logger.warning(f"Could not parse {unparsed_count} lines in {log_file} "
+                                f"(first at line {first_line}: {first_text})")
         
         return measurements
     
     def _parse_line(self, line: str) -> Optional[Dict[str, Any]]:
         """Parse a single log line"""
         
-        for pattern in self.log_patterns:
-            match = re.match(pattern, line)
+        for index, pattern in enumerate(self._compiled_patterns):
+            match = pattern.match(line)
             if match:
-                try:
-                    timestamp = float(match.group(1))
-                    freq_error = float(match.group(2))
-                    temperature = float(match.group(3))
-                    voltage = float(match.group(4))
-                    current = float(match.group(5))
-                    status = match.group(6)
-                    
-                    return {
-                        'timestamp': timestamp,
-                        'elapsed_time': timestamp,
-                        'frequency_error': freq_error,
-                        'temperature': temperature,
-                        'voltage': voltage,
-                        'current': current,
-                        'status': status
-                    }
-                except (ValueError, IndexError) as e:
-                    self.logger.debug(f"Failed to parse matched line: {e}")
-                    continue
+                measurement = self._parse_fields(match.groups())
+                if measurement is not None:
+                    if self.detected_format is None:
+                        self.detected_format = self.log_formats[index]
+                        self.logger.debug(f"Detected log format: {self.detected_format}")
+                    return measurement
         
         return None
     
+    @staticmethod
+    def _split_line(line: str, log_format: str) -> Optional[List[str]]:
+        """Split a line of a known format into its six fields without regex"""
+        
+        if log_format == 'csv':
+            fields = line.split(',')
+        elif log_format == 'whitespace':
+            fields = line.split()
+        elif log_format == 'bracketed':
+            fields = line.split()
+            if not fields or not (fields[0].startswith('[') and fields[0].endswith(']')):
+                return None
+            fields[0] = fields[0][1:-1]
+        elif log_format == 'colon':
+            timestamp, separator, rest = line.partition(':')
+            if not separator:
+                return None
+            fields = [timestamp] + rest.split(',')
+        else:
+            return None
+        
+        return fields if len(fields) == 6 else None
+    
+    def _parse_fields(self, fields: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+        """Convert six raw fields into a measurement, or None if they are not valid"""
+        
+        if fields is None:
+            return None
+        
+        status = fields[5].strip()
+        if not status.replace('_', '').isalnum():
+            return None
+        
+        try:
+            timestamp = float(fields[0])
+            freq_error = float(fields[1])
+            temperature = float(fields[2])
+            voltage = float(fields[3])
+            current = float(fields[4])
+        except ValueError as e:
+            self.logger.debug(f"Failed to parse fields: {e}")
+            return None
+        
+        # float() takes nan/inf and signed timestamps, which the line patterns reject
+        if timestamp < 0 or not all(map(math.isfinite, (timestamp, freq_error, temperature, voltage, current))):
+            return None
+        
+        return {
+            'timestamp': timestamp,
+            'elapsed_time': timestamp,
+            'frequency_error': freq_error,
+            'temperature': temperature,
+            'voltage': voltage,
+            'current': current,
+            'status': status
+        }
+    
     def _analyze_measurements(self, measurements: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze measurement data and calculate statistics"""
         
         if len(measurements) < 2:
             raise ValueError("Insufficient measurements for analysis")
         
-        # Extract data arrays
-        elapsed_times = np.array([m['elapsed_time'] for m in measurements])
-        freq_errors = np.array([m['frequency_error'] for m in measurements])
-        temperatures = np.array([m['temperature'] for m in measurements])
-        voltages = np.array([m['voltage'] for m in measurements])
-        currents = np.array([m['current'] for m in measurements])
+        return self.analyze_arrays(self.measurements_to_arrays(measurements))
+    
+    @staticmethod
+    def measurements_to_arrays(measurements: List[Dict[str, Any]]) -> MeasurementBlock:
+        """Convert a list of measurement dicts into the column form of load_log_arrays"""
+        return MeasurementBlock.from_dicts(measurements)
+    
+    def analyze_arrays(self, arrays: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze column data from load_log_arrays and calculate statistics"""
         
-        # Calculate basic statistics
-        duration = elapsed_times[-1] - elapsed_times[0]
+        if arrays['count'] < 2:
+            raise ValueError("Insufficient measurements for analysis")
         
-        # Frequency stability analysis
-        freq_stability = np.std(freq_errors)
-        freq_drift = np.polyfit(elapsed_times, freq_errors, 1)[0]
+        analysis = self._new_accumulator(arrays['count'])
+        analysis.update(arrays)
+        results = analysis.results()
         
-        # Calculate Allan Deviation
-        allan_deviations = self._calculate_allan_deviation(freq_errors, elapsed_times)
+        # The whole record is at hand, so the compensated residual's stability can be added
+        thermal = results['thermal']
+        if 'sensitivity' in thermal:
+            compensated = self.temperature_compensated(arrays, thermal)
+            thermal['compensated_allan_deviations'] = self._grid_allan_deviations(
+                compensated['frequency_error'], compensated['valid'], compensated['interval'])
+        results['dynamic_adev'] = self.dynamic_allan_deviation(arrays)
         
-        # Temperature stability analysis
-        temp_stability = np.std(temperatures)
-        temp_drift = np.polyfit(elapsed_times, temperatures, 1)[0]
+        return self._with_compliance(results)
+    
+    def _resample(self, arrays: Dict[str, Any]):
+        """Frequency error and temperature on the analysis grid; returns (grid, columns, valid, interval)"""
         
-        # Voltage and current analysis
-        voltage_stability = np.std(voltages)
-        current_stability = np.std(currents)
+        resampler = UniformResampler(self.resample_interval, self.gap_factor)
+        grid, resampled, valid = resampler.update(arrays['elapsed_time'], {
+            'frequency_error': arrays['frequency_error'], 'temperature': arrays['temperature']})
+        return grid, resampled, valid, resampler.interval
+    
+    def dynamic_allan_deviation(self, arrays: Dict[str, Any], window: Optional[float] = None,
+                                step: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Allan deviation of the frequency error in sliding windows, as a tau x time matrix
         
-        # Status analysis
-        status_counts = {}
-        for m in measurements:
-            status = m['status']
-            status_counts[status] = status_counts.get(status, 0) + 1
+        Window and step are in seconds (default analysis.dynamic_adev_window
+        and analysis.dynamic_adev_step). Times are window centres on the
+        elapsed-time axis; matrix entries without valid data are None.
+        Returns None when the record is shorter than one window.
+        """
         
-        results = {
-            'duration': duration,
-            'measurement_count': len(measurements),
-            'measurement_interval': duration / (len(measurements) - 1) if len(measurements) > 1 else 0,
-            
-            # Frequency analysis
-            'freq_stability': freq_stability,
-            'freq_drift_rate': freq_drift,
-            'freq_error_min': np.min(freq_errors),
-            'freq_error_max': np.max(freq_errors),
-            'freq_error_mean': np.mean(freq_errors),
-            'freq_error_std': np.std(freq_errors),
-            
-            # Allan deviation analysis
-            'allan_deviation': allan_deviations.get(1, 0.0),  # 1-second Allan deviation
-            'allan_deviations': allan_deviations,
-            
-            # Temperature analysis
-            'temp_stability': temp_stability,
-            'temp_drift_rate': temp_drift,
-            'temp_min': np.min(temperatures),
-            'temp_max': np.max(temperatures),
-            'temp_mean': np.mean(temperatures),
-            'temp_std': np.std(temperatures),
-            
-            # Power analysis
-            'voltage_stability': voltage_stability,
-            'current_stability': current_stability,
-            'voltage_min': np.min(voltages),
-            'voltage_max': np.max(voltages),
-            'voltage_mean': np.mean(voltages),
-            'current_min': np.min(currents),
-            'current_max': np.max(currents),
-            'current_mean': np.mean(currents),
-            
-            # Status analysis
-            'status_distribution': status_counts,
-            'primary_status': max(status_counts.items(), key=lambda x: x[1])[0] if status_counts else 'UNKNOWN'
+        grid, resampled, valid, interval = self._resample(arrays)
+        window_samples = int(round((window or self.dynamic_adev_window) / interval))
+        step_samples = max(1, int(round((step or self.dynamic_adev_step) / interval)))
+        if window_samples < 4 or len(grid) < window_samples:
+            return None
+        
+        dynamic = calculate_dynamic_adev(resampled['frequency_error'], interval, window_samples, step_samples,
+                                         valid=valid)
+        return {
+            'taus': [self._tau_key(tau) for tau in dynamic['taus']],
+            'times': (dynamic['times'] + grid[0]).tolist(),
+            'adev': [[None if np.isnan(value) else float(value) for value in row] for row in dynamic['adev']],
+            'window': dynamic['window'],
+            'step': dynamic['step']
         }
+    
+    def temperature_compensated(self, arrays: Dict[str, Any], thermal: Dict[str, Any]) -> Dict[str, Any]:
+        """Frequency with the fitted temperature term removed, on the analysis grid
+        
+        Returns the grid times, the residual frequency_error, its valid mask
+        and the grid interval, ready for Allan deviation and other
+        uniform-grid estimators.
+        """
+        
+        grid, resampled, valid, interval = self._resample(arrays)
+        residual, valid = compensate_temperature(resampled['frequency_error'], resampled['temperature'],
+                                                 valid, thermal, interval)
+        return {'time': grid, 'frequency_error': residual, 'valid': valid, 'interval': interval}
+    
+    def _new_accumulator(self, expected_samples: Optional[int], max_window: Optional[int] = None) -> LogAnalysisAccumulator:
+        """Analysis accumulator with the configured units and resampling"""
+        return LogAnalysisAccumulator(self.frequency_units, expected_samples, max_window,
+                                      self.resample_interval, self.gap_factor,
+                                      self.phase_limit, self.drift_confidence, self.thermal_max_lag,
+                                      self.adev_confidence)
+    
+    def _with_compliance(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Check the MTIE/TDEV curves in results against the configured mask"""
+        
+        taus = sorted(set(results['mtie']) | set(results['tdev']))
+        mtie = [results['mtie'].get(tau, np.nan) for tau in taus]
+        tdev = [results['tdev'].get(tau, np.nan) for tau in taus]
+        
+        checker = ComplianceChecker(self.config)
+        try:
+            results['compliance'] = checker.evaluate_curves(self.compliance_mask, taus, mtie, tdev)
+        except ValueError as e:
+            self.logger.warning(f"Compliance check skipped: {e}")
+            results['compliance'] = None
         
         return results
     
+    @staticmethod
+    def _tau_key(tau: float):
+        """Tau as an int when whole, for readable dict keys and reports"""
+        return int(tau) if float(tau).is_integer() else float(tau)
+    
+    @staticmethod
+    def _tau_dict(taus: np.ndarray, values: np.ndarray) -> Dict[Any, float]:
+        """Map taus to values, dropping taus the record does not cover"""
+        return {
+            LogParser._tau_key(tau): float(value)
+            for tau, value in zip(taus, values) if not np.isnan(value)
+        }
+    
     def _calculate_allan_deviation(self, freq_errors: np.ndarray, elapsed_times: np.ndarray) -> Dict[int, float]:
         """Calculate Allan deviation for different tau values"""
         
-        tau_values = [1, 10, 100, 1000]  # Tau values in seconds
-        allan_deviations = {}
+        resampler = UniformResampler(self.resample_interval, self.gap_factor)
+        _, resampled, valid = resampler.update(elapsed_times, {'frequency_error': freq_errors})
+        return self._grid_allan_deviations(resampled['frequency_error'], valid, resampler.interval)
+    
+    @staticmethod
+    def _grid_allan_deviations(values: np.ndarray, valid: np.ndarray, interval: float) -> Dict[int, float]:
+        """Allan deviation at the standard taus of uniform-grid data"""
         
-        for tau in tau_values:
-            # Find measurements at tau intervals
-            tau_indices = []
-            current_time = elapsed_times[0]
-            
-            for i, time_val in enumerate(elapsed_times):
-                if time_val >= current_time:
-                    tau_indices.append(i)
-                    current_time += tau
-            
-            if len(tau_indices) < 2:
-                allan_deviations[tau] = 0.0
-                continue
-            
-            # Calculate frequency differences at tau intervals
-            freq_at_tau = freq_errors[tau_indices]
-            freq_diff = np.diff(freq_at_tau)
-            
-            # Calculate Allan deviation
-            if len(freq_diff) > 0:
-                allan_dev = np.sqrt(np.mean(freq_diff**2) / 2)
-                allan_deviations[tau] = allan_dev
-            else:
-                allan_deviations[tau] = 0.0
+        allan_deviations = {}
+        for tau in LogAnalysisAccumulator.ALLAN_TAUS:
+            allan = _GridAllan(tau)
+            allan.update(values, valid, interval)
+            allan_deviations[tau] = allan.deviation()
         
         return allan_deviations
     
-    def parse_multiple_logs(self, log_files: List[str]) -> Dict[str, Any]:
-        """Parse multiple log files and compare results"""
+    def parse_multiple_logs(self, log_files: List[str], max_workers: Optional[int] = None,
+                            progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                            streaming: Optional[bool] = None) -> Dict[str, Any]:
+        """Parse multiple log files and compare results
+        
+        Files are analyzed in a process pool of max_workers processes
+        (analysis.parallel_workers, default one per core). A failing file
+        yields {'error': ...} without affecting the others. progress_callback
+        receives (completed, total, log_file) as each file finishes.
+        """
+        
+        if max_workers is None:
+            max_workers = (self.config.get('analysis.parallel_workers') if self.config else None) or os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(log_files)))
         
         all_results = {}
+        total = len(log_files)
         
-        for log_file in log_files:
-            try:
-                results = self.parse_holdover_log(log_file)
-                all_results[log_file] = results
-            except Exception as e:
-                self.logger.error(f"Failed to parse {log_file}: {e}")
-                all_results[log_file] = {'error': str(e)}
+        if max_workers == 1:
+            for log_file in log_files:
+                all_results[log_file] = _parse_log_worker(self.config, log_file, streaming)
+                self._report_parse_result(log_file, all_results[log_file])
+                if progress_callback:
+                    progress_callback(len(all_results), total, log_file)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(_parse_log_worker, self.config, log_file, streaming): log_file
+                    for log_file in log_files
+                }
+                for future in as_completed(futures):
+                    log_file = futures[future]
+                    try:
+                        all_results[log_file] = future.result()
+                    except Exception as e:
+                        # Worker process died (e.g. out of memory)
+                        all_results[log_file] = {'error': str(e)}
+                    self._report_parse_result(log_file, all_results[log_file])
+                    if progress_callback:
+                        progress_callback(len(all_results), total, log_file)
         
-        return all_results
+        # Report in the order the files were given
+        return {log_file: all_results[log_file] for log_file in log_files}
+    
+    def _report_parse_result(self, log_file: str, results: Dict[str, Any]):
+        """Log a per-file failure from parse_multiple_logs"""
+        if 'error' in results:
+            self.logger.error(f"Failed to parse {log_file}: {results['error']}")
     
     def generate_report(self, results: Dict[str, Any], output_file: str = None) -> str:
         """Generate a formatted report from analysis results"""
@@ -243,6 +1301,17 @@ class LogParser:
         report.append(f"  Average Interval: {results['measurement_interval']:.2f} seconds")
         report.append("")
         
+        # Data quality of the uniform grid used for stability analysis
+        quality = results.get('data_quality')
+        if quality:
+            report.append("Data Quality:")
+            report.append(f"  Grid Interval: {quality['nominal_interval']:.3f} seconds")
+            report.append(f"  Coverage: {quality['coverage'] * 100:.2f}% ({quality['missing_points']} missing points)")
+            report.append(f"  Gaps: {quality['gap_count']} ({quality['gap_time']:.1f}s total, longest {quality['longest_gap']:.1f}s)")
+            report.append(f"  Restarts: {quality['restarts']}")
+            report.append(f"  Interval Jitter (RMS): {quality['jitter_rms']:.3e} seconds")
+            report.append("")
+        
         # Frequency stability
         report.append("Frequency Stability Analysis:")
         report.append(f"  Stability (std): {results['freq_stability']:.2e}")
@@ -255,10 +1324,54 @@ class LogParser:
         
         # Allan deviations
         report.append("Allan Deviations:")
+        confidence = results.get('allan_confidence', {})
         for tau, dev in results['allan_deviations'].items():
-            report.append(f"  τ={tau}s: {dev:.2e}")
+            bounds = confidence.get(tau)
+            if bounds:
+                report.append(f"  τ={tau}s: {dev:.2e} [{bounds['lower']:.2e}, {bounds['upper']:.2e}] "
+                              f"({bounds['noise_type']}, EDF {bounds['edf']:.1f})")
+            else:
+                report.append(f"  τ={tau}s: {dev:.2e}")
+        if confidence:
+            report.append(f"  Bounds: {results['adev_confidence'] * 100:.1f}% chi-squared confidence")
         report.append("")
         
+        # Sliding-window Allan deviation, thinned to at most REPORT_DYNAMIC_ROWS windows
+        dynamic = results.get('dynamic_adev')
+        if dynamic:
+            report.append(f"Dynamic Allan Deviation (window {dynamic['window']:g}s, step {dynamic['step']:g}s):")
+            report.append("  " + f"{'Time, h':>9}" + "".join(f" {f'τ={tau}s':>10}" for tau in dynamic['taus']))
+            stride = -(-len(dynamic['times']) // REPORT_DYNAMIC_ROWS)
+            for i in range(0, len(dynamic['times']), stride):
+                values = "".join(f" {'-' if row[i] is None else f'{row[i]:.2e}':>10}" for row in dynamic['adev'])
+                report.append("  " + f"{dynamic['times'][i] / 3600:>9.2f}" + values)
+            report.append("")
+        
+        # Phase drift model
+        drift = results.get('drift_model') or {}
+        if 'frequency_offset' in drift:
+            report.append("Phase Drift Model:")
+            report.append(f"  Frequency Offset: {drift['frequency_offset']:.3e} ± {drift['frequency_offset_std']:.1e}")
+            report.append(f"  Aging: {drift['aging_per_day']:.3e}/day ± {drift['aging_per_day_std']:.1e}")
+            report.append(f"  Residual Noise (RMS): {drift['residual_rms_ns']:.2f} ns")
+            if 'phase_limit_ns' in drift:
+                report.append(f"  Time to ±{drift['phase_limit_ns']:g} ns: {_format_hours(drift['time_to_limit'])} "
+                              f"({drift['confidence'] * 100:.0f}% band: {_format_hours(drift['time_to_limit_earliest'])}"
+                              f" - {_format_hours(drift['time_to_limit_latest'])})")
+            report.append("")
+        
+        # Temperature sensitivity
+        thermal = results.get('thermal') or {}
+        if 'sensitivity' in thermal:
+            report.append("Temperature Sensitivity:")
+            report.append(f"  Sensitivity: {thermal['sensitivity_ppb_per_c']:.3f} ± "
+                          f"{thermal['sensitivity_std_ppb_per_c']:.3f} ppb/°C")
+            report.append(f"  Thermal Lag: {thermal['lag']:.0f}s (searched up to {thermal['max_lag']:.0f}s)")
+            report.append(f"  Partial Correlation: {thermal['correlation']:.3f}")
+            for tau, dev in thermal.get('compensated_allan_deviations', {}).items():
+                report.append(f"  Compensated Allan Deviation τ={tau}s: {dev:.2e}")
+            report.append("")
+        
         # Temperature stability
         report.append("Temperature Stability:")
         report.append(f"  Stability (std): {results['temp_stability']:.3f}°C")
@@ -283,6 +1396,20 @@ class LogParser:
             report.append(f"  {status}: {count} ({percentage:.1f}%)")
         report.append("")
         
+        # Mask compliance
+        compliance = results.get('compliance')
+        if compliance:
+            verdict = "PASS" if compliance['passed'] else "FAIL"
+            report.append(f"Mask Compliance ({compliance['mask']}): {verdict}")
+            for metric in ('mtie', 'tdev'):
+                if metric not in compliance:
+                    continue
+                for point in compliance[metric]['points']:
+                    flag = "ok" if point['passed'] else "VIOLATION"
+                    report.append(f"  {metric.upper()} τ={point['tau']:g}s: {point['value']:.2f} ns "
+                                  f"(limit {point['limit']:.2f} ns, margin {point['margin']:+.2f} ns) {flag}")
+            report.append("")
+        
         report_text = "\n".join(report)
         
         if output_file:
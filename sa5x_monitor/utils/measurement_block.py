@@ -0,0 +1,217 @@
+"""
+Columnar measurement storage
+One float64 array per quantity plus int32 status codes, shared by tests, parser and web
+"""
+
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Union
+
+import numpy as np
+
+
+# Float columns of a measurement, in log file order
+MEASUREMENT_COLUMNS = ('timestamp', 'frequency_error', 'temperature', 'voltage', 'current')
+
+
+class MeasurementBlock:
+    """Measurements stored column-wise with amortized growth
+
+    Reads like the column dict of LogParser.load_log_arrays: block['temperature']
+    is a float64 array, block['status'] int32 codes into block['status_labels'],
+    block['count'] the number of rows. 'elapsed_time' is the timestamp column
+    unless the block was created with a separate elapsed column (live tests,
+    where timestamps are wall-clock). Indexing with a slice, mask or index
+    array returns a new block; slices share memory with this one.
+    """
+
+    def __init__(self, capacity: int = 1024, separate_elapsed: bool = False):
+        names = MEASUREMENT_COLUMNS + ('elapsed_time',) if separate_elapsed else MEASUREMENT_COLUMNS
+        self._columns = {name: np.empty(max(capacity, 1)) for name in names}
+        self._status = np.empty(max(capacity, 1), dtype=np.int32)
+        self.status_labels: List[str] = []
+        self._label_codes: Dict[str, int] = {}
+        self.size = 0
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, Any]) -> 'MeasurementBlock':
+        """Wrap load_log_arrays-style columns without copying them"""
+
+        block = cls.__new__(cls)
+        block._columns = {name: np.asarray(arrays[name], dtype=np.float64) for name in MEASUREMENT_COLUMNS}
+        elapsed = arrays.get('elapsed_time')
+        if elapsed is not None and elapsed is not arrays['timestamp']:
+            block._columns['elapsed_time'] = np.asarray(elapsed, dtype=np.float64)
+        block._status = np.asarray(arrays['status'], dtype=np.int32)
+        block.status_labels = list(arrays['status_labels'])
+        block._label_codes = {label: code for code, label in enumerate(block.status_labels)}
+        block.size = len(block._status)
+        return block
+
+    @classmethod
+    def from_dicts(cls, measurements: List[Dict[str, Any]]) -> 'MeasurementBlock':
+        """Build a block from a list of measurement dicts"""
+
+        separate_elapsed = bool(measurements) and 'elapsed_time' in measurements[0]
+        block = cls(len(measurements), separate_elapsed)
+        columns = {name: np.array([m[name] for m in measurements], dtype=np.float64)
+                   for name in block._columns}
+        codes = np.array([block._status_code(m['status']) for m in measurements], dtype=np.int32)
+        block._extend_columns(columns, codes)
+        return block
+
+    @property
+    def count(self) -> int:
+        return self.size
+
+    @property
+    def separate_elapsed(self) -> bool:
+        return 'elapsed_time' in self._columns
+
+    def __len__(self) -> int:
+        return self.size
+
+    def keys(self) -> List[str]:
+        return list(MEASUREMENT_COLUMNS) + ['elapsed_time', 'status', 'status_labels', 'count']
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self.keys() else default
+
+    def __getitem__(self, key: Union[str, slice, np.ndarray]) -> Any:
+        if isinstance(key, str):
+            if key == 'count':
+                return self.size
+            if key == 'status_labels':
+                return self.status_labels
+            if key == 'status':
+                return self._status[:self.size]
+            if key == 'elapsed_time' and not self.separate_elapsed:
+                key = 'timestamp'
+            return self._columns[key][:self.size]
+
+        block = MeasurementBlock.__new__(MeasurementBlock)
+        block._columns = {name: column[:self.size][key] for name, column in self._columns.items()}
+        block._status = self._status[:self.size][key]
+        block.status_labels = list(self.status_labels)
+        block._label_codes = dict(self._label_codes)
+        block.size = len(block._status)
+        return block
+
+    def between(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> 'MeasurementBlock':
+        """Rows with start_time <= timestamp <= end_time"""
+
+        timestamps = self['timestamp']
+        keep = np.ones(self.size, dtype=bool)
+        if start_time is not None:
+            keep &= timestamps >= start_time
+        if end_time is not None:
+            keep &= timestamps <= end_time
+        return self if keep.all() else self[keep]
+
+    def statuses(self) -> np.ndarray:
+        """Status label of every row"""
+        return np.array(self.status_labels, dtype=object)[self['status']]
+
+    def _status_code(self, label: str) -> int:
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self.status_labels)
+            self.status_labels.append(label)
+        return code
+
+    def _reserve(self, needed: int):
+        """Grow the columns to hold at least needed rows"""
+        capacity = len(self._status)
+        if needed <= capacity:
+            return
+        capacity = max(needed, int(capacity * 1.5))
+        for name, column in self._columns.items():
+            grown = np.empty(capacity)
+            grown[:self.size] = column[:self.size]
+            self._columns[name] = grown
+        grown = np.empty(capacity, dtype=np.int32)
+        grown[:self.size] = self._status[:self.size]
+        self._status = grown
+
+    def _extend_columns(self, columns: Dict[str, np.ndarray], codes: np.ndarray):
+        needed = self.size + len(codes)
+        self._reserve(needed)
+        for name, column in self._columns.items():
+            column[self.size:needed] = columns[name]
+        self._status[self.size:needed] = codes
+        self.size = needed
+
+    def append(self, measurement: Dict[str, Any]):
+        """Add one measurement dict (as produced by a live test)"""
+
+        self._reserve(self.size + 1)
+        for name, column in self._columns.items():
+            column[self.size] = measurement[name]
+        self._status[self.size] = self._status_code(measurement['status'])
+        self.size += 1
+
+    def extend(self, chunk: Union['MeasurementBlock', Dict[str, Any]]):
+        """Append a block or an iter_log_chunks chunk, mapping its status codes onto this block's labels"""
+
+        labels = chunk['status_labels']
+        codes = chunk['status']
+        if list(labels) != self.status_labels:
+            lookup = np.array([self._status_code(label) for label in labels], dtype=np.int32)
+            codes = lookup[codes]
+
+        columns = {name: chunk[name] for name in MEASUREMENT_COLUMNS}
+        if self.separate_elapsed:
+            columns['elapsed_time'] = chunk['elapsed_time']
+        self._extend_columns(columns, codes)
+
+    def to_arrays(self) -> Dict[str, Any]:
+        """Plain column dict in the load_log_arrays form"""
+        return {key: self[key] for key in self.keys()}
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """One dict per measurement, for JSON output and older callers"""
+
+        names = list(MEASUREMENT_COLUMNS) + ['elapsed_time']
+        columns = [self[name].tolist() for name in names]
+        statuses = self.statuses()
+        return [dict(zip(names, values), status=status) for values, status in zip(zip(*columns), statuses)]
+
+    def compact(self) -> 'MeasurementBlock':
+        """Drop unused capacity"""
+        for name, column in self._columns.items():
+            self._columns[name] = column[:self.size].copy()
+        self._status = self._status[:self.size].copy()
+        return self
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickle (analysis cache, worker processes) only the filled rows
+        state = dict(self.__dict__)
+        state['_columns'] = {name: column[:self.size] for name, column in self._columns.items()}
+        state['_status'] = self._status[:self.size]
+        return state
+
+    def save(self, path: str):
+        """Write the block to a NumPy .npz archive"""
+
+        arrays = {name: self[name] for name in self._columns}
+        np.savez(path, status=self['status'], status_labels=np.array(self.status_labels, dtype=str), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'MeasurementBlock':
+        """Read a block written by save()"""
+
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Measurement file not found: {path}")
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        arrays['status_labels'] = arrays['status_labels'].tolist()
+        return cls.from_arrays(arrays)
+
+    @classmethod
+    def concatenate(cls, blocks: Iterable['MeasurementBlock']) -> 'MeasurementBlock':
+        """Join blocks row-wise, merging their status labels"""
+
+        blocks = list(blocks)
+        result = cls(sum(len(block) for block in blocks), any(block.separate_elapsed for block in blocks))
+        for block in blocks:
+            result.extend(block)
+        return result
@@ -0,0 +1,137 @@
+"""
+Multi-device stability analysis
+N-cornered hat separation of per-unit Allan deviation from simultaneously logged units
+"""
+
+import logging
+from itertools import combinations
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from .log_parser import LogParser
+from .log_merge import LogMerger
+from .stability import FREQUENCY_UNIT_SCALE, StreamingAllanDeviation
+
+
+def cornered_hat(pair_variances: np.ndarray, pairs: Sequence[Sequence[int]], units: int) -> np.ndarray:
+    """Per-unit variances from pairwise difference variances (N-cornered hat)
+
+    pair_variances has one row per tau and one column per pair (i, j),
+    whose variance is modelled as var_i + var_j for uncorrelated units.
+    All taus are solved at once by least squares; with three units this
+    is the exact three-cornered hat. Taus missing any pair give NaN.
+    Negative results, which noise or correlated units can produce, are
+    returned as is.
+    """
+
+    pairs = np.asarray(pairs, dtype=int)
+    if units < 3:
+        raise ValueError("The cornered hat needs at least three units")
+    if len(pairs) < units:
+        raise ValueError("Not enough pairs to separate every unit")
+
+    design = np.zeros((len(pairs), units))
+    design[np.arange(len(pairs)), pairs[:, 0]] = 1.0
+    design[np.arange(len(pairs)), pairs[:, 1]] = 1.0
+
+    pair_variances = np.atleast_2d(np.asarray(pair_variances, dtype=float))
+    complete = np.all(np.isfinite(pair_variances), axis=1)
+    variances = np.full((len(pair_variances), units), np.nan)
+    variances[complete] = pair_variances[complete] @ np.linalg.pinv(design).T
+    return variances
+
+
+class CorneredHat:
+    """N-cornered hat analysis of N >= 3 units measured on a common grid
+
+    Frequency rows with one column per unit are differenced for every pair
+    of units, so common-mode reference noise cancels; the Allan variances
+    of all pair differences are accumulated together, one
+    StreamingAllanDeviation column per pair, and separated into per-unit
+    Allan deviations. NaN samples mark gaps.
+    """
+
+    def __init__(self, units: int, tau0: float = 1.0, max_octaves: int = 16, frequency_scale: float = 1.0):
+        if units < 3:
+            raise ValueError("The cornered hat needs at least three units")
+
+        self.logger = logging.getLogger(__name__)
+        self.units = units
+        self.frequency_scale = frequency_scale
+        self.pairs = np.array(list(combinations(range(units), 2)), dtype=int)
+        self.allan = StreamingAllanDeviation(tau0, max_octaves, columns=len(self.pairs))
+
+    def update(self, freq: np.ndarray):
+        """Add frequency rows (n x units) in log units; NaN marks a missing sample"""
+
+        freq = np.asarray(freq, dtype=float).reshape(-1, self.units) * self.frequency_scale
+        self.allan.update_many(freq[:, self.pairs[:, 0]] - freq[:, self.pairs[:, 1]])
+
+    def results(self) -> Dict[str, Any]:
+        """Pairwise and per-unit Allan deviations for the taus every pair covers
+
+        'unit_adev' is NaN where the separated variance is negative.
+        """
+
+        pair_variances = self.allan.deviations() ** 2
+        covered = np.any(np.isfinite(pair_variances), axis=1)
+        pair_variances = pair_variances[covered]
+        unit_variances = cornered_hat(pair_variances, self.pairs, self.units)
+
+        with np.errstate(invalid='ignore'):
+            unit_adev = np.sqrt(np.where(unit_variances >= 0, unit_variances, np.nan))
+            pair_adev = np.sqrt(pair_variances)
+
+        return {
+            'units': self.units,
+            'taus': self.allan.taus[covered],
+            'pairs': self.pairs,
+            'pair_counts': self.allan.counts[covered],
+            'pair_adev': pair_adev,
+            'unit_variances': unit_variances,
+            'unit_adev': unit_adev
+        }
+
+
+def analyze_logs(log_files: Sequence[str], config=None, step: Optional[float] = None,
+                 max_octaves: int = 16, chunk_chars: Optional[int] = None) -> Dict[str, Any]:
+    """N-cornered hat of three or more logs recorded against the same reference
+
+    The logs are aligned onto a common grid of step seconds with
+    LogMerger.align (default analysis.resample_interval, else the median
+    interval of the first log), with gaps longer than
+    analysis.resample_gap_factor steps left out. Returns CorneredHat
+    results plus the log files and grid step.
+    """
+
+    if len(log_files) < 3:
+        raise ValueError("The cornered hat needs at least three logs")
+
+    parser = LogParser(config)
+    step = step or parser.resample_interval or _median_interval(parser, log_files[0], chunk_chars)
+    merger = LogMerger(log_files, config, chunk_chars)
+
+    hat = CorneredHat(len(log_files), step, max_octaves, FREQUENCY_UNIT_SCALE[parser.frequency_units])
+    rows = 0
+    for block in merger.align(step, ('frequency_error',), max_gap=parser.gap_factor * step):
+        hat.update(block['frequency_error'])
+        rows += len(block['time'])
+
+    if rows < 3:
+        raise ValueError("The logs do not overlap in time")
+
+    results = hat.results()
+    results.update({'log_files': list(log_files), 'step': step, 'grid_points': rows})
+    return results
+
+
+def _median_interval(parser: LogParser, log_file: str, chunk_chars: Optional[int]) -> float:
+    """Median sample interval of the first chunk of a log"""
+
+    for chunk in parser.iter_log_chunks(log_file, chunk_chars):
+        if chunk['count'] > 1:
+            interval = float(np.median(np.diff(chunk['timestamp'])))
+            if interval > 0:
+                return interval
+    raise ValueError(f"Cannot determine the sample interval of {log_file}")
@@ -0,0 +1,284 @@
+"""
+Frequency-domain analysis of SA5X phase data
+Welch PSD of phase and fractional frequency, phase-noise spectrum and lag-1 ACF noise identification
+"""
+
+import logging
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Power-law exponent alpha of S_y(f) ~ f^alpha and the noise it denotes
+NOISE_TYPES = {
+    2: 'White PM',
+    1: 'Flicker PM',
+    0: 'White FM',
+    -1: 'Flicker FM',
+    -2: 'Random Walk FM'
+}
+
+# Fewest decimated points for a lag-1 autocorrelation estimate
+MIN_NOISE_ID_POINTS = 32
+
+
+class WelchPSD:
+    """One-sided Welch power spectral density of a uniform series fed in chunks
+
+    Segments of segment_length samples overlapping by the given fraction
+    are linearly detrended, Hann windowed and their periodograms averaged.
+    Segments that contain an invalid sample are skipped. Only the samples
+    of the next unfinished segment are buffered between chunks.
+    """
+
+    # Segments transformed per batch
+    BATCH_SEGMENTS = 256
+
+    def __init__(self, segment_length: int = 4096, interval: float = 1.0, overlap: float = 0.5):
+        if segment_length < 4:
+            raise ValueError("Segment length must be at least 4 samples")
+        if not 0 <= overlap < 1:
+            raise ValueError("Overlap must be in [0, 1)")
+
+        self.segment_length = segment_length
+        self.interval = interval
+        self.step = max(1, int(round(segment_length * (1 - overlap))))
+        self.segments = 0
+        self.skipped_segments = 0
+
+        self.window = np.hanning(segment_length)
+        self._ramp = np.arange(segment_length) - (segment_length - 1) / 2
+        self._power = np.zeros(segment_length // 2 + 1)
+        self._values = np.empty(0)
+        self._valid = np.empty(0, dtype=bool)
+
+    def update(self, values: np.ndarray, valid: Optional[np.ndarray] = None):
+        """Add consecutive samples; invalid ones exclude their segments"""
+
+        values = np.asarray(values, dtype=float)
+        valid = np.isfinite(values) if valid is None else np.asarray(valid, dtype=bool) & np.isfinite(values)
+        buffer = np.concatenate((self._values, values))
+        buffer_valid = np.concatenate((self._valid, valid))
+
+        count = (len(buffer) - self.segment_length) // self.step + 1 if len(buffer) >= self.segment_length else 0
+        if count:
+            segments = sliding_window_view(buffer, self.segment_length)[::self.step][:count]
+            complete = sliding_window_view(buffer_valid, self.segment_length)[::self.step][:count].all(axis=1)
+            for start in range(0, count, self.BATCH_SEGMENTS):
+                batch = segments[start:start + self.BATCH_SEGMENTS][complete[start:start + self.BATCH_SEGMENTS]]
+                self._accumulate(batch)
+            self.skipped_segments += int(count - np.count_nonzero(complete))
+
+        # Keep what the next segment needs
+        keep = count * self.step
+        self._values = buffer[keep:].copy()
+        self._valid = buffer_valid[keep:].copy()
+
+    def _accumulate(self, segments: np.ndarray):
+        if not len(segments):
+            return
+        centered = segments - segments.mean(axis=1, keepdims=True)
+        slope = centered @ self._ramp / (self._ramp @ self._ramp)
+        detrended = centered - slope[:, None] * self._ramp
+        spectra = np.fft.rfft(detrended * self.window, axis=1)
+        self._power += np.sum(spectra.real ** 2 + spectra.imag ** 2, axis=0)
+        self.segments += len(segments)
+
+    def results(self) -> Dict[str, Any]:
+        """Frequencies (Hz) and PSD (units^2/Hz), without the DC bin"""
+
+        frequencies = np.fft.rfftfreq(self.segment_length, self.interval)
+        if not self.segments:
+            return {'frequencies': np.empty(0), 'psd': np.empty(0), 'segments': 0,
+                    'skipped_segments': self.skipped_segments}
+
+        psd = self._power * self.interval / (self.segments * np.sum(self.window ** 2))
+        psd[1:] *= 2
+        if self.segment_length % 2 == 0:
+            psd[-1] /= 2
+        return {
+            'frequencies': frequencies[1:],
+            'psd': psd[1:],
+            'segments': self.segments,
+            'skipped_segments': self.skipped_segments,
+            'resolution': 1.0 / (self.segment_length * self.interval)
+        }
+
+
+class _LagOneSums:
+    """Running sums for the lag-1 autocorrelation of a series fed in pieces"""
+
+    def __init__(self):
+        self.count = 0
+        self.reference = None
+        self.first = 0.0
+        self.last = 0.0
+        self.total = 0.0
+        self.squares = 0.0
+        self.products = 0.0
+
+    def update(self, values: np.ndarray):
+        if not len(values):
+            return
+        if self.reference is None:
+            self.reference = float(values[0])
+        z = values - self.reference
+        if self.count:
+            self.products += self.last * z[0]
+        else:
+            self.first = float(z[0])
+        self.products += float(np.dot(z[:-1], z[1:]))
+        self.total += float(z.sum())
+        self.squares += float(np.dot(z, z))
+        self.count += len(z)
+        self.last = float(z[-1])
+
+    def autocorrelation(self) -> float:
+        n = self.count
+        mean = self.total / n
+        variance = self.squares - n * mean * mean
+        covariance = (self.products - mean * (2 * self.total - self.first - self.last)
+                      + (n - 1) * mean * mean)
+        return covariance / variance if variance > 0 else 0.0
+
+
+class LagOneNoiseID:
+    """Power-law noise identification from the lag-1 autocorrelation of phase
+
+    For each octave tau = m * interval the phase is decimated by m and
+    differenced d = 0, 1, 2 times on the fly; the first differencing order
+    whose lag-1 autocorrelation r1 gives delta = r1 / (1 + r1) < 0.25 yields
+    alpha = 2 - 2 * (delta + d), rounded to the nearest noise type
+    (Riley & Greenhall). Memory is constant in the record length.
+    """
+
+    MAX_DIFFERENCES = 2
+
+    def __init__(self, interval: float = 1.0, max_octaves: int = 16):
+        self.interval = interval
+        self.m_values = [1 << k for k in range(max_octaves)]
+        self.index = 0
+        self._sums = {m: [_LagOneSums() for _ in range(self.MAX_DIFFERENCES + 1)] for m in self.m_values}
+        # Last value of each differencing order below the maximum, per m
+        self._carry = {m: [None] * self.MAX_DIFFERENCES for m in self.m_values}
+
+    def update(self, phase: np.ndarray):
+        """Add consecutive phase samples"""
+
+        phase = np.asarray(phase, dtype=float)
+        for m in self.m_values:
+            series = phase[(-self.index) % m::m]
+            if not len(series):
+                continue
+
+            # Difference across chunk boundaries with the last values seen
+            carry = self._carry[m]
+            for d, sums in enumerate(self._sums[m]):
+                if d:
+                    last = carry[d - 1]
+                    if len(series):
+                        carry[d - 1] = float(series[-1])
+                    series = np.diff(series if last is None else np.concatenate(([last], series)))
+                sums.update(series)
+        self.index += len(phase)
+
+    def results(self) -> List[Dict[str, Any]]:
+        """Noise type per tau with enough decimated points"""
+
+        identified = []
+        for m in self.m_values:
+            sums = self._sums[m]
+            if sums[0].count < MIN_NOISE_ID_POINTS:
+                break
+            for d, difference in enumerate(sums):
+                r1 = difference.autocorrelation()
+                delta = r1 / (1 + r1) if r1 > -1 else -0.5
+                if delta < 0.25 or d == self.MAX_DIFFERENCES:
+                    break
+            alpha = 2 - 2 * (delta + d)
+            alpha_type = int(np.clip(round(alpha), -2, 2))
+            identified.append({
+                'tau': m * self.interval,
+                'lag1_acf': r1,
+                'differences': d,
+                'alpha': alpha,
+                'noise_type': NOISE_TYPES[alpha_type]
+            })
+        return identified
+
+    def alphas(self, taus: np.ndarray, default: int = 0) -> np.ndarray:
+        """Rounded alpha at each tau, from the identified octave nearest in log tau
+
+        Returns the default (White FM) until an octave has enough points.
+        """
+
+        taus = np.asarray(taus, dtype=float)
+        identified = self.results()
+        if not identified:
+            return np.full(len(taus), default, dtype=int)
+
+        octaves = np.log([point['tau'] for point in identified])
+        nearest = np.argmin(np.abs(np.log(taus)[:, None] - octaves[None, :]), axis=1)
+        return np.clip(np.round([identified[i]['alpha'] for i in nearest]), -2, 2).astype(int)
+
+
+class PhaseSpectrum:
+    """Spectral analysis of a uniformly sampled phase series (ns) fed in chunks
+
+    S_x(f) is the Welch PSD of the phase in s^2/Hz; the fractional frequency
+    PSD follows as S_y(f) = (2 pi f)^2 S_x(f) and the single-sideband phase
+    noise of a carrier nu0 as L(f) = 10 log10((2 pi nu0)^2 S_x(f) / 2).
+    """
+
+    def __init__(self, interval: float = 1.0, segment_length: int = 4096, overlap: float = 0.5,
+                 carrier_frequency: float = 10e6, max_octaves: int = 16):
+        self.logger = logging.getLogger(__name__)
+        self.interval = interval
+        self.carrier_frequency = carrier_frequency
+        self.count = 0
+        self.welch = WelchPSD(segment_length, interval, overlap)
+        self.noise_id = LagOneNoiseID(interval, max_octaves)
+
+    def update(self, phase_ns: np.ndarray, valid: Optional[np.ndarray] = None):
+        """Add consecutive phase samples in ns; invalid ones are left out of the PSD"""
+
+        phase = np.asarray(phase_ns, dtype=float) * 1e-9
+        self.welch.update(phase, valid)
+        self.noise_id.update(phase)
+        self.count += len(phase)
+
+    def results(self) -> Dict[str, Any]:
+        """Spectra as lists, ready for JSON"""
+
+        welch = self.welch.results()
+        frequencies = welch['frequencies']
+        phase_psd = welch['psd']
+        with np.errstate(divide='ignore'):
+            phase_noise = 10 * np.log10((2 * np.pi * self.carrier_frequency) ** 2 * phase_psd / 2)
+
+        return {
+            'samples': self.count,
+            'interval': self.interval,
+            'segments': welch['segments'],
+            'skipped_segments': welch['skipped_segments'],
+            'resolution': welch.get('resolution'),
+            'carrier_frequency': self.carrier_frequency,
+            'frequencies': frequencies.tolist(),
+            'phase_psd': phase_psd.tolist(),
+            'frequency_psd': ((2 * np.pi * frequencies) ** 2 * phase_psd).tolist(),
+            'phase_noise_dbc': phase_noise.tolist(),
+            'noise_types': self.noise_id.results()
+        }
+
+
+def phase_spectrum(phase_ns: np.ndarray, interval: float = 1.0, valid: Optional[np.ndarray] = None,
+                   chunk_size: int = 1 << 20, **kwargs) -> Dict[str, Any]:
+    """PhaseSpectrum results of a whole phase array, processed chunk by chunk"""
+
+    spectrum = PhaseSpectrum(interval, **kwargs)
+    phase_ns = np.asarray(phase_ns, dtype=float)
+    for start in range(0, len(phase_ns), chunk_size):
+        stop = start + chunk_size
+        spectrum.update(phase_ns[start:stop], None if valid is None else valid[start:stop])
+    return spectrum.results()
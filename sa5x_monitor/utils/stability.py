@@ -0,0 +1,657 @@
+"""
+Time-domain stability analysis for SA5X phase data
+MTIE (sparse-table range queries, monotonic deques), TDEV, overlapping ADEV and its confidence intervals
+"""
+
+import math
+from collections import deque
+from statistics import NormalDist
+from typing import Dict, List, Any, Optional, Sequence, Callable, Union
+
+import numpy as np
+
+try:
+    from scipy.stats import chi2
+except ImportError:  # optional: Wilson-Hilferty approximation is used instead
+    chi2 = None
+
+from .spectral_analysis import NOISE_TYPES
+
+
+# Number of window start positions evaluated per block when a limit is given,
+# so that a violation stops the scan early instead of finishing the whole tau
+MTIE_BLOCK_SIZE = 65536
+
+# Scale factors from log frequency error units to fractional frequency
+FREQUENCY_UNIT_SCALE = {
+    'ratio': 1.0,
+    'ppm': 1e-6,
+    'ppb': 1e-9
+}
+
+
+def frequency_to_phase(freq_errors: np.ndarray, tau0: float = 1.0) -> np.ndarray:
+    """Integrate fractional frequency samples into a phase series (x[0] = 0)"""
+    freq_errors = np.asarray(freq_errors, dtype=float)
+    phase = np.empty(len(freq_errors) + 1)
+    phase[0] = 0.0
+    np.cumsum(freq_errors * tau0, out=phase[1:])
+    return phase
+
+
+def measurements_to_phase(elapsed_times: np.ndarray, freq_errors: np.ndarray,
+                          units: str = 'ppm') -> Dict[str, Any]:
+    """Integrate a logged frequency error series into phase in nanoseconds
+
+    Each sample is held over the interval to the next one, so irregular
+    spacing is honoured. Returns the phase series and its nominal tau0.
+    """
+    elapsed_times = np.asarray(elapsed_times, dtype=float)
+    freq_errors = np.asarray(freq_errors, dtype=float)
+    if units not in FREQUENCY_UNIT_SCALE:
+        raise ValueError(f"Unknown frequency units: {units}")
+
+    intervals = np.diff(elapsed_times)
+    phase = np.empty(len(freq_errors))
+    phase[0] = 0.0
+    np.cumsum(freq_errors[:-1] * intervals * FREQUENCY_UNIT_SCALE[units] * 1e9, out=phase[1:])
+
+    tau0 = float(np.median(intervals)) if len(intervals) else 1.0
+    return {'phase': phase, 'tau0': tau0 if tau0 > 0 else 1.0}
+
+
+def default_taus(n_samples: int, tau0: float, max_fraction: float = 1.0) -> np.ndarray:
+    """1-2-5 sequence of taus covered by a record of n_samples"""
+    max_tau = tau0 * (n_samples - 1) * max_fraction
+    taus = []
+    decade = tau0
+    while decade <= max_tau:
+        for step in (1, 2, 5):
+            tau = decade * step
+            if tau <= max_tau:
+                taus.append(tau)
+        decade *= 10
+    return np.array(taus)
+
+
+def tau_to_window(taus: Sequence[float], tau0: float, n_samples: int) -> np.ndarray:
+    """Convert tau values to window lengths in samples (0 where tau is not usable)"""
+    windows = np.rint(np.asarray(taus, dtype=float) / tau0).astype(np.int64)
+    windows[(windows < 1) | (windows >= n_samples)] = 0
+    return windows
+
+
+class RangeTable:
+    """Sparse table answering min/max over any index range in O(1)"""
+
+    def __init__(self, values: np.ndarray, max_length: Optional[int] = None):
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        if max_length is None or max_length > n:
+            max_length = n
+        levels = max(1, int(max_length).bit_length())
+
+        self.size = n
+        self.maxima = [values]
+        self.minima = [values]
+        for level in range(1, levels):
+            half = 1 << (level - 1)
+            prev_max = self.maxima[-1]
+            prev_min = self.minima[-1]
+            if len(prev_max) <= half:
+                break
+            self.maxima.append(np.maximum(prev_max[:-half], prev_max[half:]))
+            self.minima.append(np.minimum(prev_min[:-half], prev_min[half:]))
+
+    def window_ranges(self, length: int, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Peak-to-peak value of every window of `length` samples starting in [start, stop)"""
+        last_start = self.size - length + 1
+        if stop is None or stop > last_start:
+            stop = last_start
+        level = length.bit_length() - 1
+        offset = length - (1 << level)
+        maxima = self.maxima[level]
+        minima = self.minima[level]
+        upper = np.maximum(maxima[start:stop], maxima[start + offset:stop + offset])
+        lower = np.minimum(minima[start:stop], minima[start + offset:stop + offset])
+        return upper - lower
+
+
+def calculate_mtie(phase: np.ndarray, taus: Sequence[float], tau0: float = 1.0,
+                   limits: Optional[Union[Sequence[float], Callable[[np.ndarray], np.ndarray]]] = None,
+                   stop_on_violation: bool = False) -> Dict[str, Any]:
+    """Calculate MTIE for every requested tau in O(N log N) total
+
+    `limits` is either a sequence of mask values (one per tau) or a callable
+    mapping taus to mask values. With `stop_on_violation` the computation ends
+    at the first window exceeding the mask; remaining taus are left as NaN.
+    """
+
+    phase = np.asarray(phase, dtype=float)
+    taus = np.asarray(taus, dtype=float)
+    order = np.argsort(taus)
+    windows = tau_to_window(taus, tau0, len(phase))
+
+    mask_values = None
+    if limits is not None:
+        mask_values = np.asarray(limits(taus) if callable(limits) else limits, dtype=float)
+
+    mtie = np.full(len(taus), np.nan)
+    violation = None
+
+    if windows.any():
+        table = RangeTable(phase, int(windows.max()) + 1)
+
+        for idx in order:
+            n = int(windows[idx])
+            if n == 0:
+                continue
+
+            length = n + 1
+            limit = mask_values[idx] if mask_values is not None else None
+            if limit is None or not stop_on_violation:
+                mtie[idx] = table.window_ranges(length).max()
+            else:
+                # Scan in blocks so a violation stops the work early
+                worst = 0.0
+                last_start = len(phase) - length + 1
+                for start in range(0, last_start, MTIE_BLOCK_SIZE):
+                    ranges = table.window_ranges(length, start, start + MTIE_BLOCK_SIZE)
+                    worst = max(worst, float(ranges.max()))
+                    if worst > limit:
+                        break
+                mtie[idx] = worst
+
+            if limit is not None and mtie[idx] > limit and violation is None:
+                violation = {
+                    'tau': float(taus[idx]),
+                    'mtie': float(mtie[idx]),
+                    'limit': float(limit)
+                }
+                if stop_on_violation:
+                    break
+
+    return {
+        'taus': taus,
+        'mtie': mtie,
+        'violation': violation,
+        'passed': violation is None if mask_values is not None else None
+    }
+
+
+def calculate_tdev(phase: np.ndarray, taus: Sequence[float], tau0: float = 1.0) -> Dict[str, Any]:
+    """Calculate time deviation (TDEV) for every requested tau
+
+    Uses a cumulative sum of the phase so each tau is a single O(N)
+    vectorized expression instead of nested window sums.
+    """
+
+    phase = np.asarray(phase, dtype=float)
+    taus = np.asarray(taus, dtype=float)
+    n_samples = len(phase)
+    windows = tau_to_window(taus, tau0, n_samples)
+
+    # Centre the data to keep the cumulative sum well conditioned
+    cumulative = np.concatenate(([0.0], np.cumsum(phase - phase.mean()))) if n_samples else np.zeros(1)
+
+    tdev = np.full(len(taus), np.nan)
+    for idx, n in enumerate(windows):
+        n = int(n)
+        count = n_samples - 3 * n + 1
+        if n == 0 or count < 1:
+            continue
+        j = np.arange(count)
+        inner = (cumulative[j + 3 * n] - 3 * cumulative[j + 2 * n]
+                 + 3 * cumulative[j + n] - cumulative[j])
+        tdev[idx] = np.sqrt(np.mean(inner ** 2) / (6 * n * n))
+
+    return {'taus': taus, 'tdev': tdev}
+
+
+def _second_differences(phase: np.ndarray, m: int) -> np.ndarray:
+    """x[i + 2m] - 2 x[i + m] + x[i] for every valid i"""
+    return phase[2 * m:] - 2 * phase[m:-m] + phase[:-2 * m]
+
+
+def calculate_adev(phase: np.ndarray, taus: Sequence[float], tau0: float = 1.0) -> Dict[str, Any]:
+    """Calculate overlapping Allan deviation from phase data for every requested tau"""
+
+    phase = np.asarray(phase, dtype=float)
+    taus = np.asarray(taus, dtype=float)
+    windows = tau_to_window(taus, tau0, len(phase))
+
+    adev = np.full(len(taus), np.nan)
+    for idx, m in enumerate(windows):
+        m = int(m)
+        if m == 0 or len(phase) <= 2 * m:
+            continue
+        diffs = _second_differences(phase, m)
+        adev[idx] = np.sqrt(np.mean(diffs ** 2) / (2 * m * m * tau0 * tau0))
+
+    return {'taus': taus, 'adev': adev}
+
+
+def calculate_dynamic_adev(freq: np.ndarray, tau0: float, window: int, step: int,
+                           taus: Optional[Sequence[float]] = None,
+                           valid: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Overlapping Allan deviation in windows of `window` samples every `step` samples
+
+    freq is a uniformly sampled frequency series; samples marked invalid
+    exclude every second difference that spans them. Per tau, the masked
+    squared second differences are prefix-summed once, so each window
+    costs O(1) per tau. Default taus are octaves up to a quarter of the
+    window. Returns the taus, window centre times (s from the first
+    sample) and a taus x windows ADEV matrix, NaN where a window has no
+    valid difference.
+    """
+
+    freq = np.asarray(freq, dtype=float)
+    valid = np.isfinite(freq) if valid is None else np.asarray(valid, dtype=bool) & np.isfinite(freq)
+    n = len(freq)
+    if window < 4 or step < 1:
+        raise ValueError("Window must be at least 4 samples and step at least 1")
+    if n < window:
+        raise ValueError("Record is shorter than the window")
+
+    if taus is None:
+        taus = tau0 * 2.0 ** np.arange(max(1, (window // 4).bit_length()))
+    taus = np.asarray(taus, dtype=float)
+    windows = tau_to_window(taus, tau0, window)
+
+    # Integrate the offset-free frequency so second differences keep their precision
+    centered = np.where(valid, freq - (freq[valid].mean() if valid.any() else 0.0), 0.0)
+    phase = np.concatenate(([0.0], np.cumsum(centered * tau0)))
+    invalid = np.concatenate(([0], np.cumsum(~valid)))
+
+    starts = np.arange(0, n - window + 1, step)
+    adev = np.full((len(taus), len(starts)), np.nan)
+    for idx, m in enumerate(windows):
+        m = int(m)
+        if m == 0 or window < 2 * m:
+            continue
+        diffs = _second_differences(phase, m)
+        usable = invalid[2 * m:] == invalid[:-2 * m]
+        squares = np.concatenate(([0.0], np.cumsum(np.where(usable, diffs * diffs, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(usable)))
+
+        # Differences i = s .. s + window - 2m lie inside the window starting at s
+        stops = starts + window - 2 * m + 1
+        pairs = counts[stops] - counts[starts]
+        total = squares[stops] - squares[starts]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            adev[idx] = np.sqrt(np.maximum(total, 0.0) / (2 * m * m * tau0 * tau0 * pairs))
+
+    return {'taus': taus, 'times': (starts + window / 2) * tau0, 'adev': adev,
+            'window': window * tau0, 'step': step * tau0}
+
+
+def adev_edf(alpha: Union[int, np.ndarray], n_phase: Union[int, np.ndarray],
+             m: Union[int, np.ndarray]) -> np.ndarray:
+    """Equivalent degrees of freedom of overlapping ADEV at averaging factor m
+
+    Uses the simple per-noise-type approximations (Riley, Handbook of
+    Frequency Stability Analysis) for a record of n_phase phase points and
+    power-law noise alpha (2 = White PM ... -2 = Random Walk FM). All
+    arguments broadcast; results are at least 1.
+    """
+
+    alpha = np.asarray(alpha)
+    n = np.asarray(n_phase, dtype=float)
+    m = np.asarray(m, dtype=float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        white_pm = (n + 1) * (n - 2 * m) / (2 * (n - m))
+        flicker_pm = np.exp(np.sqrt(np.maximum(np.log((n - 1) / (2 * m)), 0.0)
+                                    * np.log((2 * m + 1) * (n - 1) / 4)))
+        white_fm = (3 * (n - 1) / (2 * m) - 2 * (n - 2) / n) * 4 * m * m / (4 * m * m + 5)
+        flicker_fm = np.where(m == 1, 2 * (n - 2) ** 2 / (2.3 * n - 4.9), 5 * n * n / (4 * m * (n + 3 * m)))
+        random_walk_fm = (n - 2) / m * ((n - 1) ** 2 - 3 * m * (n - 1) + 4 * m * m) / (n - 3) ** 2
+
+    edf = np.select([alpha >= 2, alpha == 1, alpha == 0, alpha == -1],
+                    [white_pm, flicker_pm, white_fm, flicker_fm], random_walk_fm)
+    return np.maximum(np.nan_to_num(edf, nan=1.0), 1.0)
+
+
+def chi2_quantile(probability: float, dof: np.ndarray) -> np.ndarray:
+    """Chi-squared quantile, with the Wilson-Hilferty approximation when scipy is missing"""
+
+    dof = np.asarray(dof, dtype=float)
+    if chi2 is not None:
+        return chi2.ppf(probability, dof)
+
+    z = NormalDist().inv_cdf(probability)
+    scale = 2.0 / (9.0 * dof)
+    return dof * np.maximum(1.0 - scale + z * np.sqrt(scale), 1e-3) ** 3
+
+
+def adev_confidence(adev: np.ndarray, edf: np.ndarray, confidence: float = 0.683) -> Dict[str, np.ndarray]:
+    """Chi-squared confidence bounds of Allan deviations with the given EDF"""
+
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence must be in (0, 1)")
+
+    adev = np.asarray(adev, dtype=float)
+    edf = np.asarray(edf, dtype=float)
+    tail = (1 - confidence) / 2
+    return {
+        'lower': adev * np.sqrt(edf / chi2_quantile(1 - tail, edf)),
+        'upper': adev * np.sqrt(edf / chi2_quantile(tail, edf))
+    }
+
+
+def noise_alpha_from_slope(taus: np.ndarray, adev: np.ndarray) -> np.ndarray:
+    """Power-law noise alpha per tau from the local slope mu of the Allan variance
+
+    sigma^2 ~ tau^mu gives alpha = -mu - 1, which cannot separate White
+    from Flicker PM (both read as alpha = 1). A single point reads as
+    White FM.
+    """
+
+    taus = np.asarray(taus, dtype=float)
+    adev = np.asarray(adev, dtype=float)
+    if len(taus) < 2:
+        return np.zeros(len(taus), dtype=int)
+
+    mu = np.gradient(2 * np.log(adev), np.log(taus))
+    return np.clip(np.round(-mu - 1), -2, 1).astype(int)
+
+
+class StreamingAllanDeviation:
+    """Overlapping Allan deviation updated per sample
+
+    Keeps a sum of squared second differences per octave tau and a ring
+    buffer of the last 2 * m_max phase points, so each new sample costs
+    O(number of taus) and the current ADEV never rescans history.
+    Frequency-type inputs (fractional frequency, temperature) are
+    integrated into phase on the fly; NaN frequency samples are invalid
+    and exclude every second difference spanning them, as in
+    calculate_dynamic_adev. With columns set, each sample is a row of
+    that many independent series accumulated together.
+    """
+
+    def __init__(self, tau0: float = 1.0, max_octaves: int = 12, input_type: str = 'frequency',
+                 columns: Optional[int] = None):
+        if input_type not in ('frequency', 'phase'):
+            raise ValueError(f"Unknown input type: {input_type}")
+
+        self.tau0 = tau0
+        self.input_type = input_type
+        self.columns = columns
+        self._shape = () if columns is None else (columns,)
+        self.m_values = np.array([1 << k for k in range(max_octaves)], dtype=np.int64)
+        self.sums = np.zeros((max_octaves,) + self._shape)
+        self.counts = np.zeros((max_octaves,) + self._shape, dtype=np.int64)
+
+        # Phase points and running invalid-sample counts at each of them
+        self._history_size = 2 * int(self.m_values[-1]) + 1
+        self._history = np.zeros((self._history_size,) + self._shape)
+        self._invalid_history = np.zeros((self._history_size,) + self._shape, dtype=np.int64)
+        self._phase_count = 0
+        self._phase = np.zeros(self._shape)
+        self._invalid = np.zeros(self._shape, dtype=np.int64)
+        self._has_gaps = False
+
+        if input_type == 'frequency':
+            self._push_phase(self._phase, self._invalid)
+
+    @property
+    def taus(self) -> np.ndarray:
+        """Tau values in seconds"""
+        return self.m_values * self.tau0
+
+    def _push_phase(self, phase: np.ndarray, invalid: np.ndarray):
+        """Append one phase point and accumulate its second differences"""
+        n = self._phase_count
+        self._history[n % self._history_size] = phase
+        self._invalid_history[n % self._history_size] = invalid
+        self._phase_count = n + 1
+
+        ready = self.m_values[2 * self.m_values <= n]
+        if ready.size:
+            k = ready.size
+            older = self._history[(n - ready) % self._history_size]
+            oldest = self._history[(n - 2 * ready) % self._history_size]
+            diffs = phase - 2 * older + oldest
+            if not self._has_gaps:
+                # No invalid sample seen yet: every difference counts
+                self.sums[:k] += diffs * diffs
+                self.counts[:k] += 1
+                return
+            usable = self._invalid_history[(n - 2 * ready) % self._history_size] == invalid
+            self.sums[:k] += np.where(usable, diffs * diffs, 0.0)
+            self.counts[:k] += usable
+
+    def update(self, value: Union[float, np.ndarray]):
+        """Add one sample (one row with columns set)"""
+        if self.input_type == 'frequency':
+            if self.columns is None and math.isfinite(value):
+                self._phase = self._phase + value * self.tau0
+            else:
+                valid = np.isfinite(value)
+                self._phase = self._phase + np.where(valid, value, 0.0) * self.tau0
+                self._invalid = self._invalid + ~valid
+                self._has_gaps = self._has_gaps or not valid.all()
+            self._push_phase(self._phase, self._invalid)
+        else:
+            self._push_phase(value, self._invalid)
+
+    def update_many(self, values: np.ndarray):
+        """Add a block of samples (rows with columns set) with vectorized accumulation"""
+
+        values = np.asarray(values, dtype=float).reshape((-1,) + self._shape)
+        if not len(values):
+            return
+
+        valid = np.isfinite(values)
+        if self.input_type == 'frequency' and not valid.all():
+            new_phase = self._phase + np.cumsum(np.where(valid, values, 0.0) * self.tau0, axis=0)
+            new_invalid = self._invalid + np.cumsum(~valid, axis=0)
+            self._invalid = new_invalid[-1]
+            self._has_gaps = True
+        else:
+            new_phase = self._phase + np.cumsum(values * self.tau0, axis=0) if self.input_type == 'frequency' else values
+            new_invalid = np.broadcast_to(self._invalid, values.shape)
+        if self.input_type == 'frequency':
+            self._phase = new_phase[-1]
+
+        # Stitch the retained history in front of the new block
+        n = self._phase_count
+        keep = min(n, self._history_size - 1)
+        positions = np.arange(n - keep, n) % self._history_size
+        phase = np.concatenate((self._history[positions], new_phase))
+        invalid = np.concatenate((self._invalid_history[positions], new_invalid))
+        start = n - keep
+
+        for k, m in enumerate(self.m_values):
+            m = int(m)
+            # Only second differences ending at a new point are added
+            first_end = max(2 * m, n)
+            if start + len(phase) - 1 < first_end:
+                break
+            offset = first_end - 2 * m - start
+            diffs = _second_differences(phase[offset:], m)
+            if np.array_equal(invalid[offset], invalid[-1]):
+                # No invalid sample in this stretch: every difference counts
+                self.sums[k] += np.einsum('i...,i...->...', diffs, diffs)
+                self.counts[k] += len(diffs)
+                continue
+            usable = invalid[offset + 2 * m:] == invalid[offset:len(invalid) - 2 * m]
+            self.sums[k] += np.where(usable, diffs * diffs, 0.0).sum(axis=0)
+            self.counts[k] += np.count_nonzero(usable, axis=0)
+
+        total = n + len(new_phase)
+        tail = min(len(phase), self._history_size)
+        tail_positions = np.arange(total - tail, total) % self._history_size
+        self._history[tail_positions] = phase[-tail:]
+        self._invalid_history[tail_positions] = invalid[-tail:]
+        self._phase_count = total
+
+    def deviations(self) -> np.ndarray:
+        """Current ADEV per tau, and per column with columns set (NaN where no second difference is available yet)"""
+        m = self.m_values.reshape((-1,) + (1,) * len(self._shape)).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            adev = np.sqrt(self.sums / (2.0 * m * m * self.tau0 ** 2 * self.counts))
+        adev[self.counts == 0] = np.nan
+        return adev
+
+    def results(self, confidence: float = 0.683) -> List[Dict[str, Any]]:
+        """Current ADEV points of a single series in the web API format
+
+        Each point carries its EDF and chi-squared bounds at the given
+        confidence, with the noise type read from the ADEV slope.
+        """
+
+        if self.columns is not None:
+            raise ValueError("results() needs a single series; use deviations() with columns")
+
+        adev = self.deviations()
+        ready = ~np.isnan(adev) & (adev > 0)
+        m = self.m_values[ready]
+        alphas = noise_alpha_from_slope(self.taus[ready], adev[ready])
+        edf = adev_edf(alphas, self.counts[ready] + 2 * m, m)
+        bounds = adev_confidence(adev[ready], edf, confidence)
+
+        return [
+            {'tau': float(tau), 'allan_deviation': float(dev), 'edf': float(dof),
+             'lower': float(lower), 'upper': float(upper), 'noise_type': NOISE_TYPES[int(alpha)]}
+            for tau, dev, dof, lower, upper, alpha
+            in zip(self.taus[ready], adev[ready], edf, bounds['lower'], bounds['upper'], alphas)
+        ]
+
+    @property
+    def sample_count(self) -> int:
+        """Number of samples added so far"""
+        return self._phase_count - (1 if self.input_type == 'frequency' else 0)
+
+    def reset(self):
+        """Discard all accumulated state"""
+        self.__init__(self.tau0, len(self.m_values), self.input_type, self.columns)
+
+
+class MTIETracker:
+    """Incremental MTIE over a live phase stream
+
+    Keeps one pair of monotonic deques per window size, so each new sample
+    costs O(number of taus) amortized and no history is rescanned.
+    """
+
+    def __init__(self, taus: Sequence[float], tau0: float = 1.0):
+        self.taus = np.asarray(taus, dtype=float)
+        self.tau0 = tau0
+        self.windows = [max(1, int(round(tau / tau0))) for tau in self.taus]
+        self.count = 0
+        self.mtie = np.zeros(len(self.taus))
+        self._max_deques = [deque() for _ in self.windows]
+        self._min_deques = [deque() for _ in self.windows]
+
+    def update(self, value: float) -> np.ndarray:
+        """Add one phase sample and return the current MTIE per tau"""
+
+        index = self.count
+        self.count += 1
+
+        for i, n in enumerate(self.windows):
+            max_dq = self._max_deques[i]
+            min_dq = self._min_deques[i]
+
+            while max_dq and max_dq[-1][1] <= value:
+                max_dq.pop()
+            max_dq.append((index, value))
+            while min_dq and min_dq[-1][1] >= value:
+                min_dq.pop()
+            min_dq.append((index, value))
+
+            # Window covers n intervals, i.e. n + 1 samples
+            oldest = index - n
+            if max_dq[0][0] < oldest:
+                max_dq.popleft()
+            if min_dq[0][0] < oldest:
+                min_dq.popleft()
+
+            if index >= n:
+                spread = max_dq[0][1] - min_dq[0][1]
+                if spread > self.mtie[i]:
+                    self.mtie[i] = spread
+
+        return self.mtie
+
+    def complete(self) -> np.ndarray:
+        """Flags for taus whose window has been filled at least once"""
+        return np.array([self.count > n for n in self.windows])
+
+    def results(self) -> Dict[str, Any]:
+        """Current MTIE curve, NaN for taus not yet covered"""
+        return {
+            'taus': self.taus,
+            'mtie': np.where(self.complete(), self.mtie, np.nan),
+            'sample_count': self.count
+        }
+
+
+class WanderAccumulator:
+    """MTIE and TDEV of a phase record fed in chunks
+
+    Retains the last 3 * n_max phase points between chunks, so memory is
+    bounded by the chunk size plus the longest window, and each chunk only
+    evaluates the MTIE windows and TDEV terms that end inside it. Results
+    match calculate_mtie/calculate_tdev on the concatenated record.
+    """
+
+    def __init__(self, taus: Sequence[float], tau0: float = 1.0):
+        self.taus = np.asarray(taus, dtype=float)
+        self.tau0 = tau0
+        self.windows = np.maximum(np.rint(self.taus / tau0).astype(np.int64), 1)
+        self.count = 0
+        self.mtie = np.zeros(len(self.taus))
+        self.tdev_sums = np.zeros(len(self.taus))
+        self.tdev_counts = np.zeros(len(self.taus), dtype=np.int64)
+
+        self._history_size = 3 * int(self.windows.max()) if len(self.windows) else 0
+        self._history = np.empty(0)
+
+    def update_many(self, phase: np.ndarray):
+        """Add a block of phase samples"""
+
+        phase = np.asarray(phase, dtype=float)
+        if phase.size == 0:
+            return
+
+        old = len(self._history)
+        record = np.concatenate((self._history, phase))
+        total = len(record)
+        table = RangeTable(record, int(self.windows.max()) + 1) if len(self.windows) else None
+
+        # Centre on the retained origin to keep the cumulative sum well conditioned
+        cumulative = np.concatenate(([0.0], np.cumsum(record - record[0])))
+
+        for idx, n in enumerate(self.windows):
+            n = int(n)
+
+            # MTIE windows of n + 1 samples ending at a new point
+            start = max(0, old - n)
+            if total > n and start <= total - n - 1:
+                self.mtie[idx] = max(self.mtie[idx], float(table.window_ranges(n + 1, start).max()))
+
+            # TDEV terms spanning 3n samples ending at a new point
+            first = max(0, old - 3 * n + 1)
+            if total - 3 * n + 1 > first:
+                j = np.arange(first, total - 3 * n + 1)
+                inner = (cumulative[j + 3 * n] - 3 * cumulative[j + 2 * n]
+                         + 3 * cumulative[j + n] - cumulative[j])
+                self.tdev_sums[idx] += np.dot(inner, inner)
+                self.tdev_counts[idx] += len(j)
+
+        self.count += len(phase)
+        self._history = record[-self._history_size:] if self._history_size else np.empty(0)
+
+    def results(self) -> Dict[str, Any]:
+        """MTIE and TDEV per tau, NaN where the record is too short"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            tdev = np.sqrt(self.tdev_sums / (6.0 * self.windows ** 2 * self.tdev_counts))
+        tdev[self.tdev_counts == 0] = np.nan
+        return {
+            'taus': self.taus,
+            'mtie': np.where(self.count > self.windows, self.mtie, np.nan),
+            'tdev': tdev,
+            'sample_count': self.count
+        }
@@ -0,0 +1,329 @@
+"""
+Streaming statistics for SA5X monitoring data
+Welford running moments that can be merged across devices and time slices
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+
+
+class RunningStats:
+    """Running count, mean, variance (Welford), min/max, EWMA and optional window
+
+    Two RunningStats can be merged exactly (Chan et al. pairwise update),
+    so summaries of several devices or time slices are combined without
+    touching raw samples. EWMA and windowed values describe the most recent
+    data and are taken from the later operand on merge.
+    """
+
+    def __init__(self, ewma_alpha: float = 0.1, window_size: Optional[int] = None):
+        self.ewma_alpha = ewma_alpha
+        self.window_size = window_size
+
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last = None
+        self.ewma = None
+
+        self._window = deque() if window_size else None
+        self._window_mean = 0.0
+        self._window_m2 = 0.0
+
+    def update(self, value: float):
+        """Add one sample"""
+
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.last = value
+        self.ewma = value if self.ewma is None else self.ewma + self.ewma_alpha * (value - self.ewma)
+
+        if self._window is not None:
+            self._window_add(value)
+
+    def update_many(self, values: Iterable[float]):
+        """Add a block of samples with vectorized moment computation"""
+
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+
+        block = RunningStats(self.ewma_alpha)
+        block.count = int(values.size)
+        block.mean = float(values.mean())
+        block.m2 = float(np.sum((values - block.mean) ** 2))
+        block.min = float(values.min())
+        block.max = float(values.max())
+        block.last = float(values[-1])
+
+        # EWMA over the block, seeded with the current value
+        ewma = self.ewma if self.ewma is not None else float(values[0])
+        weights = (1 - self.ewma_alpha) ** np.arange(values.size - 1, -1, -1)
+        block.ewma = float((1 - self.ewma_alpha) ** values.size * ewma
+                           + self.ewma_alpha * np.dot(weights, values))
+
+        window = self._window
+        self._merge_moments(block)
+        self.last = block.last
+        self.ewma = block.ewma
+
+        if window is not None:
+            for value in values[-self.window_size:]:
+                self._window_add(float(value))
+
+    def _window_add(self, value: float):
+        """Add a sample to the sliding window, evicting the oldest if full"""
+
+        window = self._window
+        if len(window) == self.window_size:
+            old = window.popleft()
+            n = len(window)
+            if n == 0:
+                self._window_mean = 0.0
+                self._window_m2 = 0.0
+            else:
+                old_mean = self._window_mean
+                self._window_mean = (old_mean * (n + 1) - old) / n
+                self._window_m2 -= (old - old_mean) * (old - self._window_mean)
+
+        window.append(value)
+        n = len(window)
+        delta = value - self._window_mean
+        self._window_mean += delta / n
+        self._window_m2 += delta * (value - self._window_mean)
+
+    def _merge_moments(self, other: 'RunningStats'):
+        """Combine count/mean/M2/min/max with another set of moments"""
+
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """Return a new RunningStats combining self with a later or parallel slice"""
+
+        merged = RunningStats(self.ewma_alpha, other.window_size)
+        merged._merge_moments(self)
+        merged._merge_moments(other)
+
+        recent = other if other.count else self
+        merged.last = recent.last
+        merged.ewma = recent.ewma
+        if recent._window is not None:
+            merged.window_size = recent.window_size
+            merged._window = deque(recent._window)
+            merged._window_mean = recent._window_mean
+            merged._window_m2 = recent._window_m2
+        return merged
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 for fewer than two samples)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        """Sample standard deviation"""
+        return math.sqrt(max(self.variance, 0.0))
+
+    @property
+    def population_std_dev(self) -> float:
+        """Population standard deviation, as np.std"""
+        return math.sqrt(max(self.m2 / self.count, 0.0)) if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary for APIs; also carries raw moments so it can be merged later"""
+
+        summary = {
+            'current': self.last,
+            'count': self.count,
+            'mean': self.mean if self.count else None,
+            'std_dev': self.std_dev,
+            'variance': self.variance,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'ewma': self.ewma,
+            'm2': self.m2
+        }
+        if self._window is not None:
+            n = len(self._window)
+            summary['window'] = {
+                'size': n,
+                'mean': self._window_mean if n else None,
+                'std_dev': math.sqrt(max(self._window_m2 / (n - 1), 0.0)) if n > 1 else 0.0,
+                'min': min(self._window) if n else None,
+                'max': max(self._window) if n else None
+            }
+        return summary
+
+    @classmethod
+    def from_dict(cls, summary: Dict[str, Any], ewma_alpha: float = 0.1) -> 'RunningStats':
+        """Rebuild mergeable moments from a to_dict() summary"""
+
+        stats = cls(ewma_alpha)
+        stats.count = int(summary.get('count', 0))
+        if stats.count:
+            stats.mean = float(summary['mean'])
+            stats.m2 = float(summary['m2'])
+            stats.min = float(summary['min'])
+            stats.max = float(summary['max'])
+        stats.last = summary.get('current')
+        stats.ewma = summary.get('ewma')
+        return stats
+
+
+class LinearFit:
+    """Mergeable least-squares line through (x, y) pairs
+
+    Keeps count, means and centred co-moments, so slopes over several chunks
+    combine exactly without the cancellation of raw power sums.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+
+    def update_many(self, x: Iterable[float], y: Iterable[float]):
+        """Add a block of points"""
+
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if x.size == 0:
+            return
+
+        block = LinearFit()
+        block.count = int(x.size)
+        block.mean_x = float(x.mean())
+        block.mean_y = float(y.mean())
+        dx = x - block.mean_x
+        block.sxx = float(np.dot(dx, dx))
+        block.sxy = float(np.dot(dx, y - block.mean_y))
+        self._merge(block)
+
+    def _merge(self, other: 'LinearFit'):
+        """Combine co-moments with another fit"""
+
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean_x, self.mean_y = other.count, other.mean_x, other.mean_y
+            self.sxx, self.sxy = other.sxx, other.sxy
+            return
+
+        total = self.count + other.count
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.count * other.count / total
+        self.sxx += other.sxx + dx * dx * weight
+        self.sxy += other.sxy + dx * dy * weight
+        self.mean_x += dx * other.count / total
+        self.mean_y += dy * other.count / total
+        self.count = total
+
+    def merge(self, other: 'LinearFit') -> 'LinearFit':
+        """Return a new LinearFit over both sets of points"""
+        merged = LinearFit()
+        merged._merge(self)
+        merged._merge(other)
+        return merged
+
+    @property
+    def slope(self) -> float:
+        """Least-squares slope (0 when x has no spread)"""
+        return self.sxy / self.sxx if self.sxx > 0 else 0.0
+
+    @property
+    def intercept(self) -> float:
+        """Least-squares intercept"""
+        return self.mean_y - self.slope * self.mean_x
+
+
+def combine_stats(stats: Iterable[RunningStats]) -> RunningStats:
+    """Merge any number of RunningStats, e.g. for a fleet summary"""
+
+    result = RunningStats()
+    for item in stats:
+        result = result.merge(item)
+    return result
+
+
+class MonitoringStatistics:
+    """Per-field running statistics for the monitoring pipeline"""
+
+    FIELDS = ['frequency_error', 'temperature', 'voltage', 'current']
+
+    def __init__(self, ewma_alpha: float = 0.1, window_size: Optional[int] = None,
+                 fields: Optional[List[str]] = None):
+        self.ewma_alpha = ewma_alpha
+        self.window_size = window_size
+        self.fields = {name: RunningStats(ewma_alpha, window_size) for name in (fields or self.FIELDS)}
+        self.status_counts = {}
+        self.last_sample = {}
+
+    def update(self, data: Dict[str, Any]):
+        """Add one monitoring sample"""
+
+        for name, stats in self.fields.items():
+            value = data.get(name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                stats.update(value)
+
+        status = data.get('status')
+        if status is not None:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.last_sample = data
+
+    @property
+    def sample_count(self) -> int:
+        """Number of samples seen"""
+        return sum(self.status_counts.values()) or max((s.count for s in self.fields.values()), default=0)
+
+    def merge(self, other: 'MonitoringStatistics') -> 'MonitoringStatistics':
+        """Combine with statistics from another device or time slice"""
+
+        merged = MonitoringStatistics(self.ewma_alpha, self.window_size, [])
+        for name in set(self.fields) | set(other.fields):
+            mine = self.fields.get(name, RunningStats(self.ewma_alpha))
+            theirs = other.fields.get(name, RunningStats(self.ewma_alpha))
+            merged.fields[name] = mine.merge(theirs)
+
+        for counts in (self.status_counts, other.status_counts):
+            for status, count in counts.items():
+                merged.status_counts[status] = merged.status_counts.get(status, 0) + count
+        merged.last_sample = other.last_sample or self.last_sample
+        return merged
+
+    def summary(self) -> Dict[str, Any]:
+        """Statistics per field in the /api/statistics format"""
+
+        result = {name: stats.to_dict() for name, stats in self.fields.items()}
+        result['status_distribution'] = dict(self.status_counts)
+        result['sample_count'] = self.sample_count
+        return result
@@ -0,0 +1,183 @@
+"""
+Temperature sensitivity of the frequency error
+Lagged regression on temperature with an FFT cross-correlation lag search, fed in uniform-grid chunks
+"""
+
+import logging
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+
+# Upper bound on the lag search, in grid samples
+MAX_LAG_SAMPLES = 100000
+
+# Fewest overlapping sample pairs for a lag to be considered
+MIN_PAIRS = 10
+
+# Temperature variance (°C^2) below which the temperature counts as constant
+MIN_TEMPERATURE_VARIANCE = 1e-8
+
+
+class ThermalSensitivity:
+    """Regression of frequency on lagged temperature over a range of lags
+
+    For every lag k = 0..max_lag grid samples the model is
+    f(t) = a + b*t + s*T(t - k), so linear aging and a slow temperature
+    trend do not masquerade as temperature sensitivity. Only the sums of
+    the normal equations are kept per lag; they are cross-correlations of
+    the masked series, accumulated with FFTs block by block with a
+    max_lag-sample tail carried between blocks. The best lag has the
+    largest partial correlation between frequency and temperature.
+    Negative lags (frequency leading temperature) are not searched.
+    """
+
+    # Minimum FFT block length; blocks are also at least 4 * max_lag
+    BLOCK_SAMPLES = 65536
+
+    # Frequency-side series (times the valid mask) and temperature-side
+    # series (times the lagged valid mask) whose cross-sums are accumulated
+    PAIRS = (('m', 'm'), ('t', 'm'), ('tt', 'm'), ('f', 'm'), ('tf', 'm'), ('ff', 'm'),
+             ('m', 'T'), ('m', 'TT'), ('t', 'T'), ('f', 'T'))
+
+    def __init__(self, max_lag: int):
+        if max_lag < 0:
+            raise ValueError("Maximum lag must not be negative")
+
+        self.logger = logging.getLogger(__name__)
+        self.max_lag = int(min(max_lag, MAX_LAG_SAMPLES))
+        self.count = 0
+        self.origin = None
+        self.frequency_reference = 0.0
+        self.temperature_reference = 0.0
+
+        self._sums = {pair: np.zeros(self.max_lag + 1) for pair in self.PAIRS}
+        self._tail = {name: np.zeros(self.max_lag) for name in ('m', 'T', 'TT')}
+
+    def update(self, times: np.ndarray, frequency: np.ndarray, temperature: np.ndarray, valid: np.ndarray):
+        """Add consecutive uniform-grid points (s); invalid points are skipped"""
+
+        times = np.asarray(times, dtype=float)
+        if not len(times):
+            return
+
+        valid = np.asarray(valid, dtype=bool) & np.isfinite(frequency) & np.isfinite(temperature)
+        if self.origin is None:
+            if not valid.any():
+                return
+            # Work relative to the first valid point so the sums stay well conditioned
+            first = int(np.argmax(valid))
+            self.origin = float(times[first])
+            self.frequency_reference = float(frequency[first])
+            self.temperature_reference = float(temperature[first])
+
+        block = max(self.BLOCK_SAMPLES, 4 * self.max_lag)
+        for start in range(0, len(times), block):
+            stop = start + block
+            self._update_block(times[start:stop], frequency[start:stop], temperature[start:stop], valid[start:stop])
+
+    def _update_block(self, times: np.ndarray, frequency: np.ndarray, temperature: np.ndarray, valid: np.ndarray):
+        mask = valid.astype(float)
+        t = np.where(valid, (times - self.origin) / 86400, 0.0)
+        f = np.where(valid, frequency - self.frequency_reference, 0.0)
+        temp = np.where(valid, temperature - self.temperature_reference, 0.0)
+
+        left = {'m': mask, 't': t, 'tt': t * t, 'f': f, 'tf': t * f, 'ff': f * f}
+        right = {'m': mask, 'T': temp, 'TT': temp * temp}
+        extended = {name: np.concatenate((self._tail[name], values)) for name, values in right.items()}
+
+        # sum_i a[i] * b[i + K - k] for k = 0..K, as a circular correlation
+        # that cannot wrap because the FFT length covers the extended series
+        size = len(times) + self.max_lag
+        nfft = 1 << (size - 1).bit_length()
+        left_fft = {name: np.conj(np.fft.rfft(values, nfft)) for name, values in left.items()}
+        right_fft = {name: np.fft.rfft(values, nfft) for name, values in extended.items()}
+        for a, b in self.PAIRS:
+            correlation = np.fft.irfft(left_fft[a] * right_fft[b], nfft)[:self.max_lag + 1]
+            self._sums[(a, b)] += correlation[::-1]
+
+        if self.max_lag:
+            self._tail = {name: values[-self.max_lag:] for name, values in extended.items()}
+        self.count += int(np.count_nonzero(valid))
+
+    def _fit(self) -> Dict[str, np.ndarray]:
+        """Per-lag coefficients, residual sums of squares and pair counts"""
+
+        s = self._sums
+        pairs = np.round(s[('m', 'm')])
+        normal = np.empty((self.max_lag + 1, 3, 3))
+        normal[:, 0] = np.stack([pairs, s[('t', 'm')], s[('m', 'T')]], axis=1)
+        normal[:, 1] = np.stack([s[('t', 'm')], s[('tt', 'm')], s[('t', 'T')]], axis=1)
+        normal[:, 2] = np.stack([s[('m', 'T')], s[('t', 'T')], s[('m', 'TT')]], axis=1)
+        cross = np.stack([s[('f', 'm')], s[('tf', 'm')], s[('f', 'T')]], axis=1)
+
+        # Lags without enough pairs or with constant temperature are left out
+        safe_pairs = np.maximum(pairs, 1.0)
+        temperature_spread = s[('m', 'TT')] - s[('m', 'T')] ** 2 / safe_pairs
+        usable = (pairs >= MIN_PAIRS) & (temperature_spread > MIN_TEMPERATURE_VARIANCE * safe_pairs)
+        normal[~usable] = np.eye(3)
+        coefficients = np.linalg.solve(normal, cross[..., None])[..., 0]
+        residual = np.maximum(s[('ff', 'm')] - np.einsum('ij,ij->i', coefficients, cross), 0.0)
+
+        # Time-only model for the partial correlation of the temperature term
+        trend_normal = normal[:, :2, :2]
+        trend = np.linalg.solve(trend_normal, cross[:, :2, None])[..., 0]
+        trend_residual = s[('ff', 'm')] - np.einsum('ij,ij->i', trend, cross[:, :2])
+        explained = np.where(usable & (trend_residual > 0),
+                             1 - residual / np.where(trend_residual > 0, trend_residual, 1.0), np.nan)
+        partial = np.sign(coefficients[:, 2]) * np.sqrt(np.clip(explained, 0.0, 1.0))
+
+        return {'coefficients': coefficients, 'residual': residual, 'pairs': pairs,
+                'normal': normal, 'partial': partial, 'usable': usable}
+
+    def results(self, interval: float, fractional_scale: float = 1.0) -> Dict[str, Any]:
+        """Sensitivity at the best lag; fractional_scale converts frequency units to fractional"""
+
+        fit = self._fit() if self.count else None
+        if fit is None or not fit['usable'].any():
+            return {'samples': self.count}
+
+        partial = fit['partial']
+        lag = int(np.nanargmax(np.abs(partial)))
+        pairs = fit['pairs'][lag]
+        variance = fit['residual'][lag] / max(pairs - 3, 1)
+        slope_variance = variance * np.linalg.inv(fit['normal'][lag])[2, 2]
+        slope = float(fit['coefficients'][lag, 2])
+
+        return {
+            'samples': self.count,
+            'max_lag': self.max_lag * interval,
+            'lag': lag * interval,
+            'sensitivity': slope,
+            'sensitivity_ppb_per_c': slope * fractional_scale * 1e9,
+            'sensitivity_std_ppb_per_c': float(np.sqrt(max(slope_variance, 0.0))) * fractional_scale * 1e9,
+            'reference_temperature': self.temperature_reference,
+            'correlation': float(partial[lag]),
+            'correlation_zero_lag': float(partial[0]) if fit['usable'][0] else None,
+            'residual_std': float(np.sqrt(variance))
+        }
+
+
+def compensate_temperature(frequency: np.ndarray, temperature: np.ndarray, valid: np.ndarray,
+                           thermal: Dict[str, Any], interval: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Frequency minus the lagged temperature term on a uniform grid; returns (residual, valid)
+
+    The first lag samples have no temperature to compensate with and are
+    marked invalid. Without a sensitivity in thermal the frequency is
+    returned unchanged.
+    """
+
+    frequency = np.asarray(frequency, dtype=float)
+    valid = np.asarray(valid, dtype=bool)
+    if thermal.get('sensitivity') is None:
+        return frequency.copy(), valid.copy()
+
+    lag = min(int(round(thermal['lag'] / interval)), len(frequency))
+    lagged = np.full(len(frequency), np.nan)
+    lagged[lag:] = np.asarray(temperature, dtype=float)[:len(frequency) - lag]
+    lagged_valid = np.zeros(len(frequency), dtype=bool)
+    lagged_valid[lag:] = valid[:len(frequency) - lag]
+
+    residual = frequency - thermal['sensitivity'] * (lagged - thermal['reference_temperature'])
+    return residual, valid & lagged_valid & np.isfinite(residual)
+
@@ -22,7 +22,12 @@ from werkzeug.utils import secure_filename
 from utils.sa5x_controller import SA5XController
 from utils.holdover_test import HoldoverTest
 from utils.log_parser import LogParser
+from utils.measurement_block import MeasurementBlock
 from utils.config_manager import ConfigManager
+from utils.compliance import ComplianceChecker
+from utils.stability import FREQUENCY_UNIT_SCALE, StreamingAllanDeviation
+from utils.streaming_stats import MonitoringStatistics
+from utils.clock_kalman import ClockKalmanFilter, measured_adev
 
 
 class SA5XWebMonitor:
@@ -40,10 +45,29 @@ class SA5XWebMonitor:
         self.monitoring_active = False
         self.current_data = {}
         
+        # Streaming Allan deviation estimators and running statistics for live data;
+        # the estimators are fed by the monitoring thread and read by request handlers
+        self.allan_estimators = {}
+        self.allan_lock = threading.Lock()
+        self.statistics = self._create_statistics()
+        
+        # Kalman estimate of clock phase, frequency and drift from live samples; its process
+        # noise follows the measured ADEV of the live stream or of the uploaded log
+        self.clock_filter = ClockKalmanFilter.from_config(self.config)
+        
+        # Holdover test running in the background, for its live prediction
+        self.holdover_test = None
+        
         # Добавляем переменные для хранения загруженных данных
         self.uploaded_log_data = None
+        self.uploaded_log_path = None
+        self.uploaded_log_arrays = None
         self.uploaded_log_results = None
         
+        # Live tail of a growing log file
+        self.log_tail_thread = None
+        self.log_tail_stop = threading.Event()
+        
         # Setup logging
         self._setup_logging()
         
@@ -144,6 +168,10 @@ class SA5XWebMonitor:
             if self.monitoring_active:
                 return jsonify({'error': 'Monitoring already active'}), 400
             
+            self._reset_allan_estimators(interval)
+            self.statistics = self._create_statistics()
+            if self.clock_filter:
+                self.clock_filter.reset()
             self.monitoring_active = True
             self.monitoring_thread = threading.Thread(
                 target=self._monitoring_loop,
@@ -275,12 +303,15 @@ class SA5XWebMonitor:
                 file.save(str(filepath))
                 
                 # Parse log file
-                parser = LogParser()
-                results = parser.parse_holdover_log(str(filepath))
+                parser = LogParser(self.config)
+                arrays, results = parser.load_and_analyze(str(filepath))
                 
                 # Сохраняем данные для использования в графиках
+                self.uploaded_log_path = str(filepath)
+                self.uploaded_log_arrays = arrays
                 self.uploaded_log_results = results
-                self.uploaded_log_data = self._extract_log_data_for_charts(str(filepath))
+                self._seed_clock_filter(results)
+                self.uploaded_log_data = self._extract_log_data_for_charts(arrays)
                 
                 return jsonify({
                     'status': 'log_parsed',
@@ -291,11 +322,38 @@ class SA5XWebMonitor:
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
         
+        @self.app.route('/log/tail/start', methods=['POST'])
+        def start_log_tail():
+            """Follow a growing log file and push incremental analysis updates"""
+            data = request.get_json(silent=True) or {}
+            log_path = data.get('path') or self.uploaded_log_path
+            if not log_path or not Path(log_path).exists():
+                return jsonify({'error': 'Log file not found'}), 404
+            
+            if self.log_tail_thread and self.log_tail_thread.is_alive():
+                return jsonify({'error': 'Log tail already active'}), 400
+            
+            self.log_tail_stop = threading.Event()
+            self.log_tail_thread = threading.Thread(
+                target=self._log_tail_loop,
+                args=(log_path, data.get('poll_interval'), self.log_tail_stop),
+                daemon=True
+            )
+            self.log_tail_thread.start()
+            
+            return jsonify({'status': 'log_tail_started', 'path': log_path})
+        
+        @self.app.route('/log/tail/stop', methods=['POST'])
+        def stop_log_tail():
+            """Stop following a log file"""
+            self.log_tail_stop.set()
+            return jsonify({'status': 'log_tail_stopped'})
+        
         @self.app.route('/api/statistics')
         def get_statistics():
             """Get statistical analysis of current data"""
             try:
-                if not self.current_data:
+                if not self.statistics.sample_count:
                     return jsonify({'error': 'No data available'}), 404
                 
                 # Calculate statistics from monitoring data
@@ -311,7 +369,18 @@ class SA5XWebMonitor:
             try:
                 # Проверяем, есть ли загруженные данные логов
                 if self.uploaded_log_data and chart_type in ['frequency', 'temperature', 'electrical']:
-                    return jsonify(self.uploaded_log_data[chart_type])
+                    start = request.args.get('start', type=float)
+                    end = request.args.get('end', type=float)
+                    if start is None and end is None:
+                        return jsonify(self.uploaded_log_data[chart_type])
+                    
+                    # Zoomed view: read only the requested time range via the log index
+                    parser = LogParser(self.config)
+                    arrays = parser.load_log_range(self.uploaded_log_path, start, end)
+                    chart_data = self._extract_log_data_for_charts(arrays)
+                    if not chart_data:
+                        return jsonify({'error': 'No data in the requested range'}), 404
+                    return jsonify(chart_data[chart_type])
                 
                 if not self.current_data:
                     return jsonify({'error': 'No data available'}), 404
@@ -331,8 +400,10 @@ class SA5XWebMonitor:
                     allan_data = self._calculate_allan_deviation_from_log(data_type)
                     return jsonify(allan_data)
                 
-                if not self.current_data:
-                    return jsonify({'error': 'No data available'}), 404
+                with self.allan_lock:
+                    estimator = self.allan_estimators.get(data_type)
+                    if not estimator or estimator.sample_count == 0:
+                        return jsonify({'error': 'No data available'}), 404
                 
                 allan_data = self._calculate_allan_deviation(data_type)
                 return jsonify(allan_data)
@@ -340,6 +411,81 @@ class SA5XWebMonitor:
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
         
+        @self.app.route('/api/thermal-sensitivity')
+        def get_thermal_sensitivity():
+            """Temperature sensitivity of the uploaded log, optionally with the compensated series"""
+            try:
+                thermal = (self.uploaded_log_results or {}).get('thermal')
+                if not thermal:
+                    return jsonify({'error': 'No log data available'}), 404
+                
+                response = dict(thermal)
+                if request.args.get('series') and 'sensitivity' in thermal:
+                    parser = LogParser(self.config)
+                    compensated = parser.temperature_compensated(self._uploaded_log_arrays(parser), thermal)
+                    
+                    # Thin the grid to at most max_points for charting
+                    max_points = request.args.get('max_points', 2000, type=int)
+                    step = max(1, len(compensated['time']) // max(max_points, 1))
+                    valid = compensated['valid'][::step]
+                    response['compensated'] = {
+                        'time': compensated['time'][::step][valid].tolist(),
+                        'frequency_error': compensated['frequency_error'][::step][valid].tolist()
+                    }
+                
+                return jsonify(response)
+            
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+        
+        @self.app.route('/api/dynamic-adev')
+        def get_dynamic_adev():
+            """Sliding-window Allan deviation matrix of the uploaded log for a heatmap"""
+            try:
+                if not self.uploaded_log_results:
+                    return jsonify({'error': 'No log data available'}), 404
+                
+                window = request.args.get('window', type=float)
+                step = request.args.get('step', type=float)
+                dynamic = self.uploaded_log_results.get('dynamic_adev')
+                if window or step:
+                    parser = LogParser(self.config)
+                    dynamic = parser.dynamic_allan_deviation(self._uploaded_log_arrays(parser), window, step)
+                
+                if not dynamic:
+                    return jsonify({'error': 'Log is shorter than one window'}), 404
+                return jsonify(dynamic)
+                
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+        
+        @self.app.route('/api/psd')
+        def get_psd():
+            """Phase and frequency PSD with noise identification of the uploaded log"""
+            try:
+                if not self.uploaded_log_path:
+                    return jsonify({'error': 'No log data available'}), 404
+                
+                parser = LogParser(self.config)
+                spectrum = parser.analyze_spectrum(self.uploaded_log_path,
+                                                   segment_length=request.args.get('segment', type=int))
+                return jsonify(spectrum)
+                
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+        
+        @self.app.route('/api/compliance/masks')
+        def get_compliance_masks():
+            """List available MTIE/TDEV compliance masks"""
+            try:
+                checker = ComplianceChecker(self.config)
+                return jsonify({
+                    'masks': checker.list_masks(),
+                    'default_mask': self.config.get('compliance.default_mask')
+                })
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+        
         @self.app.route('/api/export-data')
         def export_data():
             """Export current monitoring data"""
@@ -376,16 +522,29 @@ class SA5XWebMonitor:
         """Background monitoring loop"""
         self.logger.info(f"Starting monitoring loop with {interval}s interval")
         
+        test_running = False
         while self.monitoring_active:
             try:
                 if self.controller:
                     data = self.controller.get_all_parameters()
                     data['timestamp'] = datetime.now().isoformat()
+                    self._update_clock_filter(data)
                     self.current_data = data
                     
                     # Emit to connected clients
                     self.socketio.emit('status_update', data)
                     
+                    # A running holdover test feeds the live analysis at its own interval;
+                    # once it ends, start over at the monitoring interval
+                    if self.holdover_test is not None:
+                        test_running = True
+                    else:
+                        if test_running:
+                            self._reset_allan_estimators(interval)
+                            self.statistics = self._create_statistics()
+                            test_running = False
+                        self._update_live_analysis(data)
+                    
                     self.logger.debug(f"Monitoring update: {data}")
                 
                 time.sleep(interval)
@@ -396,13 +555,41 @@ class SA5XWebMonitor:
         
         self.logger.info("Monitoring loop stopped")
     
+    def _log_tail_loop(self, log_path, poll_interval, stop_event):
+        """Background loop feeding lines appended to a log into the live analysis"""
+        self.logger.info(f"Following log {log_path}")
+        
+        try:
+            parser = LogParser(self.config)
+            arrays = MeasurementBlock()
+            for chunk, results in parser.tail_holdover_log(log_path, poll_interval, stop_event):
+                arrays.extend(chunk)
+                self.uploaded_log_path = log_path
+                self.uploaded_log_arrays = arrays
+                self.uploaded_log_results = results
+                self._seed_clock_filter(results)
+                self.socketio.emit('log_tail_update', {
+                    'results': results,
+                    'new_data': self._extract_log_data_for_charts(chunk)
+                })
+        except Exception as e:
+            self.logger.error(f"Log tail failed: {e}")
+            self.socketio.emit('log_tail_error', {'error': str(e)})
+        
+        self.logger.info("Log tail stopped")
+    
     def _run_holdover_test(self, duration, interval, output_file):
         """Run holdover test in background"""
         try:
             self.logger.info(f"Starting holdover test: {duration}s, {interval}s interval")
             
+            # Registered first so the monitoring loop stops feeding the live analysis
             test = HoldoverTest(self.controller, self.config)
-            results = test.run_test(duration, interval, output_file)
+            self.holdover_test = test
+            self._reset_allan_estimators(interval)
+            self.statistics = self._create_statistics()
+            results = test.run_test(duration, interval, output_file,
+                                    measurement_callback=self._update_live_analysis)
             
             # Emit test completion event
             self.socketio.emit('test_completed', {
@@ -415,22 +602,114 @@ class SA5XWebMonitor:
         except Exception as e:
             self.logger.error(f"Holdover test failed: {e}")
             self.socketio.emit('test_error', {'error': str(e)})
+        
+        finally:
+            # Its prediction is only meaningful while the test is running
+            self.holdover_test = None
     
-    def _extract_log_data_for_charts(self, log_file):
-        """Extract data from log file for chart display"""
+    def _create_statistics(self):
+        """Create running statistics configured for the monitoring pipeline"""
+        return MonitoringStatistics(
+            ewma_alpha=self.config.get('monitoring.ewma_alpha', 0.1),
+            window_size=self.config.get('monitoring.statistics_window', 360)
+        )
+    
+    def _update_clock_filter(self, data):
+        """Add the filtered clock state and covariance to a monitoring sample"""
+        if not self.clock_filter:
+            return
+        
         try:
-            parser = LogParser()
-            measurements = parser._parse_log_file(log_file)
-            
-            if not measurements:
+            units = self.config.get('analysis.frequency_error_units', 'ppm')
+            data['clock_state'] = self.clock_filter.update_from_parameters(time.monotonic(), data, units)
+        except (ValueError, KeyError) as e:
+            self.logger.warning(f"Clock filter update failed: {e}")
+            return
+        
+        # Refit the process noise to the live ADEV as it accumulates
+        if self.clock_filter.samples % self.config.get('kalman.adev_refresh_samples', 60) == 0:
+            with self.allan_lock:
+                estimator = self.allan_estimators.get('frequency')
+                points = estimator.results() if estimator else []
+            taus, adevs = measured_adev(points, min_edf=self.config.get('kalman.adev_min_edf', 10))
+            self.clock_filter.refresh_process_noise(taus, adevs, self.config.get('kalman.adev_min_points', 2))
+    
+    def _seed_clock_filter(self, results):
+        """Fit the clock filter process noise to the ADEV of parsed log results"""
+        if not self.clock_filter:
+            return
+        
+        confidence = results.get('allan_confidence', {})
+        points = [dict(confidence.get(tau, {}), tau=tau, allan_deviation=dev)
+                  for tau, dev in results.get('allan_deviations', {}).items()]
+        units = self.config.get('analysis.frequency_error_units', 'ppm')
+        taus, adevs = measured_adev(points, FREQUENCY_UNIT_SCALE[units], self.config.get('kalman.adev_min_edf', 10))
+        if self.clock_filter.refresh_process_noise(taus, adevs, self.config.get('kalman.adev_min_points', 2)):
+            self.logger.info(f"Clock filter process noise fitted to the log ADEV at {len(taus)} taus")
+    
+    def _update_live_analysis(self, data):
+        """Update incremental statistics and stability estimates with one sample"""
+        self.statistics.update(data)
+        self._update_allan_estimators(data)
+        
+        # Time-to-limit from the drift model of the test in progress
+        test = self.holdover_test
+        prediction = test.prediction if test else None
+        if prediction:
+            self.socketio.emit('holdover_prediction', prediction)
+    
+    def _reset_allan_estimators(self, interval):
+        """Start fresh streaming Allan deviation estimators for a new data stream"""
+        max_octaves = self.config.get('analysis.streaming_allan_octaves', 12)
+        estimators = {
+            data_type: StreamingAllanDeviation(tau0=interval, max_octaves=max_octaves)
+            for data_type in ('frequency', 'temperature')
+        }
+        with self.allan_lock:
+            self.allan_estimators = estimators
+    
+    def _update_allan_estimators(self, data):
+        """Feed one sample to the streaming estimators and push the new curves"""
+        if not self.allan_estimators:
+            return
+        
+        # Frequency error is logged in analysis.frequency_error_units; ADEV is of fractional frequency
+        units = self.config.get('analysis.frequency_error_units', 'ppm')
+        fields = {'frequency': 'frequency_error', 'temperature': 'temperature'}
+        scales = {'frequency': FREQUENCY_UNIT_SCALE[units], 'temperature': 1.0}
+        confidence = self.config.get('analysis.adev_confidence', 0.683)
+        
+        update = {}
+        with self.allan_lock:
+            for data_type, estimator in self.allan_estimators.items():
+                value = data.get(fields[data_type])
+                if value is None:
+                    continue
+                estimator.update(float(value) * scales[data_type])
+                update[data_type] = estimator.results(confidence)
+        
+        self.socketio.emit('allan_update', update)
+    
+    def _uploaded_log_arrays(self, parser):
+        """Columns of the uploaded log, kept from the upload or read through the analysis cache"""
+        arrays = self.uploaded_log_arrays
+        if arrays is None:
+            arrays = parser.load_and_analyze(self.uploaded_log_path)[0]
+            self.uploaded_log_arrays = arrays
+        return arrays
+    
+    def _extract_log_data_for_charts(self, arrays):
+        """Build chart data from columns loaded by LogParser.load_log_arrays"""
+        try:
+            if not arrays['count']:
                 return None
             
             # Extract data arrays
-            timestamps = [m['timestamp'] for m in measurements]
-            freq_errors = [m['frequency_error'] for m in measurements]
-            temperatures = [m['temperature'] for m in measurements]
-            voltages = [m['voltage'] for m in measurements]
-            currents = [m['current'] for m in measurements]
+            timestamps = arrays['timestamp'].tolist()
+            freq_errors = arrays['frequency_error'].tolist()
+            temperatures = arrays['temperature'].tolist()
+            voltages = arrays['voltage'].tolist()
+            currents = arrays['current'].tolist()
             
             # Format timestamps for display
             formatted_timestamps = [datetime.fromtimestamp(ts).strftime('%H:%M:%S') for ts in timestamps]
@@ -481,14 +760,16 @@ class SA5XWebMonitor:
             if data_type == 'frequency':
                 # Use the Allan deviation already calculated by the parser
                 allan_deviations = results.get('allan_deviations', {})
+                confidence = results.get('allan_confidence', {})
                 
-                # Format data for chart
+                # Format data for chart, with EDF and confidence bounds where known
                 allan_data = []
                 for tau, dev in allan_deviations.items():
                     if dev > 0:  # Only include valid deviations
                         allan_data.append({
                             'tau': tau,
-                            'allan_deviation': dev
+                            'allan_deviation': dev,
+                            **confidence.get(tau, {})
                         })
                 
                 return {
@@ -519,46 +800,16 @@ class SA5XWebMonitor:
     def _calculate_statistics(self):
         """Calculate statistical analysis of monitoring data"""
         try:
-            # This would typically use historical data from a database
-            # For now, we'll use the current data point
-            data = self.current_data
-            
-            stats = {
-                'frequency_error': {
-                    'current': data.get('frequency_error', 0),
-                    'mean': data.get('frequency_error', 0),
-                    'std_dev': 0,
-                    'min': data.get('frequency_error', 0),
-                    'max': data.get('frequency_error', 0)
-                },
-                'temperature': {
-                    'current': data.get('temperature', 0),
-                    'mean': data.get('temperature', 0),
-                    'std_dev': 0,
-                    'min': data.get('temperature', 0),
-                    'max': data.get('temperature', 0)
-                },
-                'voltage': {
-                    'current': data.get('voltage', 0),
-                    'mean': data.get('voltage', 0),
-                    'std_dev': 0,
-                    'min': data.get('voltage', 0),
-                    'max': data.get('voltage', 0)
-                },
-                'current': {
-                    'current': data.get('current', 0),
-                    'mean': data.get('current', 0),
-                    'std_dev': 0,
-                    'min': data.get('current', 0),
-                    'max': data.get('current', 0)
-                },
-                'status': {
-                    'lock_status': data.get('lock_status', False),
-                    'holdover_status': data.get('holdover_status', False),
-                    'overall_status': data.get('status', 'UNKNOWN')
-                },
-                'timestamp': data.get('timestamp', datetime.now().isoformat())
+            # Running statistics are maintained per sample, no history is rescanned
+            data = self.statistics.last_sample or self.current_data
+            stats = self.statistics.summary()
+            
+            stats['status'] = {
+                'lock_status': data.get('lock_status', False),
+                'holdover_status': data.get('holdover_status', False),
+                'overall_status': data.get('status', 'UNKNOWN')
             }
+            stats['timestamp'] = data.get('timestamp', datetime.now().isoformat())
             
             return stats
             
@@ -623,33 +874,25 @@ class SA5XWebMonitor:
             return {'error': str(e)}
     
     def _calculate_allan_deviation(self, data_type):
-        """Calculate Allan deviation for specified data type"""
+        """Return the current streaming Allan deviation for specified data type"""
         try:
-            # This is a simplified Allan deviation calculation
-            # In a real implementation, you would need multiple data points over time
-            data = self.current_data
-            
-            if data_type == 'frequency':
-                value = data.get('frequency_error', 0)
-            elif data_type == 'temperature':
-                value = data.get('temperature', 0)
-            else:
+            if data_type not in ('frequency', 'temperature'):
                 return {'error': 'Unknown data type'}
             
-            # Simplified Allan deviation calculation
-            # In practice, you would need multiple data points over time
-            allan_data = []
-            for tau in range(1, 11):  # Sample tau values
-                allan_dev = abs(value) / (tau ** 0.5)  # Simplified calculation
-                allan_data.append({
-                    'tau': tau,
-                    'allan_deviation': allan_dev
-                })
+            confidence = self.config.get('analysis.adev_confidence', 0.683)
+            with self.allan_lock:
+                estimator = self.allan_estimators.get(data_type)
+                if estimator is None:
+                    return {'error': 'No streaming data available'}
+                allan_data = estimator.results(confidence)
+                total_measurements = estimator.sample_count
             
             return {
                 'data_type': data_type,
                 'allan_data': allan_data,
-                'timestamp': data.get('timestamp', datetime.now().isoformat())
+                'timestamp': self.current_data.get('timestamp', datetime.now().isoformat()),
+                'source': 'live',
+                'total_measurements': total_measurements
             }
             
         except Exception as e:
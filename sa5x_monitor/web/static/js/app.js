@@ -44,6 +44,14 @@ class SA5XMonitor {
             this.updateStatistics();
         });
         
+        this.socket.on('allan_update', (data) => {
+            this.updateLiveAllan(data);
+        });
+        
+        this.socket.on('holdover_prediction', (data) => {
+            this.updateHoldoverPrediction(data);
+        });
+        
         this.socket.on('test_completed', (data) => {
             this.showTestResults(data);
         });
@@ -297,6 +305,13 @@ class SA5XMonitor {
                         borderColor: 'rgb(153, 102, 255)',
                         backgroundColor: 'rgba(153, 102, 255, 0.5)',
                         pointRadius: 4
+                    },
+                    {
+                        label: 'Confidence Bounds',
+                        data: [],
+                        borderColor: 'rgba(153, 102, 255, 0.6)',
+                        pointStyle: 'line',
+                        pointRadius: 6
                     }
                 ]
             },
@@ -418,7 +433,39 @@ class SA5XMonitor {
         this.updateMainChartView(view);
     }
     
+    updateLiveAllan(data) {
+        // Streaming Allan deviation pushed by the server
+        const type = this.currentAllanType || 'frequency';
+        const points = data[type];
+        if (!points || !points.length) {
+            return;
+        }
+        
+        this.charts.allan.data.datasets[0].data = points.map(p => ({ x: p.tau, y: p.allan_deviation }));
+        this.charts.allan.data.datasets[1].data = this.allanBounds(points);
+        this.charts.allan.data.datasets[0].label = `${type.charAt(0).toUpperCase() + type.slice(1)} Allan Deviation (Live)`;
+        this.charts.allan.update('none');
+    }
+    
+    allanBounds(points) {
+        // Lower and upper chi-squared bounds as markers at each tau
+        return points
+            .filter(p => p.lower !== undefined)
+            .flatMap(p => [{ x: p.tau, y: p.lower }, { x: p.tau, y: p.upper }]);
+    }
+    
+    updateHoldoverPrediction(data) {
+        // Live time-to-limit from the running test's phase drift model
+        const hours = (seconds) => seconds === null ? '—' : (seconds / 3600).toFixed(1) + ' h';
+        document.getElementById('test-status').innerHTML =
+            '<span class="badge badge-info">Test Running</span> ' +
+            `Time to ±${data.phase_limit_ns} ns: ${hours(data.time_to_limit)} ` +
+            `(${hours(data.time_to_limit_earliest)} – ${hours(data.time_to_limit_latest)})`;
+    }
+    
     switchAllanView(type) {
+        this.currentAllanType = type;
+        
         // Update Allan deviation chart based on type
         document.querySelectorAll('#allan-freq, #allan-temp')
             .forEach(btn => btn.classList.remove('active'));
@@ -472,7 +519,8 @@ class SA5XMonitor {
             
             if (response.ok && data.allan_data) {
                 // Update Allan chart with server data
-                this.charts.allan.data.datasets[0].data = data.allan_data;
+                this.charts.allan.data.datasets[0].data = data.allan_data.map(p => ({ x: p.tau, y: p.allan_deviation }));
+                this.charts.allan.data.datasets[1].data = this.allanBounds(data.allan_data);
                 this.charts.allan.data.datasets[0].label = `${type.charAt(0).toUpperCase() + type.slice(1)} Allan Deviation`;
                 this.charts.allan.update();
                 
@@ -486,6 +534,7 @@ class SA5XMonitor {
                 const allanData = this.calculateAllanDeviation(localData);
                 
                 this.charts.allan.data.datasets[0].data = allanData;
+                this.charts.allan.data.datasets[1].data = [];
                 this.charts.allan.data.datasets[0].label = `${type.charAt(0).toUpperCase() + type.slice(1)} Allan Deviation (Local)`;
                 this.charts.allan.update();
             }
@@ -496,11 +545,60 @@ class SA5XMonitor {
             const allanData = this.calculateAllanDeviation(localData);
             
             this.charts.allan.data.datasets[0].data = allanData;
+            this.charts.allan.data.datasets[1].data = [];
             this.charts.allan.data.datasets[0].label = `${type.charAt(0).toUpperCase() + type.slice(1)} Allan Deviation (Local)`;
             this.charts.allan.update();
         }
     }
     
+    drawDynamicAdevHeatmap(dynamic) {
+        // Tau x time matrix from /api/dynamic-adev, colored by log10(ADEV)
+        const canvas = document.getElementById('dynamic-adev-heatmap');
+        const context = canvas.getContext('2d');
+        canvas.width = canvas.clientWidth;
+        canvas.height = canvas.clientHeight;
+        
+        const values = dynamic.adev.flat().filter(v => v !== null && v > 0).map(Math.log10);
+        if (!values.length) {
+            return;
+        }
+        const low = Math.min(...values);
+        const high = Math.max(...values);
+        const span = high - low || 1;
+        
+        const margin = 60;
+        const rows = dynamic.taus.length;
+        const columns = dynamic.times.length;
+        const cellWidth = (canvas.width - margin) / columns;
+        const cellHeight = (canvas.height - 20) / rows;
+        
+        context.clearRect(0, 0, canvas.width, canvas.height);
+        context.font = '11px sans-serif';
+        dynamic.adev.forEach((row, i) => {
+            // Shortest tau at the bottom
+            const y = (rows - 1 - i) * cellHeight;
+            context.fillStyle = '#333';
+            context.fillText(`τ=${dynamic.taus[i]}s`, 2, y + cellHeight / 2 + 4);
+            row.forEach((value, j) => {
+                if (value === null || value <= 0) {
+                    return;
+                }
+                const level = (Math.log10(value) - low) / span;
+                context.fillStyle = `hsl(${240 - 240 * level}, 80%, 50%)`;
+                context.fillRect(margin + j * cellWidth, y, Math.ceil(cellWidth), Math.ceil(cellHeight));
+            });
+        });
+        
+        const hours = (seconds) => (seconds / 3600).toFixed(1) + ' h';
+        context.fillStyle = '#333';
+        context.fillText(hours(dynamic.times[0]), margin, canvas.height - 4);
+        context.fillText(hours(dynamic.times[columns - 1]), canvas.width - 50, canvas.height - 4);
+        
+        document.getElementById('dynamic-adev-legend').textContent =
+            `Window ${dynamic.window}s, step ${dynamic.step}s; blue ${Math.pow(10, low).toExponential(1)} – ` +
+            `red ${Math.pow(10, high).toExponential(1)}`;
+    }
+    
     calculateAllanDeviation(data) {
         // Simple Allan deviation calculation
         // In a real implementation, this would be more sophisticated
@@ -756,6 +854,9 @@ class SA5XMonitor {
             
             if (response.ok) {
                 this.showLogAnalysis(data.results);
+                if (data.results.dynamic_adev) {
+                    this.drawDynamicAdevHeatmap(data.results.dynamic_adev);
+                }
                 this.showSuccess('Log file uploaded and analyzed');
             } else {
                 this.showError('Upload failed: ' + data.error);
@@ -811,6 +912,14 @@ class SA5XMonitor {
         document.getElementById('status-value').textContent = data.status || '--';
         document.getElementById('freq-error-value').textContent = 
             data.frequency_error ? data.frequency_error.toExponential(3) : '--';
+        if (data.clock_state) {
+            // Kalman estimate of the clock state
+            const state = data.clock_state;
+            document.getElementById('freq-error-value').title =
+                `Filtered: y = ${state.frequency.toExponential(3)} ± ${state.frequency_std.toExponential(1)}, ` +
+                `x = ${state.phase_ns.toFixed(1)} ± ${state.phase_std_ns.toFixed(1)} ns, ` +
+                `drift = ${state.drift_per_day.toExponential(2)}/day`;
+        }
         document.getElementById('temp-value').textContent = 
             data.temperature ? data.temperature.toFixed(2) + '°C' : '--';
         document.getElementById('voltage-value').textContent = 